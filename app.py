@@ -4,20 +4,20 @@ from dotenv import load_dotenv
 from flask_sqlalchemy import SQLAlchemy
 import numpy as np
 import pandas as pd
-from sqlalchemy import or_, and_
-from sqlalchemy.orm import joinedload
+from sqlalchemy import or_, and_, select, func
 import pymysql
 import os
 from io import BytesIO
 import logging
 from flask_migrate import Migrate
 import statsmodels.api as sm
-from models import db, Data, Category, APBD, Stunting, Province, Regency
+from models import db, Data, Category, APBD, Stunting, Province, Regency, DataSummary, ScrapeJob
 import datetime
 import openpyxl
 from scipy import stats
 from scraping import data_fetcher, jumlah_angkatan_bekerja, pdrb, scraping_bps, stunting, indeks_gini, tingkat_partisipasi, apbd
-from scraping.provinces_regencies_fixed import get_latest_provinces_regencies_data
+from scraping.provinces_regencies_fixed import refresh_provinces_regencies, refresh_status
+from scraping.bps_harvest import HarvestSpec, harvest, resolve_regency
 from sklearn.preprocessing import PolynomialFeatures
 from sklearn.linear_model import LinearRegression
 from sklearn.metrics import r2_score
@@ -25,6 +25,17 @@ import io
 import requests
 import helper
 from flask_seeder import FlaskSeeder
+from data_cache import data_cache, NULL_ID, INT_COLUMNS
+from category_cache import category_cache
+from result_cache import analysis_cache, geography_cache, make_key
+import model_registry
+import data_store
+import data_summary
+import commands
+from json_provider import FastJSONProvider
+from table_versions import table_versions, conditional
+from geography import geography
+from jobs import scrape_jobs
 
 
 load_dotenv()
@@ -37,14 +48,153 @@ app.config["SQLALCHEMY_DATABASE_URI"] = os.getenv('DATABASE_URL')
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 app.config["FILE_FOLDER"] = "files/"  # Direktori penyimpanan file
 os.makedirs(app.config["FILE_FOLDER"],exist_ok=True)  # Buat direktori jika belum ada
+app.config["DATA_CACHE_ENABLED"] = os.getenv("DATA_CACHE_ENABLED", "true").lower() == "true"
+app.config["DATA_CACHE_TTL"] = int(os.getenv("DATA_CACHE_TTL", 300))  # detik
+app.config["ANALYSIS_CACHE_SIZE"] = int(os.getenv("ANALYSIS_CACHE_SIZE", 256))
+app.config["ANALYSIS_CACHE_TTL"] = int(os.getenv("ANALYSIS_CACHE_TTL", 600))  # detik
+# Dipakai sebagai TTL analysis cache saat DATA_CACHE_ENABLED=false (versi data tidak melihat tulisan worker lain)
+app.config["ANALYSIS_CACHE_UNVERSIONED_TTL"] = int(os.getenv("ANALYSIS_CACHE_UNVERSIONED_TTL", 60))  # detik
+app.config["GEOGRAPHY_CACHE_TTL"] = int(os.getenv("GEOGRAPHY_CACHE_TTL", 300))  # detik
+app.config["PREDICT_BATCH_MAX_ROWS"] = int(os.getenv("PREDICT_BATCH_MAX_ROWS", 50000))
+app.config["UPLOAD_CHUNK_SIZE"] = int(os.getenv("UPLOAD_CHUNK_SIZE", 5000))  # baris per commit
+app.config["DATA_PAGE_MAX_LIMIT"] = int(os.getenv("DATA_PAGE_MAX_LIMIT", 10000))
+app.config["AGGREGATE_USE_SUMMARY"] = os.getenv("AGGREGATE_USE_SUMMARY", "true").lower() == "true"
+app.config["JSON_BACKEND"] = os.getenv("JSON_BACKEND", "orjson")  # orjson | stdlib
+# true: endpoint scraping diantrekan sebagai job kecuali ?async=false; false: hanya dengan ?async=true
+app.config["SCRAPE_JOBS_ENABLED"] = os.getenv("SCRAPE_JOBS_ENABLED", "true").lower() == "true"
+app.config["SCRAPE_JOB_WORKERS"] = int(os.getenv("SCRAPE_JOB_WORKERS", 2))
+# Detik sebelum job "running" dianggap mati dan diantrekan ulang oleh flask run-scrape-jobs
+app.config["SCRAPE_JOB_TIMEOUT"] = int(os.getenv("SCRAPE_JOB_TIMEOUT", 3600))
+app.json = FastJSONProvider(app)
 logging.basicConfig(level=logging.DEBUG)
 
 db.init_app(app)
+data_cache.init_app(app)
+category_cache.init_app(app)
+table_versions.init_app(app)
+geography.init_app(app)
+analysis_cache.init_app(app, "ANALYSIS_CACHE")
+if not data_cache.enabled:
+    analysis_cache.ttl = app.config["ANALYSIS_CACHE_UNVERSIONED_TTL"]
+geography_cache.init_app(app, "GEOGRAPHY_CACHE")
+scrape_jobs.init_app(app)
 migrate = Migrate(app, db)
 seeder = FlaskSeeder()
 seeder.init_app(app, db)
+commands.register_commands(app)
+
+
+def _invalidate_data_caches():
+    """Drop in-memory views of the data table after a write has been committed"""
+    try:
+        # data_summary diperbarui hanya untuk (kategori, tahun) yang tersentuh
+        data_summary.refresh_pending()
+    except Exception as e:
+        db.session.rollback()
+        app.logger.error(f"Failed to refresh data_summary, run 'flask rebuild-summary': {e}")
+    data_cache.invalidate()
+    # Upload dan CRUD kategori sama-sama bisa menambah kategori
+    category_cache.invalidate()
+    analysis_cache.clear()
+    table_versions.bump("data")
+
+
+def _invalidate_category_caches():
+    """Category writes also change the category dicts embedded in data responses"""
+    _invalidate_data_caches()
+    table_versions.bump("categories")
+
+
+# Kode variabel BPS (domain 0000) -> category_id untuk /api/fetch_data
+FETCH_DATA_CATEGORIES = {
+    "413": 1,
+    "619": 2,
+    "621": 5,
+    "414": 6
+}
+
+
+def _is_bulk_request(wilayah):
+    """`wilayah` "all" or a list of vervar codes/labels selects bulk harvest mode"""
+    return wilayah == "all" or isinstance(wilayah, list)
+
+
+def _harvest_and_store(specs, wilayah=None, province_id=None):
+    """
+    Fetch every BPS table in specs once, extract all regions (or the ones
+    listed in wilayah), resolve them to regencies and upsert the rows in one
+    transaction. The caller handles exceptions and rollback.
+    """
+    regions = wilayah if isinstance(wilayah, list) else None
+    try:
+        province_id = int(province_id) if province_id else None
+    except (TypeError, ValueError):
+        return jsonify({"error": f"Parameter provinsi harus berupa angka: {province_id}"}), 400
+
+    result = harvest(specs, regions=regions, province_id=province_id)
+    if not result["rows"]:
+        return jsonify({
+            "error": "No data found or failed to fetch data",
+            "unresolved": result["unresolved"],
+            "failed": result["failed"]
+        }), 404
+
+    data_store.adopt_city_rows(result["rows"])
+    inserted_count, updated_count = data_store.upsert_data(result["rows"], count=True)
+    db.session.commit()
+    _invalidate_data_caches()
+
+    return jsonify({
+        "message": "Data successfully synchronized",
+        "row_count": len(result["rows"]),
+        "inserted_count": inserted_count,
+        "updated_count": updated_count,
+        "regency_count": len({row["regency_id"] for row in result["rows"]}),
+        "request_count": result["requests"],
+        "unresolved": result["unresolved"],
+        "failed": result["failed"]
+    }), 200
+
+
+@app.route("/api/bps/harvest", methods=["POST"])
+@scrape_jobs.background("bps_harvest")
+def harvest_bps_data():
+    """
+    Bulk harvest of BPS tables for all regions.
+
+    Body: {"items": [{"domain", "jenis_data", "kategori", "tahun"?, "turvar"?}, ...],
+           "wilayah"?: [vervar code or label, ...], "provinsi"?: province_id}
+    Items sharing (domain, jenis_data, turvar) are downloaded once.
+    """
+    try:
+        body = request.get_json()
+        if not body or not isinstance(body.get("items"), list) or not body["items"]:
+            return jsonify({"error": "Parameter items (list) diperlukan"}), 400
+
+        specs = []
+        for item in body["items"]:
+            if not item.get("domain") or not item.get("jenis_data") or not item.get("kategori"):
+                return jsonify({"error": "Setiap item memerlukan domain, jenis_data, dan kategori"}), 400
+            try:
+                category_id = int(item["kategori"])
+            except (TypeError, ValueError):
+                return jsonify({"error": f"Kategori harus berupa angka: {item['kategori']}"}), 400
+            if category_cache.get(category_id) is None:
+                return jsonify({"error": f"Kategori {category_id} tidak ditemukan"}), 400
+            specs.append(HarvestSpec(
+                item["domain"], item["jenis_data"], category_id,
+                tahun=item.get("tahun"), turvar=item.get("turvar")
+            ))
+
+        return _harvest_and_store(specs, body.get("wilayah"), body.get("provinsi"))
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": "An internal error occurred", "details": str(e)}), 500
+
 
 @app.route("/api/fetch_data", methods=["POST"])
+@scrape_jobs.background("fetch_data")
 def fetch_data_api():
     try:
         body = request.get_json()
@@ -58,6 +208,12 @@ def fetch_data_api():
 
         print(f"Received data: wilayah={vervar}, jenis_data={var}, tahun={th}")
 
+        if _is_bulk_request(vervar):
+            category = FETCH_DATA_CATEGORIES.get(var)
+            if not category:
+                return jsonify({"error": f"Invalid jenis_data value: {var}"}), 400
+            return _harvest_and_store([HarvestSpec("0000", var, category, tahun=th)], vervar, province_id)
+
         # Fetch new data using scraping function
         data = scraping_bps.fetch_data(vervar, var, th)
         print(f"Fetched data: {data}")
@@ -66,58 +222,31 @@ def fetch_data_api():
             return jsonify({"error": "No data found or failed to fetch data"}), 404
 
         # Determine category based on var
-        category_mapping = {
-            "413": 1,
-            "619": 2,
-            "621": 5,
-            "414": 6
-        }
-        category = category_mapping.get(var)
+        category = FETCH_DATA_CATEGORIES.get(var)
         if not category:
             return jsonify({"error": f"Invalid jenis_data value: {var}"}), 400
 
-        updated_entries = []
-        inserted_entries = []
-
-        for new_data in data:
-            year = new_data['tahun']
-            amount = new_data['data']
-
-            # Check if the record already exists
-            existing_entry = Data.query.filter_by(
-                regency_id=vervar,
-                year=year,
-                category_id=category
-            ).first()
-
-            if existing_entry:
-                # Update if amount is different
-                if existing_entry.amount != amount:
-                    print(f"Updating existing record (year={year}) from {existing_entry.amount} to {amount}")
-                    existing_entry.amount = amount
-                    existing_entry.province_id = province_id  # optional update
-                    updated_entries.append(existing_entry.json())
-            else:
-                # Insert new record
-                print(f"Inserting new record for year={year}")
-                entry = Data(
-                    amount=amount,
-                    regency_id=vervar,
-                    year=year,
-                    category_id=category,
-                    province_id=province_id
-                )
-                db.session.add(entry)
-                inserted_entries.append(entry)
+        # Satu upsert per batch, bukan SELECT + INSERT/UPDATE per baris
+        inserted_count, updated_count = data_store.upsert_data([
+            {
+                "amount": new_data['data'],
+                "regency_id": vervar,
+                "year": int(new_data['tahun']),
+                "category_id": category,
+                "province_id": province_id
+            }
+            for new_data in data
+        ], count=True)
 
         db.session.commit()
+        _invalidate_data_caches()
         print("Database successfully updated.")
 
         return jsonify({
             "message": "Data successfully synchronized",
             "data": data,
-            "inserted_count": len(inserted_entries),
-            "updated_count": len(updated_entries)
+            "inserted_count": inserted_count,
+            "updated_count": updated_count
         }), 200
 
     except Exception as e:
@@ -127,6 +256,7 @@ def fetch_data_api():
 
 
 @app.route('/api/indeks-gini', methods=['POST'])
+@scrape_jobs.background("indeks_gini")
 def fetch_and_save_bps_data():
     try:
         # Ambil parameter dari query string
@@ -171,6 +301,7 @@ def fetch_and_save_bps_data():
                 db.session.add(new_data)
 
         db.session.commit()
+        _invalidate_data_caches()
 
         return jsonify({
             "message": "Data berhasil diambil dan disimpan", 
@@ -182,6 +313,7 @@ def fetch_and_save_bps_data():
         return jsonify({"error": f"Terjadi kesalahan: {str(e)}"}), 500
 
 @app.route('/api/tingkat-partisipasi', methods=['POST'])
+@scrape_jobs.background("tingkat_partisipasi")
 def fetch_tingkat_partisipasi():
     try:
         # Ambil parameter dari query string
@@ -193,6 +325,10 @@ def fetch_tingkat_partisipasi():
         if not var or not tahun or not vervar_label:
             return jsonify({"error": "Parameter jenis_dataa, tahun, dan wilayah diperlukan"}), 400
 
+        # Mode bulk: semua wilayah dari satu unduhan tabel, disimpan per regency
+        if _is_bulk_request(vervar_label):
+            return _harvest_and_store([HarvestSpec("3471", var, 7, tahun=tahun)], vervar_label, body.get("provinsi"))
+
         # Ambil data dari API BPS
         bps_data = tingkat_partisipasi.get_bps_data(var, tahun, vervar_label)
 
@@ -224,6 +360,7 @@ def fetch_tingkat_partisipasi():
                 db.session.add(new_data)
 
         db.session.commit()
+        _invalidate_data_caches()
 
         return jsonify({
             "message": "Data berhasil diambil dan disimpan", 
@@ -235,6 +372,7 @@ def fetch_tingkat_partisipasi():
         return jsonify({"error": f"Terjadi kesalahan: {str(e)}"}), 500
 
 @app.route('/api/jumlah-angkatan-bekerja', methods=['POST'])
+@scrape_jobs.background("jumlah_angkatan_bekerja")
 def fetch_jumlah_angkatan_bekerja():
     try:
         # Ambil parameter dari query string
@@ -246,39 +384,49 @@ def fetch_jumlah_angkatan_bekerja():
         if not var or not tahun or not vervar_label:
             return jsonify({"error": "Parameter jenis_dataa, tahun, dan wilayah diperlukan"}), 400
 
+        # Mode bulk: semua wilayah dari satu unduhan tabel, disimpan per regency
+        if _is_bulk_request(vervar_label):
+            return _harvest_and_store([HarvestSpec("3400", var, 8, tahun=tahun, turvar=343)], vervar_label, body.get("provinsi"))
+
         # Ambil data dari API BPS
         bps_data = jumlah_angkatan_bekerja.get_jumlah_angkatan_bekerja(var, tahun, vervar_label)
 
         if bps_data is None:
             return jsonify({"error": "Data tidak tersedia data dari API BPS"}), 404
 
-        updated_data = []
-        for item in bps_data:
-            # Cek apakah data sudah ada di database
-            existing_data = Data.query.filter_by(
-                year=item["tahun"],
-                city=item["wilayah"],
-                category_id=8
-            ).first()
-
-            if existing_data:
-                if existing_data.amount != item["data"]:
-                    existing_data.amount = item["data"]
-                    db.session.add(existing_data)
-                    updated_data.append(existing_data.json())
-            else:
-                new_data = Data(
-                    amount=item["data"],
-                    year=item["tahun"],
-                    city=item["wilayah"],
-                    category_id=8
-                )
-                db.session.add(new_data)
-                updated_data.append(new_data.json())
+        # Kunci sama dengan mode bulk: wilayah BPS dipetakan ke regency
+        province_id = body.get("provinsi")
+        regency = resolve_regency(
+            bps_data[0]["kode_wilayah"], vervar_label,
+            int(province_id) if str(province_id or "").isdigit() else None
+        )
+        if regency is None:
+            return jsonify({"error": f"Wilayah '{vervar_label}' tidak cocok dengan regency di database"}), 404
+
+        rows = [
+            {
+                "amount": item["data"],
+                "year": int(item["tahun"]),
+                "city": item["wilayah"],
+                "category_id": 8,
+                "regency_id": regency["id"],
+                "province_id": regency["province_id"]
+            }
+            for item in bps_data
+        ]
+        data_store.adopt_city_rows(rows)
+        inserted_count, updated_count = data_store.upsert_data(rows, count=True)
 
         db.session.commit()
+        _invalidate_data_caches()
 
-        return jsonify({"message": "Data berhasil diambil dan disimpan", "data": new_data.json()}), 200
+        latest = Data.query.filter_by(category_id=8, regency_id=regency["id"], year=rows[-1]["year"]).first()
+        return jsonify({
+            "message": "Data berhasil diambil dan disimpan",
+            "data": latest.json() if latest else None,
+            "inserted_count": inserted_count,
+            "updated_count": updated_count
+        }), 200
 
     except Exception as e:
         # Tangani kesalahan yang terjadi
@@ -286,6 +434,7 @@ def fetch_jumlah_angkatan_bekerja():
         return jsonify({"error": f"Terjadi kesalahan: {str(e)}"}), 500
 
 @app.route('/api/pdrb', methods=['POST'])
+@scrape_jobs.background("pdrb")
 def fetch_pdrb():
     try:
         # Ambil parameter dari query string
@@ -329,6 +478,7 @@ def fetch_pdrb():
             
 
         db.session.commit()
+        _invalidate_data_caches()
 
         return jsonify({"message": "Data berhasil diambil dan disimpan", "data": new_data.json()}), 200
 
@@ -353,7 +503,23 @@ def list_stunting():
     return jsonify([item.json() for item in data]), 200
 
 
+DATA_FIELDS = ('id', 'year', 'amount', 'regency_id', 'province_id', 'category_id', 'category', 'regency', 'province')
+
+
+def _parse_data_cursor(cursor):
+    """Cursor '<year>:<id>' dari next_cursor halaman sebelumnya; year 'null' untuk data tanpa tahun"""
+    year, data_id = cursor.split(':')
+    return (None if year == 'null' else int(year)), int(data_id)
+
+
+def _data_cursor(record):
+    """next_cursor untuk baris terakhir (id, year, ...) sebuah halaman"""
+    data_id, year = record[0], record[1]
+    return f"{'null' if year is None else year}:{data_id}"
+
+
 @app.route('/api/data', methods=['GET'])
+@conditional("data", "categories", "geography")
 def get_data():
     """
     Get data with optional filters for visualization
@@ -361,62 +527,129 @@ def get_data():
     - category_id: Filter by category (required)
     - province_id: Filter by province (shows all regencies in province)
     - regency_id: Filter by specific regency
+    - limit: Page size; pages are ordered by (year, id)
+    - cursor: next_cursor returned by the previous page
+    - fields: Comma separated subset of DATA_FIELDS (default: all)
+    - format: "rows" (default) or "columnar" (one array per field)
+
+    Without limit/cursor/fields/format the full list is returned as before;
+    otherwise the response is {"data", "next_cursor", "count"}.
     """
     try:
         category_id = request.args.get('category_id', type=int)
         province_id = request.args.get('province_id', type=int)
         regency_id = request.args.get('regency_id', type=int)
+        limit = request.args.get('limit', type=int)
+        cursor = request.args.get('cursor')
+        fields_param = request.args.get('fields')
+        response_format = request.args.get('format', 'rows')
 
         if not category_id:
             return jsonify({"error": "category_id is required"}), 400
 
-        # Build query - HANYA query tabel Data
-        query = Data.query.filter(Data.category_id == category_id)
-
-        # Apply location filters berdasarkan indeks
-        if regency_id:
-            query = query.filter(Data.regency_id == regency_id)
-        elif province_id:
-            query = query.filter(Data.province_id == province_id)
-
-        # Execute query
-        data_list = query.order_by(Data.year.asc()).all()
-
-        # Kumpulkan unique IDs untuk lookup
-        regency_ids = list(set([d.regency_id for d in data_list if d.regency_id]))
-        province_ids = list(set([d.province_id for d in data_list if d.province_id]))
+        fields = [f.strip() for f in fields_param.split(',') if f.strip()] if fields_param else list(DATA_FIELDS)
+        unknown_fields = [f for f in fields if f not in DATA_FIELDS]
+        if unknown_fields:
+            return jsonify({"error": f"Unknown fields: {', '.join(unknown_fields)}", "allowed": list(DATA_FIELDS)}), 400
+        if response_format not in ('rows', 'columnar'):
+            return jsonify({"error": "format must be 'rows' or 'columnar'"}), 400
+        if limit is not None and not 0 < limit <= app.config["DATA_PAGE_MAX_LIMIT"]:
+            return jsonify({"error": f"limit must be between 1 and {app.config['DATA_PAGE_MAX_LIMIT']}"}), 400
+        after = None
+        if cursor:
+            try:
+                after = _parse_data_cursor(cursor)
+            except ValueError:
+                return jsonify({"error": "Invalid cursor"}), 400
+
+        paginated = any(request.args.get(p) is not None for p in ('limit', 'cursor', 'fields', 'format'))
+        # Satu baris ekstra untuk mengetahui apakah masih ada halaman berikutnya
+        fetch_limit = limit + 1 if limit else None
+
+        if data_cache.enabled:
+            # Layani dari cache kolumnar, tanpa query ke tabel Data
+            panel = data_cache.select(
+                category_id=category_id,
+                regency_id=regency_id or None,
+                province_id=None if regency_id else (province_id or None),
+            )
+            if after:
+                # Tahun NULL disimpan sebagai NULL_ID (-1), urut sebelum tahun mana pun
+                panel = panel.after(NULL_ID if after[0] is None else after[0], after[1])
+            if fetch_limit:
+                panel = panel.head(fetch_limit)
+            categories_dict = panel.categories
+            records = panel.records('id', 'year', 'amount', 'regency_id', 'province_id', 'category_id')
+        else:
+            # Build query - HANYA query tabel Data
+            query = db.session.query(
+                Data.id, Data.year, Data.amount, Data.regency_id, Data.province_id, Data.category_id
+            ).filter(Data.category_id == category_id)
+
+            # Apply location filters berdasarkan indeks
+            if regency_id:
+                query = query.filter(Data.regency_id == regency_id)
+            elif province_id:
+                query = query.filter(Data.province_id == province_id)
+            if after and after[0] is None:
+                # NULL terurut paling awal pada ORDER BY year ASC (MySQL / SQLite), sama dengan cache
+                query = query.filter(or_(Data.year.isnot(None), Data.id > after[1]))
+            elif after:
+                query = query.filter(or_(Data.year > after[0], and_(Data.year == after[0], Data.id > after[1])))
+
+            # Execute query
+            query = query.order_by(Data.year.asc(), Data.id.asc())
+            if fetch_limit:
+                query = query.limit(fetch_limit)
+            records = [tuple(row) for row in query.all()]
+            categories_dict = category_cache.all()
+
+        next_cursor = None
+        if limit and len(records) > limit:
+            records = records[:limit]
+            next_cursor = _data_cursor(records[-1])
+
+        # Kumpulkan unique IDs untuk lookup, hanya jika field-nya diminta
+        regency_ids = list(set([r[3] for r in records if r[3]])) if 'regency' in fields else []
+        province_ids = list(set([r[4] for r in records if r[4]])) if 'province' in fields else []
         
-        # Query Province dan Regency secara terpisah (bukan relationship)
+        # Nama Province dan Regency dari registry geografi di memori
         regencies_dict = {}
         provinces_dict = {}
         
-        if regency_ids:
-            regencies = Regency.query.filter(Regency.id.in_(regency_ids)).all()
-            regencies_dict = {r.id: {'id': r.id, 'name': r.name} for r in regencies}
+        for rid in regency_ids:
+            regency = geography.regency(rid)
+            if regency:
+                regencies_dict[rid] = {'id': rid, 'name': regency['name']}
         
-        if province_ids:
-            provinces = Province.query.filter(Province.id.in_(province_ids)).all()
-            provinces_dict = {p.id: {'id': p.id, 'name': p.name} for p in provinces}
+        for pid in province_ids:
+            province = geography.province(pid)
+            if province:
+                provinces_dict[pid] = {'id': pid, 'name': province['name']}
+
+        # Format response dengan lookup manual, hanya field yang diminta
+        getters = {
+            'id': lambda r: r[0],
+            'year': lambda r: r[1],
+            'amount': lambda r: float(r[2]) if r[2] is not None else 0,
+            'regency_id': lambda r: r[3],
+            'province_id': lambda r: r[4],
+            'category_id': lambda r: r[5],
+            'category': lambda r: categories_dict.get(r[5]),
+            # Lookup regency / province name dari dictionary
+            'regency': lambda r: regencies_dict.get(r[3]) if r[3] else None,
+            'province': lambda r: provinces_dict.get(r[4]) if r[4] else None,
+        }
+        selected = [(field, getters[field]) for field in fields]
 
-        # Format response dengan lookup manual
-        result = []
-        for d in data_list:
-            item = {
-                'id': d.id,
-                'year': d.year,
-                'amount': float(d.amount) if d.amount is not None else 0,
-                'regency_id': d.regency_id,
-                'province_id': d.province_id,
-                'category_id': d.category_id,
-                'category': d.category.to_dict() if d.category else None,
-                # Lookup regency name dari dictionary
-                'regency': regencies_dict.get(d.regency_id) if d.regency_id else None,
-                # Lookup province name dari dictionary
-                'province': provinces_dict.get(d.province_id) if d.province_id else None,
-            }
-            result.append(item)
+        if response_format == 'columnar':
+            data = {field: [get(r) for r in records] for field, get in selected}
+        else:
+            data = [{field: get(r) for field, get in selected} for r in records]
 
-        return jsonify(result), 200
+        if not paginated:
+            return jsonify(data), 200
+        return jsonify({"data": data, "next_cursor": next_cursor, "count": len(records)}), 200
 
     except Exception as e:
         app.logger.error(f"Error fetching data: {e}")
@@ -427,6 +660,150 @@ def get_data():
             "details": str(e)
         }), 500
 
+AGGREGATE_GROUP_BY = ('province_id', 'regency_id', 'year', 'category_id')
+AGGREGATE_METRICS = ('sum', 'mean', 'min', 'max', 'count', 'growth')
+
+
+def _aggregate_from_summary(group_by, category_ids, province_id, start_year, end_year):
+    """Roll precomputed data_summary rows up to group_by (no regency level)"""
+    scope = 'province' if 'province_id' in group_by or province_id is not None else 'national'
+    query = db.session.query(
+        DataSummary.category_id, DataSummary.province_id, DataSummary.year,
+        DataSummary.total, DataSummary.minimum, DataSummary.maximum, DataSummary.row_count,
+    ).filter(DataSummary.scope == scope, DataSummary.category_id.in_(category_ids))
+    if province_id is not None:
+        query = query.filter(DataSummary.province_id == province_id)
+    if start_year is not None:
+        query = query.filter(DataSummary.year >= start_year)
+    if end_year is not None:
+        query = query.filter(DataSummary.year <= end_year)
+
+    df = pd.DataFrame(
+        [tuple(row) for row in query.all()],
+        columns=['category_id', 'province_id', 'year', 'total', 'minimum', 'maximum', 'row_count'],
+    )
+    grouped = df.groupby(list(group_by), dropna=False).agg(
+        sum=('total', 'sum'), min=('minimum', 'min'), max=('maximum', 'max'), count=('row_count', 'sum'),
+    )
+    grouped['mean'] = grouped['sum'] / grouped['count']
+    return grouped.reset_index()
+
+
+def _aggregate_frame(group_by, category_ids, province_id, regency_id, start_year, end_year):
+    """Grouped sum/mean/min/max/count of Data.amount as a DataFrame (NULL ids as NaN)"""
+    if app.config["AGGREGATE_USE_SUMMARY"] and regency_id is None and 'regency_id' not in group_by:
+        return _aggregate_from_summary(group_by, category_ids, province_id, start_year, end_year)
+
+    if data_cache.enabled:
+        panel = data_cache.select(
+            category_id=category_ids,
+            province_id=province_id,
+            regency_id=regency_id,
+        )
+        df = pd.DataFrame({column: panel.column(column) for column in dict.fromkeys((*group_by, 'year', 'amount'))})
+        # NULL (termasuk year) dikembalikan sebelum filter dan grouping, sama seperti jalur SQL
+        for column in df.columns:
+            if column in INT_COLUMNS:
+                df[column] = df[column].where(df[column] != NULL_ID)
+        if start_year is not None:
+            df = df[df['year'] >= start_year]
+        if end_year is not None:
+            df = df[df['year'] <= end_year]
+        df = df.dropna(subset=['amount'])
+        grouped = df.groupby(list(group_by), dropna=False)['amount'].agg(['sum', 'mean', 'min', 'max', 'count'])
+        return grouped.reset_index()
+
+    columns = [getattr(Data, column) for column in group_by]
+    query = db.session.query(
+        *columns,
+        func.sum(Data.amount), func.avg(Data.amount), func.min(Data.amount),
+        func.max(Data.amount), func.count(Data.amount),
+    ).filter(Data.category_id.in_(category_ids), Data.amount.isnot(None))
+    if province_id is not None:
+        query = query.filter(Data.province_id == province_id)
+    if regency_id is not None:
+        query = query.filter(Data.regency_id == regency_id)
+    if start_year is not None:
+        query = query.filter(Data.year >= start_year)
+    if end_year is not None:
+        query = query.filter(Data.year <= end_year)
+    rows = query.group_by(*columns).all()
+    return pd.DataFrame(
+        [tuple(row) for row in rows],
+        columns=[*group_by, 'sum', 'mean', 'min', 'max', 'count'],
+    )
+
+
+@app.route('/api/data/aggregate', methods=['GET'])
+@conditional("data")
+def aggregate_data():
+    """
+    Aggregate Data.amount server-side for charts
+    Query params:
+    - category_id: One id or a comma separated list (required)
+    - group_by: Comma separated subset of AGGREGATE_GROUP_BY (default: year)
+    - metrics: Comma separated subset of AGGREGATE_METRICS (default: sum)
+    - province_id / regency_id / start_year / end_year: optional filters
+
+    growth is the year-over-year change of the group's sum, in percent,
+    relative to the previous year present in the same group; it requires
+    year in group_by. Rollups without a regency dimension are read from the
+    precomputed data_summary table.
+    """
+    try:
+        try:
+            category_ids = [int(c) for c in request.args.get('category_id', '').split(',') if c.strip()]
+        except ValueError:
+            return jsonify({"error": "category_id must be an integer or a comma separated list"}), 400
+        if not category_ids:
+            return jsonify({"error": "category_id is required"}), 400
+
+        group_by = [g.strip() for g in request.args.get('group_by', 'year').split(',') if g.strip()]
+        metrics = [m.strip() for m in request.args.get('metrics', 'sum').split(',') if m.strip()]
+        if not group_by or any(g not in AGGREGATE_GROUP_BY for g in group_by):
+            return jsonify({"error": "Invalid group_by", "allowed": list(AGGREGATE_GROUP_BY)}), 400
+        if not metrics or any(m not in AGGREGATE_METRICS for m in metrics):
+            return jsonify({"error": "Invalid metrics", "allowed": list(AGGREGATE_METRICS)}), 400
+        if 'growth' in metrics and 'year' not in group_by:
+            return jsonify({"error": "growth requires year in group_by"}), 400
+        group_by = list(dict.fromkeys(group_by))
+
+        grouped = _aggregate_frame(
+            group_by,
+            category_ids,
+            request.args.get('province_id', type=int),
+            request.args.get('regency_id', type=int),
+            request.args.get('start_year', type=int),
+            request.args.get('end_year', type=int),
+        )
+
+        sort_columns = [g for g in group_by if g != 'year'] + (['year'] if 'year' in group_by else [])
+        grouped = grouped.sort_values(sort_columns, na_position='first').reset_index(drop=True)
+
+        if 'growth' in metrics:
+            series_keys = [g for g in group_by if g != 'year']
+            sums = grouped['sum'].astype('float64')
+            previous = sums.groupby([grouped[k] for k in series_keys], dropna=False).shift() if series_keys else sums.shift()
+            grouped['growth'] = ((sums - previous) / previous.abs() * 100).where(previous != 0)
+
+        result = []
+        for row in grouped[[*group_by, *metrics]].itertuples(index=False):
+            item = {}
+            for name, value in zip((*group_by, *metrics), row):
+                if value is None or value != value:
+                    item[name] = None
+                elif name in AGGREGATE_GROUP_BY or name == 'count':
+                    item[name] = int(value)
+                else:
+                    item[name] = float(value)
+            result.append(item)
+
+        return jsonify({"group_by": group_by, "metrics": metrics, "data": result}), 200
+
+    except Exception as e:
+        app.logger.error(f"Error aggregating data: {e}")
+        return jsonify({"error": "Failed to aggregate data", "details": str(e)}), 500
+
 # Create new data
 @app.route("/api/data", methods=["POST"])
 def create_data():
@@ -460,6 +837,7 @@ def create_data():
             )
         db.session.add(new_data)
         db.session.commit()
+        _invalidate_data_caches()
         return jsonify(new_data.json()), 201
     except Exception as e:
         db.session.rollback()
@@ -481,7 +859,8 @@ def update_data(id):
         data.province_id = update_data.get("province_id", data.province_id)
 
         db.session.commit()
-        return jsonify(data.to_dict())
+        _invalidate_data_caches()
+        return jsonify(data.json())
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": str(e)}), 400
@@ -494,6 +873,7 @@ def delete_data(id):
         data = Data.query.get_or_404(id)
         db.session.delete(data)
         db.session.commit()
+        _invalidate_data_caches()
         return jsonify({"message": "Data deleted successfully"})
     except Exception as e:
         db.session.rollback()
@@ -502,6 +882,7 @@ def delete_data(id):
 
 # Get all categories
 @app.route('/api/categories', methods=['GET'])
+@conditional("categories")
 def get_categories():
     search = request.args.get('search', '')  # ambil dari query param
 
@@ -514,6 +895,7 @@ def get_categories():
     return jsonify([category.to_dict() for category in categories])
 
 @app.route('/api/categories/<int:id>', methods=['GET'])
+@conditional("categories")
 def get_category(id):
     category = Category.query.get_or_404(id)
     return jsonify(category.to_dict())
@@ -524,6 +906,7 @@ def create_category():
     new_category = Category(name=data.get('name'))
     db.session.add(new_category)
     db.session.commit()
+    _invalidate_category_caches()
     return jsonify(new_category.to_dict()), 201
 
 @app.route('/api/categories/<int:id>', methods=['PUT'])
@@ -532,17 +915,23 @@ def update_category(id):
     data = request.get_json()
     category.name = data.get('name', category.name)
     db.session.commit()
+    _invalidate_category_caches()
     return jsonify(category.to_dict())
 
 @app.route('/api/categories/<int:id>', methods=['DELETE'])
 def delete_category(id):
     category = Category.query.get_or_404(id)
+    # Baris data_summary kategori ini dihapus dulu (FK, category_id tidak boleh NULL);
+    # baris data sendiri di-NULL-kan oleh relationship dan tidak masuk summary
+    DataSummary.query.filter_by(category_id=category.id).delete(synchronize_session=False)
     db.session.delete(category)
     db.session.commit()
+    _invalidate_category_caches()
     return jsonify({"message": "Category deleted successfully"})
 
 
 @app.route("/stunting", methods=["POST"])
+@scrape_jobs.background("stunting")
 def scrape_endpoint():
     data = request.get_json()
     kab_kota = data.get("kab_kota")
@@ -598,6 +987,7 @@ def scrape_endpoint():
         )
         db.session.add(entry)
     db.session.commit()
+    _invalidate_data_caches()
 
     return jsonify(entry.json())
 
@@ -654,62 +1044,55 @@ def create_apbd():
 #     return None, variables
 
 
-def _fetch_and_prepare_data(variables, city):
-    """Fetches data from the database and merges it into a single DataFrame."""
-    data_frames = []
-    for var in variables:
-        var_data = (
-            db.session.query(Data.amount, Data.year, Data.city)
+def _fetch_and_prepare_data(variables, cities):
+    """
+    Fetches every (variable, city) series in one pass and pivots them into a
+    wide year x variable DataFrame per city. Only years where all variables
+    have a value are kept. Returns a dict of city -> DataFrame; cities without
+    complete data are omitted.
+    """
+    if data_cache.enabled:
+        snapshot = data_cache.snapshot()
+        category_ids = [
+            cat_id for var in set(variables)
+            for cat_id in snapshot.category_ids_by_name.get(var, [])
+        ]
+        panel = snapshot.select(category_id=category_ids, city=list(cities))
+        category_names = {cat_id: cat["name"] for cat_id, cat in snapshot.categories.items()}
+        rows = [
+            (category_names.get(cat_id), amount, year, city)
+            for cat_id, amount, year, city in panel.records("category_id", "amount", "year", "city")
+        ]
+    else:
+        rows = (
+            db.session.query(Category.name, Data.amount, Data.year, Data.city)
             .join(Category)
-            .filter(Category.name == var, Data.city == city)
-            .order_by(Data.year)
+            .filter(Category.name.in_(variables), Data.city.in_(cities))
             .all()
         )
-        if not var_data:
-            return None # Return None if any variable has no data
-            
-        df = pd.DataFrame(var_data, columns=["amount", "year", "city"])
-        df = df.rename(columns={"amount": var})
-        data_frames.append(df)
-
-    if not data_frames:
-        return None
-
-    # Merge data frames on year and city
-    merged_df = data_frames[0]
-    for df in data_frames[1:]:
-        merged_df = pd.merge(merged_df, df, on=["year", "city"], how="inner")
 
-    return merged_df
+    if not rows:
+        return {}
 
+    long_df = pd.DataFrame(rows, columns=["variable", "amount", "year", "city"])
 
-def _fetch_and_prepare_data(variables, city):
-    """Fetches data from the database and merges it into a single DataFrame."""
-    data_frames = []
-    for var in variables:
-        var_data = (
-            db.session.query(Data.amount, Data.year, Data.city)
-            .join(Category)
-            .filter(Category.name == var, Data.city == city)
-            .order_by(Data.year)
-            .all()
-        )
-        if not var_data:
-            return None # Return None if any variable has no data
-            
-        df = pd.DataFrame(var_data, columns=["amount", "year", "city"])
-        df = df.rename(columns={"amount": var})
-        data_frames.append(df)
-
-    if not data_frames:
-        return None
+    # Satu reshape: (city, year) x variable; duplikat diambil nilai pertamanya
+    wide_df = (
+        long_df.drop_duplicates(["city", "year", "variable"])
+        .set_index(["city", "year", "variable"])["amount"]
+        .unstack("variable")
+        .reindex(columns=variables)
+        .dropna()
+        .sort_index()
+    )
 
-    # Merge data frames on year and city
-    merged_df = data_frames[0]
-    for df in data_frames[1:]:
-        merged_df = pd.merge(merged_df, df, on=["year", "city"], how="inner")
+    region_frames = {}
+    for city, frame in wide_df.groupby(level="city", sort=False):
+        frame = frame.reset_index()
+        frame.columns.name = None
+        region_frames[city] = frame[["year", "city", *variables]]
 
-    return merged_df
+    return region_frames
 
 
 # Additional robust helper functions to handle numpy arrays properly
@@ -1145,6 +1528,19 @@ def _generate_multi_region_summary(model, variables, category_names, analysis_ty
     
     return "\n".join(summary)
 
+def _fit_model(X, y, regression_type):
+    """Fit OLS (linear) or a degree-2 polynomial pipeline; returns (model, poly, r_squared, y_pred)"""
+    if regression_type == "linear":
+        X_with_const = sm.add_constant(X, has_constant="add")
+        model = sm.OLS(y, X_with_const).fit()
+        return model, None, float(model.rsquared), model.fittedvalues
+
+    poly = PolynomialFeatures(degree=2)
+    X_poly = poly.fit_transform(X)
+    model = LinearRegression().fit(X_poly, y)
+    y_pred = model.predict(X_poly)
+    return model, poly, float(r2_score(y, y_pred)), y_pred
+
 # Updated main regression analysis function with cities-only parameter
 @app.route("/api/analysis", methods=["POST"])
 def regression_analysis():
@@ -1165,15 +1561,33 @@ def regression_analysis():
         if not cities or len(cities) == 0:
             return jsonify({"error": "Parameter 'cities' is required and must contain at least one city."}), 400
         
+        # Urutan kota tidak mengubah fit: diurutkan agar request yang setara berbagi satu entri cache.
+        # Urutan variabel tetap dipakai apa adanya (variabel terakhir adalah dependen).
+        cities = sorted(cities, key=str)
+
         # Determine if this is multi-region analysis based on cities count
         is_multi_region = len(cities) > 1
+
+        # Request identik pada versi data yang sama dilayani dari cache hasil fit
+        if data_cache.enabled:
+            data_cache.snapshot()
+        cache_key = make_key({
+            "regression_type": regression_type,
+            "analysis_type": analysis_type,
+            "cities": cities,
+            "variables": variables,
+        }, data_cache.version)
+        cached_response = analysis_cache.get(cache_key)
+        if cached_response is not None:
+            return jsonify(cached_response)
         
         # 2. Fetch and Prepare Data for all regions
         all_region_data = {}
         merged_dfs = []
+        region_frames = _fetch_and_prepare_data(variables, cities)
         
         for region in cities:
-            merged_df = _fetch_and_prepare_data(variables, region)
+            merged_df = region_frames.get(region)
             if merged_df is None or merged_df.empty:
                 continue
             
@@ -1204,10 +1618,8 @@ def regression_analysis():
         category_names = _get_category_display_names(variables)
 
         # 5. Perform Regression & Build Results
+        model, poly, r_squared, y_pred = _fit_model(X, y, regression_type)
         if regression_type == "linear":
-            X_with_const = sm.add_constant(X)
-            model = sm.OLS(y, X_with_const).fit()
-            r_squared = float(model.rsquared)
             
             # Enhanced interpretation with multi-region context
             if is_multi_region:
@@ -1238,16 +1650,6 @@ def regression_analysis():
             }
 
         else:  # Non-linear regression (polynomial)
-            from sklearn.preprocessing import PolynomialFeatures
-            from sklearn.linear_model import LinearRegression
-            from sklearn.metrics import r2_score
-            
-            poly = PolynomialFeatures(degree=2)
-            X_poly = poly.fit_transform(X)
-            model = LinearRegression().fit(X_poly, y)
-            y_pred = model.predict(X_poly)
-            r_squared = float(r2_score(y, y_pred))
-
             # Enhanced interpretation for polynomial regression with multi-region support
             if is_multi_region:
                 interpretation = _generate_multi_region_polynomial_interpretation(
@@ -1273,8 +1675,21 @@ def regression_analysis():
                 }
             }
         
-        # 6. Final JSON Response
+        # 6. Simpan model ke registry agar /predict tidak perlu fit ulang
+        try:
+            model_record = model_registry.register_model(
+                model, variables, cities, regression_type, analysis_type,
+                X, y, r_squared, poly=poly
+            )
+            model_id = model_record.id
+        except Exception as e:
+            db.session.rollback()
+            app.logger.error(f"Failed to register regression model: {e}")
+            model_id = None
+
+        # 7. Final JSON Response
         final_response = {
+            "model_id": model_id,
             "analysis_mode": "multi_region" if is_multi_region else "single_region",
             "regions": cities,
             "region_count": len(cities),
@@ -1289,6 +1704,7 @@ def regression_analysis():
             **results
         }
 
+        analysis_cache.set(cache_key, final_response)
         return jsonify(final_response)
 
     except Exception as e:
@@ -1333,15 +1749,254 @@ def _validate_request(data):
     except Exception as e:
         return f"Validation error: {str(e)}", None
 
+
+def _parse_model_id(value):
+    """Registry id as int, or None when it is missing or not an integer"""
+    if isinstance(value, bool):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_number(value):
+    """Finite float, or None for booleans, non-numeric strings, NaN and infinity"""
+    if isinstance(value, bool):
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if np.isfinite(number) else None
+
+
+def _predict_from_registry(data):
+    """
+    Score a model registered by /api/analysis. Inputs come from `values`
+    (independent variable -> number) or, for single-variable models, from
+    `independent_value`.
+    """
+    model_id = _parse_model_id(data.get("model_id"))
+    if model_id is None:
+        return jsonify({"error": "Parameter 'model_id' must be an integer"}), 400
+
+    fitted = model_registry.get_model(model_id)
+    if fitted is None:
+        return jsonify({"error": f"Model {data['model_id']} not found"}), 404
+
+    values = data.get("values")
+    if values is None and len(fitted.independent_variables) == 1 and data.get("independent_value") is not None:
+        values = {fitted.independent_variables[0]: data["independent_value"]}
+
+    if not isinstance(values, dict):
+        return jsonify({
+            "error": "Parameter 'values' must map each independent variable to a number",
+            "independent_variables": fitted.independent_variables
+        }), 400
+
+    missing = [var for var in fitted.independent_variables if var not in values]
+    if missing:
+        return jsonify({"error": f"Missing values for: {', '.join(missing)}"}), 400
+
+    x = [_parse_number(values[var]) for var in fitted.independent_variables]
+    invalid = [var for var, value in zip(fitted.independent_variables, x) if value is None]
+    if invalid:
+        return jsonify({"error": f"Values must be numbers for: {', '.join(invalid)}"}), 400
+
+    predicted_value = float(fitted.predict([x])[0])
+
+    return jsonify({
+        "model_id": fitted.id,
+        "model": fitted.info,
+        "predictions": {
+            "independent_variables": {var: values[var] for var in fitted.independent_variables},
+            "dependent_variable": {
+                "name": fitted.dependent_variable,
+                "predicted_value": predicted_value
+            },
+            "confidence_metrics": {
+                "r_squared": fitted.r_squared,
+            }
+        }
+    })
+
+
+def _batch_inputs(data, independent_vars):
+    """Build the (n, k) input matrix from `values` arrays or a `grid` specification"""
+    grid = data.get("grid")
+    if grid is not None:
+        axes = []
+        for var in independent_vars:
+            spec = grid.get(var)
+            if spec is None:
+                raise ValueError(f"Missing grid specification for: {var}")
+            if isinstance(spec, list):
+                axes.append(np.asarray(spec, dtype=float))
+            else:
+                axes.append(np.linspace(float(spec["start"]), float(spec["stop"]), int(spec.get("num", 50))))
+        mesh = np.meshgrid(*axes, indexing="ij")
+        return np.column_stack([m.ravel() for m in mesh])
+
+    values = data.get("values")
+    if isinstance(values, list) and len(independent_vars) == 1:
+        values = {independent_vars[0]: values}
+    if not isinstance(values, dict):
+        raise ValueError("Provide 'values' (variable -> list of numbers) or a 'grid' specification")
+
+    missing = [var for var in independent_vars if var not in values]
+    if missing:
+        raise ValueError(f"Missing values for: {', '.join(missing)}")
+
+    columns = [np.asarray(values[var], dtype=float).ravel() for var in independent_vars]
+    if len({len(col) for col in columns}) != 1:
+        raise ValueError("All value arrays must have the same length")
+    return np.column_stack(columns)
+
+
+def _city_models(data):
+    """One fitted model per city, reused from the registry while the data version is unchanged"""
+    error_message, variables = _validate_request(data)
+    if error_message:
+        raise ValueError(error_message)
+
+    regression_type = data["regression_type"]
+    cities = data["cities"]
+    if data_cache.enabled:
+        data_cache.snapshot()
+    region_frames = None
+
+    models, skipped = [], []
+    for city in cities:
+        cache_key = make_key({
+            "kind": "city_model",
+            "city": city,
+            "variables": variables,
+            "regression_type": regression_type,
+        }, data_cache.version)
+        model_id = analysis_cache.get(cache_key)
+        fitted = model_registry.get_model(model_id) if model_id else None
+
+        if fitted is None:
+            if region_frames is None:
+                region_frames = _fetch_and_prepare_data(variables, cities)
+            frame = region_frames.get(city)
+            if frame is None or len(frame) < 2:
+                skipped.append(city)
+                continue
+            X = frame[variables[:-1]].values
+            y = frame[variables[-1]].values
+            model, poly, r_squared, _ = _fit_model(X, y, regression_type)
+            record = model_registry.register_model(
+                model, variables, [city], regression_type, data["analysis_type"],
+                X, y, r_squared, poly=poly
+            )
+            fitted = model_registry.get_model(record.id)
+            analysis_cache.set(cache_key, record.id)
+
+        models.append((city, fitted))
+
+    return models, skipped
+
+
+def _nan_to_none(values):
+    return [None if np.isnan(v) else float(v) for v in values]
+
+
+@app.route("/predict/batch", methods=["POST"])
+def predict_batch():
+    """
+    Batch prediction scored in one vectorised pass.
+    Models: `model_id`, a list of `model_ids`, or `cities` plus the same
+    variable/regression fields as /api/analysis (one model fitted per city).
+    Inputs: `values` (variable -> list) or `grid` (variable -> {start, stop, num}
+    or explicit list; the cartesian product is scored).
+    Optional `confidence_level` (default 0.95).
+    """
+    try:
+        data = request.get_json() or {}
+        confidence_level = float(data.get("confidence_level", 0.95))
+        if not 0 < confidence_level < 1:
+            return jsonify({"error": "confidence_level must be between 0 and 1"}), 400
+
+        skipped = []
+        if data.get("model_id") is not None or data.get("model_ids"):
+            model_ids = data.get("model_ids") or [data["model_id"]]
+            if not isinstance(model_ids, list):
+                return jsonify({"error": "Parameter 'model_ids' must be a list of integers"}), 400
+            models = []
+            for model_id in model_ids:
+                parsed_id = _parse_model_id(model_id)
+                if parsed_id is None:
+                    return jsonify({"error": f"Invalid model id: {model_id}"}), 400
+                fitted = model_registry.get_model(parsed_id)
+                if fitted is None:
+                    return jsonify({"error": f"Model {model_id} not found"}), 404
+                models.append((None, fitted))
+        elif data.get("cities"):
+            models, skipped = _city_models(data)
+        else:
+            return jsonify({"error": "Provide model_id, model_ids, or cities"}), 400
+
+        if not models:
+            return jsonify({"error": "No model could be fitted for the selected cities", "skipped_cities": skipped}), 404
+
+        independent_vars = models[0][1].independent_variables
+        X = _batch_inputs(data, independent_vars)
+        if len(X) > app.config["PREDICT_BATCH_MAX_ROWS"]:
+            return jsonify({"error": f"Too many input rows (max {app.config['PREDICT_BATCH_MAX_ROWS']})"}), 400
+
+        scored = model_registry.score_batch([fitted for _, fitted in models], X, confidence_level)
+
+        results = []
+        for j, (city, fitted) in enumerate(models):
+            results.append({
+                "model_id": fitted.id,
+                "city": city if city is not None else (fitted.info["cities"][0] if len(fitted.info["cities"]) == 1 else None),
+                "cities": fitted.info["cities"],
+                "r_squared": fitted.r_squared,
+                "predicted_values": _nan_to_none(scored["predicted"][:, j]),
+                "confidence_interval": {
+                    "lower": _nan_to_none(scored["ci_lower"][:, j]),
+                    "upper": _nan_to_none(scored["ci_upper"][:, j]),
+                },
+                "prediction_interval": {
+                    "lower": _nan_to_none(scored["pi_lower"][:, j]),
+                    "upper": _nan_to_none(scored["pi_upper"][:, j]),
+                },
+            })
+
+        return jsonify({
+            "independent_variables": independent_vars,
+            "dependent_variable": models[0][1].dependent_variable,
+            "confidence_level": confidence_level,
+            "inputs": {var: X[:, i].tolist() for i, var in enumerate(independent_vars)},
+            "results": results,
+            "skipped_cities": skipped,
+        })
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        import traceback
+        print(traceback.format_exc())
+        return jsonify({"error": str(e)}), 500
+
     
 @app.route("/predict", methods=["POST"])
 def predict_values():
     """
     Endpoint for making predictions based on regression analysis.
     Supports both single-variable and multi-variable predictions.
+    When `model_id` is given, the model registered by /api/analysis is used
+    instead of refitting from historical data.
     """
     try:
         data = request.get_json()
+
+        if data.get("model_id") is not None:
+            return _predict_from_registry(data)
+
         city = data.get("city")
         analysis_type = data.get("analysis_type")
         # prediction_year = data.get("prediction_year")
@@ -1435,27 +2090,22 @@ def export_custom_template():
         if not all([regency_ids, categories, start_year, end_year]):
             return jsonify({"error": "Missing required filters"}), 400
 
-        # Fetch regencies dengan province (gunakan joinedload untuk efisiensi)
-        regencies = (
-            db.session.query(Regency)
-            .options(joinedload(Regency.province))
-            .filter(Regency.id.in_(regency_ids))
-            .all()
-        )
+        # Regency dan province dari registry geografi
+        regencies = [r for r in (geography.regency(rid) for rid in regency_ids) if r]
         
         if not regencies:
             return jsonify({"error": "No valid regencies found"}), 400
 
         # Buat mapping untuk regency data
-        regency_data = {
-            r.id: {
-                'regency_id': r.id,
-                'regency_name': r.name,
-                'province_id': r.province_id,
-                'province_name': r.province.name if r.province else ''
+        regency_data = {}
+        for r in regencies:
+            province = geography.province(r['province_id'])
+            regency_data[r['id']] = {
+                'regency_id': r['id'],
+                'regency_name': r['name'],
+                'province_id': r['province_id'],
+                'province_name': province['name'] if province else ''
             }
-            for r in regencies
-        }
 
         rows = []
         for regency_id in regency_ids:
@@ -1518,168 +2168,211 @@ def export_custom_template():
         return jsonify({"error": "Failed to generate custom template."}), 500
 
 
+UPLOAD_REQUIRED_COLUMNS = ['regency_id', 'province_id', 'year', 'amount', 'category']
+
+
+def _normalize_upload_header(header):
+    """Normalisasi nama kolom dari baris pertama sheet"""
+    if header is None:
+        return []
+    return [str(c).strip().lower() if c is not None else f'unnamed_{i}' for i, c in enumerate(header)]
+
+
+def _iter_upload_chunks(rows, columns, chunk_size):
+    """Yield DataFrames of at most chunk_size rows from a read-only worksheet row iterator"""
+    offset = 0
+    chunk = []
+    for row in rows:
+        if row is None or all(v is None for v in row):
+            continue
+        row = tuple(row[:len(columns)])
+        chunk.append(row + (None,) * (len(columns) - len(row)))
+        if len(chunk) >= chunk_size:
+            yield pd.DataFrame(chunk, columns=columns, index=range(offset, offset + len(chunk)))
+            offset += len(chunk)
+            chunk = []
+    if chunk:
+        yield pd.DataFrame(chunk, columns=columns, index=range(offset, offset + len(chunk)))
+
+
+def _ingest_upload_chunk(df, state):
+    """Validate, resolve and write one chunk of an upload; counters are accumulated in state"""
+    # Anggap string kosong/whitespace sebagai NA
+    df = df.replace(r'^\s*$', pd.NA, regex=True)
+
+    # Bersihkan kolom string
+    df['category'] = df['category'].astype('string').str.strip()
+
+    # Pastikan numeric, yang tidak bisa dikonversi jadi NaN
+    df['regency_id'] = pd.to_numeric(df['regency_id'], errors='coerce')
+    df['province_id'] = pd.to_numeric(df['province_id'], errors='coerce')
+    df['year'] = pd.to_numeric(df['year'], errors='coerce')
+    df['amount'] = pd.to_numeric(df['amount'], errors='coerce')
+
+    # Validasi per-baris: wajib terisi
+    missing_mask = (
+        df['regency_id'].isna() |
+        df['province_id'].isna() |
+        df['year'].isna() |
+        df['amount'].isna() |
+        df['category'].isna()
+    )
+
+    skipped_count = int(missing_mask.sum())
+    state['skipped_missing'] += skipped_count
+
+    # Opsional: contoh baris yang di-skip (maks 5) untuk debugging
+    if skipped_count > 0 and len(state['skipped_examples']) < 5:
+        sample = df.loc[missing_mask, UPLOAD_REQUIRED_COLUMNS].head(5 - len(state['skipped_examples'])).copy()
+        sample = sample.assign(row=lambda x: x.index)
+        sample = sample.astype(object).where(sample.notna(), None)
+        state['skipped_examples'].extend(sample.to_dict(orient='records'))
+
+    valid_df = df.loc[~missing_mask].copy()
+    if valid_df.empty:
+        return
+
+    # Validasi regency_id dan province_id terhadap registry geografi di memori
+    invalid_location_mask = (
+        ~valid_df['regency_id'].astype(int).isin(list(geography.regency_ids())) |
+        ~valid_df['province_id'].astype(int).isin(list(geography.province_ids()))
+    )
+
+    state['skipped_location'] += int(invalid_location_mask.sum())
+    valid_df = valid_df.loc[~invalid_location_mask].copy()
+    if valid_df.empty:
+        return
+    state['valid_rows'] += len(valid_df)
+
+    # Kategori
+    existing_categories_map = state['categories']
+    unique_categories = [name for name in valid_df['category'].unique().tolist() if name not in existing_categories_map]
+    if unique_categories:
+        existing_categories = Category.query.filter(Category.name.in_(unique_categories)).all()
+        existing_categories_map.update({cat.name: cat.id for cat in existing_categories})
+
+    new_category_names = [name for name in unique_categories if name not in existing_categories_map]
+    if new_category_names:
+        new_categories_obj = [Category(name=name) for name in new_category_names]
+        db.session.bulk_save_objects(new_categories_obj, return_defaults=True)
+        db.session.commit()
+        category_cache.invalidate()
+        table_versions.bump("categories")
+        for cat in new_categories_obj:
+            existing_categories_map[cat.name] = cat.id
+
+    # Kolom kunci sebagai integer, kategori di-resolve ke id
+    valid_df['regency_id'] = valid_df['regency_id'].astype('int64')
+    valid_df['province_id'] = valid_df['province_id'].astype('int64')
+    valid_df['year'] = valid_df['year'].astype('int64')
+    valid_df['amount'] = valid_df['amount'].astype('float64')
+    valid_df['category_id'] = valid_df['category'].map(existing_categories_map).astype('int64')
+
+    # Baris duplikat dalam upload: nilai terakhir yang dipakai
+    key_columns = list(data_store.UPSERT_KEY)
+    valid_df = valid_df.drop_duplicates(key_columns, keep='last')
+
+    # Kunci eksisting yang relevan, hanya untuk menghitung insert vs update
+    data_table = Data.__table__
+    existing_rows = db.session.execute(
+        select(*[data_table.c[column] for column in key_columns])
+        .where(
+            data_table.c.regency_id.in_(valid_df['regency_id'].unique().tolist()),
+            data_table.c.year.in_(valid_df['year'].unique().tolist()),
+            data_table.c.category_id.in_(valid_df['category_id'].unique().tolist())
+        )
+    ).all()
+    existing_df = pd.DataFrame(existing_rows, columns=key_columns).astype('int64')
+
+    plan = valid_df.merge(existing_df, on=key_columns, how='left', indicator=True)
+    updated_count = int((plan['_merge'] == 'both').sum())
+
+    # Tulis semua baris dengan upsert native per batch
+    data_store.upsert_data(
+        valid_df[['regency_id', 'province_id', 'year', 'amount', 'category_id']].to_dict(orient='records')
+    )
+
+    db.session.commit()
+    state['inserted'] += len(valid_df) - updated_count
+    state['updated'] += updated_count
+
+
 @app.route('/api/upload', methods=['POST'])
 def upload_excel():
+    """
+    Import an .xlsx sheet (regency_id, province_id, year, amount, category).
+    The workbook is streamed in read-only mode and written in chunks of
+    UPLOAD_CHUNK_SIZE rows, each committed separately, so memory use does
+    not grow with file size.
+    """
     if 'file' not in request.files:
         return jsonify({"error": "No file part"}), 400
     file = request.files['file']
     if file.filename == '' or not file.filename.endswith('.xlsx'):
         return jsonify({"error": "No selected file or invalid file type (.xlsx required)"}), 400
 
-    try:
-        # Baca Excel
-        df = pd.read_excel(io.BytesIO(file.read()), engine='openpyxl')
-
-        # Normalisasi nama kolom
-        df.columns = df.columns.str.strip().str.lower()
-
-        # Required columns - nama kolom hanya untuk referensi, bukan untuk penyimpanan
-        required_columns = ['regency_id', 'province_id', 'year', 'amount', 'category']
-        if not set(required_columns).issubset(df.columns):
-            return jsonify({"error": f"Missing required columns: {', '.join(required_columns)}"}), 400
-
-        # Anggap string kosong/whitespace sebagai NA
-        df = df.replace(r'^\s*$', pd.NA, regex=True)
-
-        # Bersihkan kolom string
-        df['category'] = df['category'].astype('string').str.strip()
-
-        # Pastikan numeric, yang tidak bisa dikonversi jadi NaN
-        df['regency_id'] = pd.to_numeric(df['regency_id'], errors='coerce')
-        df['province_id'] = pd.to_numeric(df['province_id'], errors='coerce')
-        df['year'] = pd.to_numeric(df['year'], errors='coerce')
-        df['amount'] = pd.to_numeric(df['amount'], errors='coerce')
-
-        # Validasi per-baris: wajib terisi
-        missing_mask = (
-            df['regency_id'].isna() |
-            df['province_id'].isna() |
-            df['year'].isna() |
-            df['amount'].isna() |
-            df['category'].isna()
-        )
-
-        skipped_count = int(missing_mask.sum())
-        valid_df = df.loc[~missing_mask].copy()
-
-        # Jika tidak ada baris valid, hentikan
-        if valid_df.empty:
-            return jsonify({
-                "error": "Tidak ada baris valid untuk diproses.",
-                "skipped_rows": skipped_count
-            }), 400
+    state = {
+        'inserted': 0,
+        'updated': 0,
+        'valid_rows': 0,
+        'skipped_missing': 0,
+        'skipped_location': 0,
+        'skipped_examples': [],
+        'categories': {},
+    }
 
-        # Validasi regency_id dan province_id ada di database
-        regency_ids_in_file = valid_df['regency_id'].astype(int).unique().tolist()
-        province_ids_in_file = valid_df['province_id'].astype(int).unique().tolist()
+    workbook = None
+    try:
+        # Baca Excel secara streaming (read-only), tidak memuat seluruh file ke memori
+        workbook = openpyxl.load_workbook(file.stream, read_only=True, data_only=True)
+        worksheet = workbook.active
 
-        existing_regencies = Regency.query.filter(Regency.id.in_(regency_ids_in_file)).all()
-        existing_regency_ids = {r.id for r in existing_regencies}
+        rows = worksheet.iter_rows(values_only=True)
+        columns = _normalize_upload_header(next(rows, None))
+        if not set(UPLOAD_REQUIRED_COLUMNS).issubset(columns):
+            return jsonify({"error": f"Missing required columns: {', '.join(UPLOAD_REQUIRED_COLUMNS)}"}), 400
 
-        existing_provinces = Province.query.filter(Province.id.in_(province_ids_in_file)).all()
-        existing_province_ids = {p.id for p in existing_provinces}
+        try:
+            for chunk_df in _iter_upload_chunks(rows, columns, app.config["UPLOAD_CHUNK_SIZE"]):
+                _ingest_upload_chunk(chunk_df, state)
+        finally:
+            if state['inserted'] or state['updated']:
+                _invalidate_data_caches()
 
-        # Filter baris dengan regency_id dan province_id yang valid
-        invalid_location_mask = (
-            ~valid_df['regency_id'].astype(int).isin(existing_regency_ids) |
-            ~valid_df['province_id'].astype(int).isin(existing_province_ids)
-        )
-        
-        invalid_location_count = int(invalid_location_mask.sum())
-        valid_df = valid_df.loc[~invalid_location_mask].copy()
+        total_skipped = state['skipped_missing'] + state['skipped_location']
 
-        if valid_df.empty:
+        # Jika tidak ada baris valid, hentikan
+        if state['valid_rows'] == 0:
+            if state['skipped_location'] == 0:
+                return jsonify({
+                    "error": "Tidak ada baris valid untuk diproses.",
+                    "skipped_rows": total_skipped
+                }), 400
             return jsonify({
                 "error": "Tidak ada baris dengan regency_id atau province_id yang valid.",
-                "skipped_rows": skipped_count + invalid_location_count
+                "skipped_rows": total_skipped
             }), 400
 
-        # Kategori
-        unique_categories = valid_df['category'].unique().tolist()
-        existing_categories = Category.query.filter(Category.name.in_(unique_categories)).all()
-        existing_categories_map = {cat.name: cat.id for cat in existing_categories}
-
-        new_category_names = [name for name in unique_categories if name not in existing_categories_map]
-        if new_category_names:
-            new_categories_obj = [Category(name=name) for name in new_category_names]
-            db.session.bulk_save_objects(new_categories_obj, return_defaults=True)
-            db.session.commit()
-            for cat in new_categories_obj:
-                existing_categories_map[cat.name] = cat.id
-
-        # Data eksisting yang relevan
-        regency_ids = valid_df['regency_id'].astype(int).unique().tolist()
-        years_in_file = valid_df['year'].astype(int).unique().tolist()
-
-        existing_data = (
-            db.session.query(Data)
-            .options(joinedload(Data.category))
-            .filter(
-                Data.regency_id.in_(regency_ids),
-                Data.year.in_(years_in_file),
-                Data.category_id.in_(existing_categories_map.values())
-            )
-            .all()
-        )
-
-        # Peta eksisting: gunakan tuple key agar aman
-        existing_data_map = {(d.regency_id, d.year, d.category.name): d for d in existing_data}
-
-        # Siapkan update/insert
-        to_update = []
-        to_insert = []
-
-        for _, row in valid_df.iterrows():
-            key = (int(row['regency_id']), int(row['year']), row['category'])
-            if key in existing_data_map:
-                existing_record = existing_data_map[key]
-                to_update.append({
-                    'id': existing_record.id,
-                    'amount': float(row['amount'])
-                })
-            else:
-                to_insert.append(
-                    Data(
-                        regency_id=int(row['regency_id']),
-                        province_id=int(row['province_id']),
-                        year=int(row['year']),
-                        amount=float(row['amount']),
-                        category_id=existing_categories_map[row['category']]
-                    )
-                )
-
-        if to_update:
-            db.session.bulk_update_mappings(Data, to_update)
-        if to_insert:
-            db.session.bulk_save_objects(to_insert)
-
-        db.session.commit()
-
-        total_skipped = skipped_count + invalid_location_count
         message = (
-            f"Upload complete. {len(to_insert)} records inserted, "
-            f"{len(to_update)} records updated, {total_skipped} rows skipped."
+            f"Upload complete. {state['inserted']} records inserted, "
+            f"{state['updated']} records updated, {total_skipped} rows skipped."
         )
 
-        # Opsional: contoh baris yang di-skip (maks 5) untuk debugging
-        skipped_examples = []
-        if skipped_count > 0:
-            sample = df.loc[missing_mask, required_columns].head(5).copy()
-            sample = sample.assign(row=lambda x: x.index)
-            skipped_examples = sample.to_dict(orient='records')
-
         return jsonify({
             "message": message,
-            "inserted": len(to_insert),
-            "updated": len(to_update),
+            "inserted": state['inserted'],
+            "updated": state['updated'],
             "skipped_rows": total_skipped,
-            "skipped_examples": skipped_examples
+            "skipped_examples": state['skipped_examples']
         }), 200
 
     except Exception as e:
         db.session.rollback()
         app.logger.error(f"Upload failed: {e}")
         return jsonify({"error": "An internal error occurred during file processing."}), 500
+    finally:
+        if workbook is not None:
+            workbook.close()
 
 # --- Ambil provinsi berdasarkan tahun ---
 @app.route("/api/provinsi", methods=["GET"])
@@ -1718,6 +2411,7 @@ def get_pemda():
     return jsonify(resp.json())
 
 @app.route("/api/scrape-apbd", methods=["POST"])
+@scrape_jobs.background("scrape_apbd")
 def scrape_apbd_api():
     """
     Body JSON:
@@ -1726,9 +2420,11 @@ def scrape_apbd_api():
         "end_year": 2022,
         "periode": 1,
         "provinsi": "Daerah Istimewa Yogyakarta",
-        "pemda_code": "34.71",
+        "pemda_code": "34.71",          # atau daftar: ["05", "03"]
         "category_id": 12
     }
+    Semua (tahun, pemda) diambil paralel dengan batas APBD_SCRAPE_WORKERS
+    dan APBD_RATE_LIMIT.
     """
     try:
         data = request.get_json()
@@ -1744,65 +2440,51 @@ def scrape_apbd_api():
             return jsonify({"error": "Parameter wajib harus diisi"}), 400
 
         keyword_row = helper.get_category_keywords().get(category_id)
-        pemda_name = helper.get_pemda_names().get(pemda_code, None)
+        pemda_codes = pemda_code if isinstance(pemda_code, list) else [pemda_code]
+        pemda_names = helper.get_pemda_names()
 
 
         if not keyword_row:
             return jsonify({"error": "Category tidak valid atau belum terdaftar"}), 400
 
-        all_data = []
-        for year in range(int(start_year), int(end_year)+1):
-            try:
-                df_list = apbd.scrape_apbd(
-                    periode, year, provinsi, pemda_code, pemda_name=pemda_name,
-                    keyword_row=keyword_row
-                )
-                if df_list:
-                    all_data.extend(df_list)
-            except Exception as e:
-                print(f"❌ Gagal scrape tahun {year}: {e}")
+        all_data, failed = apbd.scrape_apbd_many(
+            periode, range(int(start_year), int(end_year) + 1), provinsi,
+            [(code, pemda_names.get(code, None)) for code in pemda_codes],
+            keyword_row=keyword_row
+        )
 
         if not all_data:
-            return jsonify({"message": "Data tidak ditemukan"}), 404
+            return jsonify({"message": "Data tidak ditemukan", "failed": failed}), 404
 
-        # simpan ke database dengan insert or update
-        saved_data = []
+        # simpan ke database dengan insert or update (satu upsert per batch)
+        rows = []
         for row in all_data:
             amount = row.get("anggaran/pagu") or row.get("amount")
             if amount is not None:
                 # konversi string ke float, contoh '1.885,42 M' => 1885420000
                 amount = helper.parse_amount(amount)
 
-            city = row.get("pemda_name") or row.get("pemda")
-            year_row = row.get("tahun") or year
-
-            # cek apakah data sudah ada
-            existing = Data.query.filter_by(
-                year=year_row,
-                province_id=provinsi,
-                regency_id=pemda_code,
-                category_id=category_id
-            ).first()
-
-            if existing:
-                existing.amount = amount  # update jika ada
-                db.session.add(existing)
-                saved_data.append(existing)
-            else:
-                data_entry = Data(
-                    amount=amount,
-                    year=year_row,
-                    city=city,
-                    category_id=category_id,
-                    province_id=provinsi,
-                    regency_id=pemda_code
-                )
-                db.session.add(data_entry)
-                saved_data.append(data_entry)
+            rows.append({
+                "amount": amount,
+                "year": row.get("tahun"),
+                "city": row.get("pemda_name") or row.get("pemda"),
+                "category_id": category_id,
+                "province_id": provinsi,
+                "regency_id": row.get("pemda")
+            })
 
+        data_store.upsert_data(rows)
         db.session.commit()
+        _invalidate_data_caches()
 
-        return jsonify({"data": [d.json() for d in saved_data]}), 200
+        saved_data = Data.query.filter(
+            Data.category_id == category_id,
+            Data.province_id == provinsi,
+            Data.regency_id.in_(pemda_codes),
+            Data.year.in_(list({r["year"] for r in rows}))
+        ).order_by(Data.regency_id.asc(), Data.year.asc()).all()
+
+        return jsonify({"data": [d.json() for d in saved_data], "failed": failed}), 200
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -1810,16 +2492,32 @@ def scrape_apbd_api():
 
 # API endpoints for provinces and regencies
 @app.route("/api/provinces", methods=["GET"])
+@conditional("geography")
 def get_provinces():
     """
     Get all provinces data
-    Returns list of provinces with their codes and names
+    Returns list of provinces with their codes and names, served from the
+    geography registry. Scraping BPS happens only via POST
+    /api/scrape-provinces-regencies, or in the background when the tables
+    are still empty.
     """
     try:
-        provinces, regencies = get_latest_provinces_regencies_data()
+        snapshot = geography.snapshot()
+
+        if not snapshot.provinces:
+            # Belum ada data: mulai satu refresh di background, jangan scrape di request GET
+            refresh_provinces_regencies(app)
+            response = jsonify({
+                "error": "Provinces data is not available yet, a refresh has been started",
+                "refresh": refresh_status()
+            })
+            response.headers["Retry-After"] = "30"
+            return response, 503
 
-        if not provinces:
-            return jsonify({"error": "Failed to fetch provinces data"}), 500
+        provinces = [
+            {"id": str(province_id), "name": snapshot.provinces[province_id]["name"]}
+            for province_id in sorted(snapshot.provinces)
+        ]
 
         return jsonify({
             "message": "Provinces data retrieved successfully",
@@ -1832,6 +2530,7 @@ def get_provinces():
         return jsonify({"error": f"Internal server error: {str(e)}"}), 500
 
 @app.route("/api/regencies", methods=["GET"])
+@conditional("geography")
 def get_regencies():
     """
     Get regencies data for a specific province
@@ -1846,28 +2545,17 @@ def get_regencies():
             return jsonify({"error": "Parameter 'province_id' is required"}), 400
 
         # Validate province exists
-        province = Province.query.filter_by(id=province_id).first()
+        province = geography.province(int(province_id)) if province_id.isdigit() else None
         if not province:
             return jsonify({"error": f"Province with id {province_id} not found"}), 404
 
-        # Get regencies for the province
-        regencies = Regency.query.filter_by(province_id=province_id).all()
-
-        # Convert to dict
-        regencies_data = [{
-            "id": r.id,
-            "province_id": r.province_id,
-            "name": r.name,
-            "province_bps_code": r.province_bps_code,
-            "province_kemenkeu_code": r.province_kemenkeu_code,
-            "created_at": r.created_at.strftime("%Y-%m-%d %H:%M:%S"),
-            "updated_at": r.updated_at.strftime("%Y-%m-%d %H:%M:%S")
-        } for r in regencies]
+        # Regencies dari registry geografi
+        regencies_data = geography.regencies_of(province["id"])
 
         return jsonify({
             "message": f"Regencies data for province {province_id} retrieved successfully",
             "province_id": province_id,
-            "province_name": province.name,
+            "province_name": province["name"],
             "data": regencies_data,
             "count": len(regencies_data)
         }), 200
@@ -1877,78 +2565,77 @@ def get_regencies():
         return jsonify({"error": f"Internal server error: {str(e)}"}), 500
 
 
+def _build_provinces_regencies_tree():
+    """Provinces with nested regencies, built from the in-memory geography registry"""
+    snapshot = geography.snapshot()
+    provinces_data = []
+    for province_id in sorted(snapshot.provinces):
+        province = snapshot.provinces[province_id]
+        regencies_data = geography.regencies_of(province_id)
+        provinces_data.append({
+            "id": province["id"],
+            "name": province["name"],
+            "bps_code": province["bps_code"],
+            "kemenkeu_code": province["kemenkeu_code"],
+            "created_at": province["created_at"],
+            "updated_at": province["updated_at"],
+            "regencies": regencies_data,
+            "regencies_count": len(regencies_data)
+        })
+
+    if not provinces_data:
+        return {
+            "message": "No provinces found",
+            "data": [],
+            "summary": {
+                "total_provinces": 0,
+                "total_regencies": 0
+            }
+        }
+
+    return {
+        "message": "Provinces and regencies data retrieved successfully",
+        "data": provinces_data,
+        "summary": {
+            "total_provinces": len(provinces_data),
+            "total_regencies": sum(p["regencies_count"] for p in provinces_data)
+        }
+    }
+
+
 @app.route("/api/provinces-regencies", methods=["GET"])
+@conditional("geography")
 def get_provinces_with_regencies():
     """
     Get all provinces with their regencies
-    Returns complete data structure with provinces and their associated regencies
+    Returns complete data structure with provinces and their associated regencies.
+    The built tree is cached until the provinces/regencies tables change.
     """
     try:
-        # Get all provinces
-        provinces = Province.query.all()
-
-        if not provinces:
-            return jsonify({
-                "message": "No provinces found",
-                "data": [],
-                "summary": {
-                    "total_provinces": 0,
-                    "total_regencies": 0
-                }
-            }), 200
-
-        # Build response with provinces and their regencies
-        provinces_data = []
-        total_regencies = 0
-
-        for province in provinces:
-            # Get regencies for this province
-            regencies = Regency.query.filter_by(province_id=province.id).all()
-            
-            regencies_data = [{
-                "id": r.id,
-                "province_id": r.province_id,
-                "name": r.name,
-                "province_bps_code": r.province_bps_code,
-                "province_kemenkeu_code": r.province_kemenkeu_code,
-                "created_at": r.created_at.strftime("%Y-%m-%d %H:%M:%S"),
-                "updated_at": r.updated_at.strftime("%Y-%m-%d %H:%M:%S")
-            } for r in regencies]
-
-            provinces_data.append({
-                "id": province.id,
-                "name": province.name,
-                "bps_code": province.bps_code,
-                "kemenkeu_code": province.kemenkeu_code,
-                "created_at": province.created_at.strftime("%Y-%m-%d %H:%M:%S"),
-                "updated_at": province.updated_at.strftime("%Y-%m-%d %H:%M:%S"),
-                "regencies": regencies_data,
-                "regencies_count": len(regencies_data)
-            })
+        cache_key = make_key({"endpoint": "provinces-regencies"}, table_versions.version("geography"))
+        payload = geography_cache.get(cache_key)
+        if payload is None:
+            payload = _build_provinces_regencies_tree()
+            geography_cache.set(cache_key, payload)
 
-            total_regencies += len(regencies_data)
-
-        return jsonify({
-            "message": "Provinces and regencies data retrieved successfully",
-            "data": provinces_data,
-            "summary": {
-                "total_provinces": len(provinces_data),
-                "total_regencies": total_regencies
-            }
-        }), 200
+        return jsonify(payload), 200
 
     except Exception as e:
         logging.error(f"Error in get_provinces_with_regencies endpoint: {str(e)}")
         return jsonify({"error": f"Internal server error: {str(e)}"}), 500
 
 @app.route("/api/scrape-provinces-regencies", methods=["POST"])
+@scrape_jobs.background("scrape_provinces_regencies")
 def scrape_provinces_regencies():
     """
     Manually trigger scraping of provinces and regencies data
-    This endpoint can be used to refresh the data from BPS API
+    This endpoint can be used to refresh the data from BPS API. Concurrent
+    calls share a single refresh. By default (SCRAPE_JOBS_ENABLED) the
+    refresh runs as a background job and 202 is returned with the job's
+    status URL; ?async=false waits for it in the request.
     """
     try:
-        provinces, regencies = get_latest_provinces_regencies_data()
+        provinces, regencies = refresh_provinces_regencies(app, wait=True)
 
         if not provinces or not regencies:
             return jsonify({"error": "Failed to scrape provinces and regencies data"}), 500
@@ -1970,8 +2657,47 @@ def scrape_provinces_regencies():
         return jsonify({"error": f"Internal server error: {str(e)}"}), 500
 
 
+@app.route("/api/jobs/<int:job_id>", methods=["GET"])
+def get_scrape_job(job_id):
+    """Status of a queued scraping job and, once finished, the endpoint's JSON response"""
+    job = db.session.get(ScrapeJob, job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.to_dict()), 200
+
+
+@app.route("/api/jobs", methods=["GET"])
+def list_scrape_jobs():
+    """
+    Recent scraping jobs, newest first (without results)
+    Query parameters:
+    - status: queued | running | succeeded | failed (optional)
+    - kind: endpoint job name (optional)
+    - limit: default 50, max 500
+    """
+    try:
+        limit = min(int(request.args.get("limit", 50)), 500)
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+
+    query = ScrapeJob.query
+    if request.args.get("status"):
+        query = query.filter(ScrapeJob.status == request.args["status"])
+    if request.args.get("kind"):
+        query = query.filter(ScrapeJob.kind == request.args["kind"])
+    jobs = query.order_by(ScrapeJob.id.desc()).limit(limit).all()
+    return jsonify({"data": [job.to_dict(include_result=False) for job in jobs], "count": len(jobs)}), 200
+
+
+@app.route("/api/scrape-provinces-regencies/status", methods=["GET"])
+def scrape_provinces_regencies_status():
+    """Status of the last / running provinces and regencies refresh"""
+    return jsonify(refresh_status()), 200
+
+
 # Database-based endpoints for provinces and regencies
 @app.route("/api/provinces-db", methods=["GET"])
+@conditional("geography")
 def get_provinces_from_db():
     """
     Get all provinces data from database
@@ -1996,6 +2722,7 @@ def get_provinces_from_db():
         return jsonify({"error": f"Internal server error: {str(e)}"}), 500
 
 @app.route("/api/regencies-db", methods=["GET"])
+@conditional("geography")
 def get_regencies_from_db():
     """
     Get regencies data from database
@@ -2025,6 +2752,7 @@ def get_regencies_from_db():
         return jsonify({"error": f"Internal server error: {str(e)}"}), 500
 
 @app.route("/api/provinces-regencies-db", methods=["GET"])
+@conditional("geography")
 def get_provinces_with_regencies_from_db():
     """
     Get all provinces with their regencies from database
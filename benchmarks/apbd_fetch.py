@@ -0,0 +1,75 @@
+"""
+Time scraping.apbd.scrape_apbd_many against a local stub of the DJPK APBD
+page (no network, no database): a multi-year, multi-pemda backfill run on
+one worker (the old serial loop) and on a pool.
+
+    python benchmarks/apbd_fetch.py --years 10 --pemdas 3 --latency 0.3 --workers 1 4
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from scraping import apbd  # noqa: E402
+from scraping.http_client import RateLimiter  # noqa: E402
+
+
+def make_handler(latency):
+    class StubHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            time.sleep(latency)
+            tahun, pemda = query["tahun"][0], query["pemda"][0]
+            rows = "".join(
+                f"<tr><td>{akun}</td><td>{int(tahun) * 1000 + i}</td></tr>"
+                for i, akun in enumerate(["Pendapatan Daerah", "Belanja Daerah", "Pembiayaan Daerah"])
+            )
+            payload = (
+                f"<html><body><h1>{pemda}</h1><table><thead><tr><th>Akun</th><th>Anggaran</th></tr></thead>"
+                f"<tbody>{rows}</tbody></table></body></html>"
+            ).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    return StubHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--pemdas", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--rate", type=float, default=0, help="Requests per second limit (0 disables)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args.latency))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    apbd.APBD_URL = f"http://127.0.0.1:{server.server_address[1]}/portal/data/apbd"
+    apbd._rate_limiter = RateLimiter(args.rate)
+
+    years = range(2024 - args.years, 2024)
+    pemdas = [(f"{i + 1:02d}", f"Pemda {i + 1}") for i in range(args.pemdas)]
+    try:
+        for workers in args.workers:
+            start = time.perf_counter()
+            rows, failed = apbd.scrape_apbd_many(1, years, "34", pemdas, keyword_row="Belanja Daerah",
+                                                 max_workers=workers)
+            elapsed = time.perf_counter() - start
+            print(f"workers={workers:<3} {elapsed:6.2f}s  rows={len(rows)} failed={len(failed)}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Compare extracting every cell of a synthetic national-size BPS payload with
+per-cell composite-key lookups against decoding datacontent once into a
+dense array (scraping/bps_decoder.py). No network.
+
+    python benchmarks/bps_decode.py --regions 514 --years 30 --turvar 3
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from scraping.bps_client import BPSResponse  # noqa: E402
+
+
+def make_payload(n_regions, n_years, n_turvar, var=413):
+    rng = np.random.default_rng(0)
+    vervar = [{"val": 1100 + i, "label": f"WILAYAH {1100 + i}"} for i in range(n_regions)]
+    turvar = [{"val": 340 + t, "label": f"T{t}"} for t in range(n_turvar)]
+    tahun = [{"val": 100 + y, "label": str(2000 + y)} for y in range(n_years)]
+    datacontent = {
+        f"{v['val']}{var}{t['val']}{y['val']}0": round(float(rng.random() * 100), 2)
+        for v in vervar for t in turvar for y in tahun
+        if rng.random() > 0.05  # sebagian sel kosong, seperti data BPS
+    }
+    return {
+        "status": "OK",
+        "var": [{"val": var, "label": "Var"}],
+        "vervar": vervar,
+        "turvar": turvar,
+        "tahun": tahun,
+        "turtahun": [{"val": 0, "label": "Tahun"}],
+        "datacontent": datacontent,
+    }
+
+
+def extract_loop(payload):
+    data = BPSResponse(payload)
+    out = np.full((len(data.vervar), len(data.turvar), len(data.tahun)), np.nan)
+    var = data.var[0]["val"]
+    for i, v in enumerate(data.vervar):
+        for k, t in enumerate(data.turvar):
+            for j, y in enumerate(data.tahun):
+                value = data.value(v["val"], var, t["val"], y["val"], 0)
+                if value is not None:
+                    out[i, k, j] = float(value)
+    return out
+
+
+def extract_decoded(payload):
+    return BPSResponse(payload).table.values[:, 0, :, :, 0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--regions", type=int, default=514)
+    parser.add_argument("--years", type=int, default=30)
+    parser.add_argument("--turvar", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    payload = make_payload(args.regions, args.years, args.turvar)
+    print(f"cells={args.regions * args.years * args.turvar} datacontent={len(payload['datacontent'])}")
+
+    expected = extract_loop(payload)
+    assert np.array_equal(expected, extract_decoded(payload), equal_nan=True)
+
+    for name, fn in (("per-cell lookup", extract_loop), ("decoded", extract_decoded)):
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            fn(payload)
+        elapsed = (time.perf_counter() - start) / args.repeat
+        print(f"{name:<16} {elapsed * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark JSON response encoding for a GET /api/data sized payload.
+
+Builds rows shaped exactly like get_data() output and times
+app.json.response() with the stdlib and the orjson backend of
+FastJSONProvider. No database is needed.
+
+    python benchmarks/json_response.py --rows 100000 --repeat 5
+"""
+import argparse
+import datetime
+import os
+import random
+import sys
+import time
+
+from flask import Flask
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from json_provider import FastJSONProvider, orjson  # noqa: E402
+
+
+def build_payload(n_rows):
+    random.seed(0)
+    category = {"id": 1, "name": "IPM", "created_at": datetime.datetime(2024, 1, 1, 8, 30)}
+    provinces = {pid: {"id": pid, "name": f"PROVINSI {pid}"} for pid in range(11, 95)}
+    rows = []
+    for i in range(n_rows):
+        province_id = random.choice(list(provinces))
+        regency_id = province_id * 100 + random.randint(1, 40)
+        rows.append({
+            "id": i + 1,
+            "year": 2000 + i % 25,
+            "amount": random.random() * 1000,
+            "regency_id": regency_id,
+            "province_id": province_id,
+            "category_id": 1,
+            "category": category,
+            "regency": {"id": regency_id, "name": f"KABUPATEN {regency_id}"},
+            "province": provinces[province_id],
+        })
+    return rows
+
+
+def time_backend(backend, payload, repeat):
+    app = Flask(__name__)
+    app.config["JSON_BACKEND"] = backend
+    app.json = FastJSONProvider(app)
+    timings = []
+    with app.app_context():
+        for _ in range(repeat):
+            start = time.perf_counter()
+            body = app.json.response(payload).get_data()
+            timings.append(time.perf_counter() - start)
+    return min(timings), len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    payload = build_payload(args.rows)
+    stdlib_time, stdlib_size = time_backend("stdlib", payload, args.repeat)
+    print(f"stdlib : {stdlib_time * 1000:8.1f} ms  ({stdlib_size / 1e6:.1f} MB)")
+
+    if orjson is None:
+        print("orjson : not installed")
+        return
+    orjson_time, orjson_size = time_backend("orjson", payload, args.repeat)
+    print(f"orjson : {orjson_time * 1000:8.1f} ms  ({orjson_size / 1e6:.1f} MB)")
+    print(f"speedup: {stdlib_time / orjson_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
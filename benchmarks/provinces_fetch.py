@@ -0,0 +1,88 @@
+"""
+Time ProvincesRegenciesScraper.get_all_provinces_with_regencies against a
+local stub of the BPS getwilayah API (no network, no database).
+
+The stub answers every request after --latency seconds and fails the first
+request for every --flaky-th province with HTTP 503 to exercise retries.
+
+    python benchmarks/provinces_fetch.py --provinces 38 --latency 0.2 --workers 1 8
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from scraping.provinces_regencies_fixed import ProvincesRegenciesScraper  # noqa: E402
+
+
+def make_handler(n_provinces, regencies_per_province, latency, flaky):
+    failed_once = set()
+    lock = threading.Lock()
+
+    class StubHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            level, parent = query.get("level", [""])[0], query.get("parent", ["0"])[0]
+            time.sleep(latency)
+
+            if level == "provinsi":
+                body = [{"kode_bps": str(11 + i), "nama_bps": f"PROVINSI {11 + i}"} for i in range(n_provinces)]
+            else:
+                with lock:
+                    fail = flaky and int(parent) % flaky == 0 and parent not in failed_once
+                    failed_once.add(parent)
+                if fail:
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+                body = [
+                    {"kode_bps": f"{parent}{j + 1:02d}", "nama_bps": f"KABUPATEN {parent}{j + 1:02d}"}
+                    for j in range(regencies_per_province)
+                ]
+
+            payload = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    return StubHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--provinces", type=int, default=38)
+    parser.add_argument("--regencies", type=int, default=15)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--flaky", type=int, default=10, help="Fail every Nth province once (0 disables)")
+    parser.add_argument("--rate", type=float, default=0, help="Requests per second limit (0 disables)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 8])
+    args = parser.parse_args()
+
+    handler = make_handler(args.provinces, args.regencies, args.latency, args.flaky)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        for workers in args.workers:
+            scraper = ProvincesRegenciesScraper(base_url=base_url, max_workers=workers, rate_limit=args.rate)
+            start = time.perf_counter()
+            provinces, regencies = scraper.get_all_provinces_with_regencies()
+            elapsed = time.perf_counter() - start
+            print(f"workers={workers:<3} {elapsed:6.2f}s  provinces={len(provinces)} regencies={len(regencies)}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
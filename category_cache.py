@@ -0,0 +1,63 @@
+import threading
+import time
+
+from models import db, Category
+
+
+class CategoryCache:
+    """
+    Process-wide map of category id -> serialised category.
+
+    Categories are few and rarely change, so they are loaded with one query
+    and every response reuses the same dict per category instead of lazily
+    loading ``Data.category`` and calling ``to_dict()`` per row. Writers call
+    ``invalidate()``; ``ttl`` bounds staleness for writes from other workers.
+    """
+
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        # (by_id, ids_by_name), diganti utuh agar pembaca tidak melihat state setengah jadi
+        self._state = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.ttl = app.config.get("DATA_CACHE_TTL", self.ttl)
+
+    def _is_fresh(self):
+        return self._state is not None and time.monotonic() - self._loaded_at < self.ttl
+
+    def _load(self):
+        state = self._state
+        if state is not None and self._is_fresh():
+            return state
+        with self._lock:
+            if self._is_fresh():
+                return self._state
+            categories = db.session.query(Category).all()
+            by_id = {c.id: c.to_dict() for c in categories}
+            ids_by_name = {}
+            for c in categories:
+                ids_by_name.setdefault(c.name, []).append(c.id)
+            self._state = (by_id, ids_by_name)
+            self._loaded_at = time.monotonic()
+            return self._state
+
+    def all(self):
+        """Return {id: category dict}; the dicts are shared, do not mutate them"""
+        return self._load()[0]
+
+    def ids_by_name(self):
+        return self._load()[1]
+
+    def get(self, category_id):
+        if category_id is None:
+            return None
+        return self.all().get(category_id)
+
+    def invalidate(self):
+        with self._lock:
+            self._state = None
+
+
+category_cache = CategoryCache()
@@ -0,0 +1,128 @@
+import click
+from sqlalchemy import select, text
+
+from models import db, Data
+import data_summary
+from jobs import scrape_jobs
+
+# SQLite tidak memakai nama constraint untuk index unik bawaannya
+UNIQUE_KEY_INDEXES = {"uq_data_category_location_year", "sqlite_autoindex_data_1"}
+
+
+def _endpoint_queries(sample):
+    """Hot queries per endpoint with the indexes each is expected to use"""
+    table = Data.__table__
+    return [
+        (
+            "GET /api/data?regency_id",
+            select(table).where(
+                table.c.category_id == sample["category_id"],
+                table.c.regency_id == sample["regency_id"],
+            ).order_by(table.c.year.asc()),
+            {"ix_data_category_regency_year", *UNIQUE_KEY_INDEXES},
+        ),
+        (
+            "GET /api/data?province_id",
+            select(table).where(
+                table.c.category_id == sample["category_id"],
+                table.c.province_id == sample["province_id"],
+            ).order_by(table.c.year.asc()),
+            {"ix_data_category_province_year"},
+        ),
+        (
+            "POST /api/analysis",
+            select(table.c.category_id, table.c.amount, table.c.year, table.c.city).where(
+                table.c.category_id.in_([sample["category_id"]]),
+                table.c.city.in_([sample["city"]]),
+            ),
+            {"ix_data_city_category_year"},
+        ),
+        (
+            "POST /api/upload (existing keys)",
+            select(table.c.category_id, table.c.regency_id, table.c.province_id, table.c.year).where(
+                table.c.regency_id.in_([sample["regency_id"]]),
+                table.c.year.in_([sample["year"]]),
+                table.c.category_id.in_([sample["category_id"]]),
+            ),
+            {"ix_data_category_regency_year", *UNIQUE_KEY_INDEXES},
+        ),
+        (
+            "scraper legacy city rows (data_store.adopt_city_rows)",
+            select(table.c.id, table.c.category_id, table.c.city, table.c.year).where(
+                table.c.regency_id.is_(None),
+                table.c.category_id.in_([sample["category_id"]]),
+                table.c.city.in_([sample["city"]]),
+                table.c.year.in_([sample["year"]]),
+            ).order_by(table.c.id.desc()),
+            # regency_id IS NULL cukup selektif untuk index regency maupun index kota
+            {"ix_data_city_category_year", "ix_data_category_regency_year", *UNIQUE_KEY_INDEXES},
+        ),
+    ]
+
+
+def _explain(statement):
+    """Run the dialect's EXPLAIN and return (plan lines, index names mentioned)"""
+    dialect = db.engine.dialect
+    sql = str(statement.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+
+    if dialect.name == "sqlite":
+        rows = db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+        lines = [row[-1] for row in rows]
+        return lines, " ".join(lines)
+
+    result = db.session.execute(text(f"EXPLAIN {sql}"))
+    columns = list(result.keys())
+    rows = [dict(zip(columns, row)) for row in result.all()]
+    lines = [", ".join(f"{k}={v}" for k, v in row.items()) for row in rows]
+    return lines, " ".join(str(row.get("key") or row.get("KEY") or "") for row in rows)
+
+
+def register_commands(app):
+    @app.cli.command("explain-queries")
+    @click.option("--category-id", type=int, default=None, help="Sample category (default: taken from the first data row)")
+    def explain_queries(category_id):
+        """EXPLAIN each endpoint's hot query and check the composite indexes are used."""
+        query = Data.query.filter(
+            Data.regency_id.isnot(None), Data.province_id.isnot(None), Data.city.isnot(None)
+        )
+        if category_id:
+            query = query.filter(Data.category_id == category_id)
+        row = query.first()
+        if row is None:
+            raise click.ClickException("No data rows with regency, province and city found; seed the database first")
+
+        sample = {
+            "category_id": row.category_id,
+            "regency_id": row.regency_id,
+            "province_id": row.province_id,
+            "city": row.city,
+            "year": row.year,
+        }
+        click.echo(f"Sample: {sample}")
+
+        failures = 0
+        for name, statement, expected in _endpoint_queries(sample):
+            lines, used = _explain(statement)
+            ok = any(index in used for index in expected)
+            failures += not ok
+            click.echo(f"\n[{'OK' if ok else 'MISSING INDEX'}] {name}  (expects {' or '.join(sorted(expected))})")
+            for line in lines:
+                click.echo(f"    {line}")
+
+        if failures:
+            raise click.ClickException(f"{failures} quer{'y' if failures == 1 else 'ies'} not using the expected index")
+
+    @app.cli.command("rebuild-summary")
+    def rebuild_summary():
+        """Recompute the data_summary table from the data table."""
+        written = data_summary.rebuild_summary()
+        click.echo(f"data_summary rebuilt: {written} rows")
+
+    @app.cli.command("run-scrape-jobs")
+    def run_scrape_jobs():
+        """Run queued scraping jobs in this process (e.g. jobs left queued by a restarted worker)."""
+        stale = scrape_jobs.requeue_stale()
+        if stale:
+            click.echo(f"{stale} stale running job(s) requeued")
+        ran = scrape_jobs.drain()
+        click.echo(f"{ran} job(s) run")
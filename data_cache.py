@@ -0,0 +1,171 @@
+import threading
+import time
+
+import numpy as np
+
+from models import db, Data
+from category_cache import category_cache
+
+# Sentinel untuk kolom integer yang NULL di database
+NULL_ID = -1
+
+INT_COLUMNS = ("id", "year", "regency_id", "province_id", "category_id")
+
+
+def _int_column(values):
+    return np.array([NULL_ID if v is None else v for v in values], dtype=np.int64)
+
+
+def _float_column(values):
+    return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+
+
+class PanelSlice:
+    """Subset of a snapshot selected by an index array"""
+
+    def __init__(self, snapshot, index):
+        self.snapshot = snapshot
+        self.index = index
+
+    def __len__(self):
+        return len(self.index)
+
+    @property
+    def categories(self):
+        return self.snapshot.categories
+
+    def column(self, name):
+        return self.snapshot.columns[name][self.index]
+
+    def after(self, year, data_id):
+        """Keyset filter: rows strictly after (year, id) in the snapshot order"""
+        years = self.column("year")
+        ids = self.column("id")
+        mask = (years > year) | ((years == year) & (ids > data_id))
+        return PanelSlice(self.snapshot, self.index[mask])
+
+    def head(self, n):
+        return PanelSlice(self.snapshot, self.index[:n])
+
+    def records(self, *names):
+        """Return rows as tuples of plain Python values, NULL ids restored to None"""
+        columns = []
+        for name in names:
+            values = self.column(name).tolist()
+            if name in INT_COLUMNS:
+                values = [None if v == NULL_ID else v for v in values]
+            elif name == "amount":
+                values = [None if v != v else v for v in values]
+            columns.append(values)
+        return list(zip(*columns))
+
+
+class PanelSnapshot:
+    """Immutable columnar copy of the ``data`` table, ordered by (year, id)"""
+
+    def __init__(self, rows, categories, category_ids_by_name):
+        columns = list(zip(*rows)) if rows else [()] * 7
+        self.columns = {
+            "id": _int_column(columns[0]),
+            "amount": _float_column(columns[1]),
+            "year": _int_column(columns[2]),
+            "city": np.array(columns[3], dtype=object),
+            "regency_id": _int_column(columns[4]),
+            "province_id": _int_column(columns[5]),
+            "category_id": _int_column(columns[6]),
+        }
+        self.size = len(rows)
+        self.categories = categories
+        self.category_ids_by_name = category_ids_by_name
+
+        # Index posisi baris per category_id; hampir semua query memfilter kategori
+        category = self.columns["category_id"]
+        order = np.argsort(category, kind="stable")
+        keys, starts = np.unique(category[order], return_index=True)
+        self._by_category = dict(zip(keys.tolist(), np.split(order, starts[1:])))
+
+    def select(self, **filters):
+        """
+        Select rows matching every non-None filter. A filter value may be a
+        scalar or a list of accepted values. Row order (year, id) is preserved.
+        """
+        category_id = filters.pop("category_id", None)
+        if category_id is None:
+            index = np.arange(self.size)
+        elif isinstance(category_id, (list, tuple, set)):
+            parts = [self._by_category.get(c) for c in category_id]
+            parts = [p for p in parts if p is not None]
+            index = np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+        else:
+            index = self._by_category.get(category_id, np.empty(0, dtype=np.int64))
+
+        for name, value in filters.items():
+            if value is None or len(index) == 0:
+                continue
+            column = self.columns[name][index]
+            if isinstance(value, (list, tuple, set)):
+                mask = np.isin(column, list(value))
+            else:
+                mask = column == value
+            index = index[mask]
+
+        return PanelSlice(self, index)
+
+
+class DataPanelCache:
+    """
+    Process-wide columnar cache of the ``data`` table.
+
+    The table is loaded once into NumPy arrays and served from memory until a
+    writer calls ``invalidate()`` or the snapshot is older than ``ttl`` seconds
+    (the TTL bounds staleness for writes made by other worker processes).
+    """
+
+    def __init__(self, ttl=300, enabled=True):
+        self.ttl = ttl
+        self.enabled = enabled
+        # Naik setiap kali snapshot di-invalidate atau dimuat ulang
+        self.version = 0
+        self._snapshot = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.ttl = app.config.get("DATA_CACHE_TTL", self.ttl)
+        self.enabled = app.config.get("DATA_CACHE_ENABLED", self.enabled)
+
+    def _is_fresh(self):
+        return self._snapshot is not None and time.monotonic() - self._loaded_at < self.ttl
+
+    def snapshot(self):
+        if self._is_fresh():
+            return self._snapshot
+        with self._lock:
+            if not self._is_fresh():
+                self._snapshot = self._load()
+                self._loaded_at = time.monotonic()
+                # Reload bisa membawa tulisan dari worker lain
+                self.version += 1
+            return self._snapshot
+
+    def _load(self):
+        rows = (
+            db.session.query(
+                Data.id, Data.amount, Data.year, Data.city,
+                Data.regency_id, Data.province_id, Data.category_id
+            )
+            .order_by(Data.year.asc(), Data.id.asc())
+            .all()
+        )
+        return PanelSnapshot(rows, category_cache.all(), category_cache.ids_by_name())
+
+    def select(self, **filters):
+        return self.snapshot().select(**filters)
+
+    def invalidate(self):
+        with self._lock:
+            self._snapshot = None
+            self.version += 1
+
+
+data_cache = DataPanelCache()
@@ -0,0 +1,195 @@
+from sqlalchemy import select, bindparam, func
+from sqlalchemy.dialects import mysql, sqlite, postgresql
+
+from models import db, Data
+from data_summary import mark_dirty
+
+# Kunci unik baris data (lihat uq_data_category_location_year)
+UPSERT_KEY = ("category_id", "regency_id", "province_id", "year")
+UPSERT_COLUMNS = ("amount", "year", "city", "category_id", "regency_id", "province_id")
+BATCH_SIZE = 1000
+
+
+def _batches(rows, size):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def _normalize(row):
+    return {column: row.get(column) for column in UPSERT_COLUMNS}
+
+
+def _upsert_statement(dialect_name):
+    table = Data.__table__
+    if dialect_name == "mysql":
+        stmt = mysql.insert(table)
+        return stmt.on_duplicate_key_update(
+            amount=stmt.inserted.amount,
+            city=func.coalesce(stmt.inserted.city, table.c.city),
+        )
+    if dialect_name in ("sqlite", "postgresql"):
+        insert = sqlite.insert if dialect_name == "sqlite" else postgresql.insert
+        stmt = insert(table)
+        return stmt.on_conflict_do_update(
+            index_elements=list(UPSERT_KEY),
+            set_={
+                "amount": stmt.excluded.amount,
+                "city": func.coalesce(stmt.excluded.city, table.c.city),
+            },
+        )
+    # Dialek lain tidak punya upsert native: upsert_data memakai _merge_batch
+    return None
+
+
+def _key(row):
+    return tuple(row[column] for column in UPSERT_KEY)
+
+
+def _existing_rows(batch):
+    """{key: (id, amount, city)} of stored rows whose key is in the batch"""
+    table = Data.__table__
+    keys = {_key(row) for row in batch}
+    # IN per kolom (portabel di semua dialek), lalu disaring ke kunci batch
+    result = db.session.execute(
+        select(*[table.c[column] for column in UPSERT_KEY], table.c.id, table.c.amount, table.c.city)
+        .where(*[table.c[column].in_(list({key[i] for key in keys})) for i, column in enumerate(UPSERT_KEY)])
+    ).all()
+    size = len(UPSERT_KEY)
+    return {tuple(row[:size]): tuple(row[size:]) for row in result if tuple(row[:size]) in keys}
+
+
+def _is_changed(row, stored):
+    _, amount, city = stored
+    return row["amount"] != amount or (row["city"] is not None and row["city"] != city)
+
+
+def _merge_batch(batch, existing):
+    """Portable fallback: executemany INSERT for new keys and UPDATE by id for changed rows"""
+    table = Data.__table__
+    to_insert, to_update = [], []
+    for row in batch:
+        stored = existing.get(_key(row))
+        if stored is None:
+            to_insert.append(row)
+        elif _is_changed(row, stored):
+            to_update.append({
+                "b_id": stored[0],
+                "b_amount": row["amount"],
+                "b_city": stored[2] if row["city"] is None else row["city"],
+            })
+
+    if to_insert:
+        db.session.execute(table.insert(), to_insert)
+    if to_update:
+        db.session.execute(
+            table.update()
+            .where(table.c.id == bindparam("b_id"))
+            .values(amount=bindparam("b_amount"), city=bindparam("b_city")),
+            to_update,
+        )
+
+
+def upsert_data(rows, count=False, batch_size=BATCH_SIZE):
+    """
+    Insert or update Data rows keyed on (category_id, regency_id, province_id, year)
+    with one dialect-native upsert per batch, executed as executemany (the
+    driver sends each batch as a single multi-row statement). Rows whose key contains
+    NULL never conflict and are always inserted; see adopt_city_rows for
+    older rows identified only by city. The caller commits.
+
+    Dialects without a native upsert fall back to a key lookup plus
+    executemany INSERT/UPDATE per batch.
+
+    Returns (inserted, updated); rows whose stored amount and city are
+    already equal count as neither. Counts are only computed when
+    count=True, which costs one extra key lookup per batch on the native
+    path; otherwise (len(rows), 0).
+    """
+    # Kunci duplikat dalam satu statement tidak diizinkan semua dialek: nilai terakhir menang
+    deduped = {}
+    for position, row in enumerate(_normalize(row) for row in rows):
+        key = _key(row)
+        deduped[key if None not in key else ("row", position)] = row
+    rows = list(deduped.values())
+    if not rows:
+        return 0, 0
+
+    mark_dirty((row["category_id"], row["year"]) for row in rows)
+    statement = _upsert_statement(db.session.get_bind().dialect.name)
+    inserted = updated = 0
+    for batch in _batches(rows, batch_size):
+        existing = _existing_rows(batch) if count or statement is None else None
+        if statement is None:
+            _merge_batch(batch, existing)
+        else:
+            db.session.execute(statement, batch)
+
+        if existing is None:
+            inserted += len(batch)
+            continue
+        for row in batch:
+            stored = existing.get(_key(row))
+            if stored is None:
+                inserted += 1
+            elif _is_changed(row, stored):
+                updated += 1
+
+    return inserted, updated
+
+
+def adopt_city_rows(rows):
+    """
+    Give legacy rows stored with only a city name (regency_id NULL) the
+    regency/province ids of the matching incoming rows, so that upsert_data
+    updates them instead of adding a second row for the same place and year.
+    Years already stored under the regency key are left alone. Costs one
+    query when there are no legacy rows. The caller commits.
+
+    Returns the number of rows adopted.
+    """
+    table = Data.__table__
+    wanted = {}
+    for row in rows:
+        if row.get("city") and row.get("regency_id") is not None and row.get("year") is not None:
+            wanted[(row["category_id"], row["city"], row["year"])] = (row["regency_id"], row["province_id"])
+    if not wanted:
+        return 0
+
+    legacy = db.session.execute(
+        select(table.c.id, table.c.category_id, table.c.city, table.c.year)
+        .where(
+            table.c.regency_id.is_(None),
+            table.c.category_id.in_(list({key[0] for key in wanted})),
+            table.c.city.in_(list({key[1] for key in wanted})),
+            table.c.year.in_(list({key[2] for key in wanted})),
+        )
+        .order_by(table.c.id.desc())
+    ).all()
+    # Baris lama terbaru per (kategori, kota, tahun)
+    candidates = {}
+    for data_id, category_id, city, year in legacy:
+        if (category_id, city, year) in wanted:
+            candidates.setdefault((category_id, city, year), data_id)
+    if not candidates:
+        return 0
+
+    taken = set(_existing_rows([
+        {"category_id": category_id, "year": year,
+         "regency_id": wanted[(category_id, city, year)][0], "province_id": wanted[(category_id, city, year)][1]}
+        for category_id, city, year in candidates
+    ]))
+    to_update = []
+    for (category_id, city, year), data_id in candidates.items():
+        regency_id, province_id = wanted[(category_id, city, year)]
+        if (category_id, regency_id, province_id, year) not in taken:
+            to_update.append({"b_id": data_id, "b_regency_id": regency_id, "b_province_id": province_id})
+
+    if to_update:
+        db.session.execute(
+            table.update()
+            .where(table.c.id == bindparam("b_id"))
+            .values(regency_id=bindparam("b_regency_id"), province_id=bindparam("b_province_id")),
+            to_update,
+        )
+        mark_dirty((category_id, year) for category_id, _, year in candidates)
+    return len(to_update)
@@ -0,0 +1,141 @@
+from datetime import datetime
+
+from sqlalchemy import event, func, tuple_, inspect, or_
+
+from models import db, Data, DataSummary
+
+SCOPE_PROVINCE = "province"
+SCOPE_NATIONAL = "national"
+BATCH_SIZE = 500
+
+# Kunci (category_id, year) yang berubah, dikumpulkan per session sampai refresh
+_PENDING_KEY = "data_summary_keys"
+
+
+def _mark(session, keys):
+    pending = session.info.setdefault(_PENDING_KEY, set())
+    pending.update((c, y) for c, y in keys if c is not None)
+
+
+def mark_dirty(keys):
+    """Record (category_id, year) pairs whose summary rows must be recomputed"""
+    _mark(db.session, keys)
+
+
+@event.listens_for(db.session, "before_flush")
+def _track_orm_writes(session, flush_context, instances):
+    """ORM writers (create/update/delete Data) mark their keys automatically"""
+    keys = [
+        (obj.category_id, obj.year)
+        for obj in (*session.new, *session.dirty, *session.deleted)
+        if isinstance(obj, Data)
+    ]
+    for obj in session.dirty:
+        if isinstance(obj, Data):
+            # Kunci lama ikut dihitung ulang saat kategori / tahun dipindah
+            attrs = inspect(obj).attrs
+            old_category = attrs.category_id.history.deleted
+            old_year = attrs.year.history.deleted
+            keys.append((
+                old_category[0] if old_category else obj.category_id,
+                old_year[0] if old_year else obj.year,
+            ))
+    if keys:
+        _mark(session, keys)
+
+
+def _batches(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _aggregate_rows(scope, key_filter):
+    """Summary rows for one scope as plain dicts, grouped in SQL"""
+    group = [Data.category_id, Data.year]
+    if scope == SCOPE_PROVINCE:
+        group.append(Data.province_id)
+
+    query = db.session.query(
+        *group,
+        func.sum(Data.amount), func.avg(Data.amount), func.min(Data.amount),
+        func.max(Data.amount), func.count(Data.amount),
+    ).filter(Data.amount.isnot(None), Data.category_id.isnot(None))
+    if key_filter is not None:
+        query = query.filter(key_filter)
+
+    now = datetime.now()
+    rows = []
+    for row in query.group_by(*group).all():
+        category_id, year = row[0], row[1]
+        province_id = row[2] if scope == SCOPE_PROVINCE else None
+        total, average, minimum, maximum, row_count = row[-5:]
+        rows.append({
+            "scope": scope,
+            "category_id": category_id,
+            "province_id": province_id,
+            "year": year,
+            "total": total,
+            "average": average,
+            "minimum": minimum,
+            "maximum": maximum,
+            "row_count": row_count,
+            "updated_at": now,
+        })
+    return rows
+
+
+def _replace(data_filter=None, summary_filter=None):
+    """Delete the selected summary rows and re-insert them from the data table"""
+    table = DataSummary.__table__
+    delete = table.delete()
+    if summary_filter is not None:
+        delete = delete.where(summary_filter)
+    db.session.execute(delete)
+
+    rows = _aggregate_rows(SCOPE_PROVINCE, data_filter) + _aggregate_rows(SCOPE_NATIONAL, data_filter)
+    if rows:
+        db.session.execute(table.insert(), rows)
+    return len(rows)
+
+
+def _key_filter(model, batch):
+    """Match (category_id, year) pairs; a NULL year never matches IN, so it gets its own clause"""
+    dated = [(c, y) for c, y in batch if y is not None]
+    undated = [c for c, y in batch if y is None]
+    clauses = []
+    if dated:
+        clauses.append(tuple_(model.category_id, model.year).in_(dated))
+    if undated:
+        clauses.append(model.category_id.in_(undated) & model.year.is_(None))
+    return or_(*clauses)
+
+
+def refresh_summary(keys):
+    """
+    Recompute the province and national summary rows for the given
+    (category_id, year) pairs from the data table and commit. A year of
+    None refreshes the category's rows without a year. Returns the number
+    of summary rows written.
+    """
+    keys = sorted({(c, y) for c, y in keys if c is not None}, key=lambda key: (key[0], key[1] is not None, key[1] or 0))
+    written = 0
+    for batch in _batches(keys, BATCH_SIZE):
+        written += _replace(_key_filter(Data, batch), _key_filter(DataSummary, batch))
+    db.session.commit()
+    return written
+
+
+def refresh_pending():
+    """Refresh keys marked since the last call in this session; call after commit"""
+    keys = db.session.info.pop(_PENDING_KEY, None)
+    if not keys:
+        return 0
+    return refresh_summary(keys)
+
+
+def rebuild_summary():
+    """Recompute the whole summary table from scratch and commit"""
+    written = _replace()
+    db.session.info.pop(_PENDING_KEY, None)
+    db.session.commit()
+    return written
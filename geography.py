@@ -0,0 +1,138 @@
+import re
+import threading
+import time
+
+from models import db, Province, Regency
+
+# Awalan nama kabupaten/kota yang diabaikan saat mencocokkan nama
+_REGENCY_PREFIXES = ("KOTA ADMINISTRASI ", "KABUPATEN ", "KAB. ", "KAB ", "KOTA ")
+
+
+def normalize_name(name):
+    """Upper-case, collapse whitespace and drop regency/city prefixes"""
+    name = re.sub(r"\s+", " ", (name or "").strip().upper())
+    for prefix in _REGENCY_PREFIXES:
+        if name.startswith(prefix):
+            return name[len(prefix):]
+    return name
+
+
+def _format_timestamp(value):
+    return value.isoformat(sep=" ", timespec="seconds") if value else None
+
+
+class GeographySnapshot:
+    """Immutable in-memory copy of the provinces and regencies tables"""
+
+    def __init__(self, provinces, regencies):
+        self.provinces = {p.id: p.to_dict() for p in provinces}
+        self.regencies = {
+            r.id: {
+                "id": r.id,
+                "province_id": r.province_id,
+                "name": r.name,
+                "province_bps_code": r.province_bps_code,
+                "province_kemenkeu_code": r.province_kemenkeu_code,
+                "created_at": _format_timestamp(r.created_at),
+                "updated_at": _format_timestamp(r.updated_at),
+            }
+            for r in regencies
+        }
+
+        self.regency_ids_by_province = {}
+        self.regencies_by_name = {}
+        for regency in self.regencies.values():
+            self.regency_ids_by_province.setdefault(regency["province_id"], []).append(regency["id"])
+            self.regencies_by_name.setdefault(normalize_name(regency["name"]), []).append(regency["id"])
+
+        self.provinces_by_name = {normalize_name(p["name"]): p["id"] for p in self.provinces.values()}
+        self.provinces_by_bps_code = {p["bps_code"]: p["id"] for p in self.provinces.values() if p["bps_code"]}
+        self.provinces_by_kemenkeu_code = {
+            p["kemenkeu_code"]: p["id"] for p in self.provinces.values() if p["kemenkeu_code"]
+        }
+
+
+class GeographyRegistry:
+    """
+    Process-wide registry of provinces and regencies.
+
+    Loaded with two queries on first use and served from memory after that.
+    ``refresh()`` reloads it eagerly and is called after the tables are
+    rewritten (ProvincesRegenciesScraper.save_to_database); ``ttl`` bounds
+    staleness for writes made by other worker processes.
+    """
+
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self._snapshot = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.ttl = app.config.get("DATA_CACHE_TTL", self.ttl)
+
+    def _is_fresh(self):
+        return self._snapshot is not None and time.monotonic() - self._loaded_at < self.ttl
+
+    def snapshot(self):
+        snapshot = self._snapshot
+        if snapshot is not None and self._is_fresh():
+            return snapshot
+        with self._lock:
+            if not self._is_fresh():
+                self._load()
+            return self._snapshot
+
+    def _load(self):
+        provinces = db.session.query(Province).order_by(Province.id.asc()).all()
+        regencies = db.session.query(Regency).order_by(Regency.id.asc()).all()
+        self._snapshot = GeographySnapshot(provinces, regencies)
+        self._loaded_at = time.monotonic()
+
+    def refresh(self):
+        with self._lock:
+            self._load()
+
+    def invalidate(self):
+        with self._lock:
+            self._snapshot = None
+
+    # Lookup
+
+    def province(self, province_id):
+        return self.snapshot().provinces.get(province_id)
+
+    def regency(self, regency_id):
+        return self.snapshot().regencies.get(regency_id)
+
+    def province_ids(self):
+        return self.snapshot().provinces.keys()
+
+    def regency_ids(self):
+        return self.snapshot().regencies.keys()
+
+    def regencies_of(self, province_id):
+        snapshot = self.snapshot()
+        return [snapshot.regencies[i] for i in snapshot.regency_ids_by_province.get(province_id, [])]
+
+    def find_province(self, name=None, bps_code=None, kemenkeu_code=None):
+        """Province dict by normalised name or by BPS / Kemenkeu code, or None"""
+        snapshot = self.snapshot()
+        if bps_code is not None:
+            province_id = snapshot.provinces_by_bps_code.get(bps_code)
+        elif kemenkeu_code is not None:
+            province_id = snapshot.provinces_by_kemenkeu_code.get(kemenkeu_code)
+        else:
+            province_id = snapshot.provinces_by_name.get(normalize_name(name))
+        return snapshot.provinces.get(province_id)
+
+    def find_regencies(self, name, province_id=None):
+        """Regencies whose normalised name matches; "Kota X" and "Kabupaten X" both match "X" """
+        snapshot = self.snapshot()
+        matches = [snapshot.regencies[i] for i in snapshot.regencies_by_name.get(normalize_name(name), [])]
+        if province_id is not None:
+            matches = [r for r in matches if r["province_id"] == province_id]
+        return matches
+
+
+geography = GeographyRegistry()
@@ -0,0 +1,164 @@
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from flask import request, jsonify, url_for
+from sqlalchemy import update
+
+from models import db, ScrapeJob
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueue:
+    """
+    Background execution of scraping endpoints.
+
+    Views decorated with ``background(name)`` are queued instead of run in
+    the request, keeping web workers free; callers that need the result in
+    the response pass ``?async=false``. With SCRAPE_JOBS_ENABLED off, jobs
+    are only queued on ``?async=true``. The request body and query string are stored in ``scrape_jobs``
+    and a local thread pool replays the undecorated view in a request
+    context of its own, storing the JSON response as the job result.
+
+    Jobs are claimed with a conditional UPDATE, so a job is run once even
+    when several processes drain the table (``flask run-scrape-jobs``
+    picks up jobs left queued by a restarted worker). A job whose worker
+    died after the claim stays "running"; ``requeue_stale`` puts jobs
+    running for longer than ``timeout`` seconds (SCRAPE_JOB_TIMEOUT) back
+    in the queue.
+    """
+
+    def __init__(self, max_workers=2, timeout=3600):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.enabled = True
+        self.app = None
+        self._views = {}
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+        self.enabled = app.config.get("SCRAPE_JOBS_ENABLED", self.enabled)
+        self.max_workers = app.config.get("SCRAPE_JOB_WORKERS", self.max_workers)
+        self.timeout = app.config.get("SCRAPE_JOB_TIMEOUT", self.timeout)
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="scrape-job")
+            return self._executor
+
+    def _wants_async(self):
+        value = request.args.get("async")
+        if value is None:
+            return self.enabled
+        return value.lower() == "true"
+
+    def background(self, name):
+        """Register a view as job kind ``name`` and queue it on async requests"""
+        def decorator(view):
+            self._views[name] = view
+
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                if not self._wants_async():
+                    return view(*args, **kwargs)
+
+                job = self.enqueue(name, {
+                    "json": request.get_json(silent=True),
+                    "args": {key: value for key, value in request.args.items() if key != "async"},
+                    "path": request.path,
+                    "method": request.method,
+                })
+                status_url = url_for("get_scrape_job", job_id=job.id)
+                response = jsonify({"message": "Job queued", "job": job.to_dict(), "status_url": status_url})
+                response.headers["Location"] = status_url
+                return response, 202
+            return wrapper
+        return decorator
+
+    def enqueue(self, kind, payload):
+        job = ScrapeJob(kind=kind, status="queued", payload=payload)
+        db.session.add(job)
+        db.session.commit()
+        self._get_executor().submit(self.run, job.id)
+        return job
+
+    # Worker
+
+    def _claim(self, job_id):
+        claimed = db.session.execute(
+            update(ScrapeJob)
+            .where(ScrapeJob.id == job_id, ScrapeJob.status == "queued")
+            .values(status="running", started_at=datetime.now())
+        ).rowcount
+        db.session.commit()
+        return claimed == 1
+
+    def run(self, job_id):
+        """Claim and execute one queued job; no-op when another worker already took it"""
+        with self.app.app_context():
+            if not self._claim(job_id):
+                return
+            job = db.session.get(ScrapeJob, job_id)
+            payload = job.payload or {}
+            view = self._views.get(job.kind)
+
+            result, response_status, error = None, None, None
+            if view is None:
+                error = f"Unknown job kind '{job.kind}'"
+            else:
+                try:
+                    with self.app.test_request_context(
+                        payload.get("path", "/"),
+                        method=payload.get("method", "POST"),
+                        json=payload.get("json"),
+                        query_string=payload.get("args") or {},
+                    ):
+                        response = self.app.make_response(view())
+                        result = response.get_json(silent=True)
+                        response_status = response.status_code
+                except Exception as e:
+                    db.session.rollback()
+                    logger.exception(f"Scrape job {job_id} ({job.kind}) failed")
+                    error = str(e)
+
+            job = db.session.get(ScrapeJob, job_id)
+            job.result = result
+            job.response_status = response_status
+            job.error = error
+            job.status = "succeeded" if error is None and response_status < 400 else "failed"
+            job.finished_at = datetime.now()
+            db.session.commit()
+
+    def requeue_stale(self):
+        """Move jobs stuck in "running" past the timeout back to queued; returns how many"""
+        cutoff = datetime.now() - timedelta(seconds=self.timeout)
+        requeued = db.session.execute(
+            update(ScrapeJob)
+            .where(ScrapeJob.status == "running", ScrapeJob.started_at < cutoff)
+            .values(status="queued", started_at=None)
+        ).rowcount
+        db.session.commit()
+        if requeued:
+            logger.warning(f"Requeued {requeued} scrape job(s) running for more than {self.timeout}s")
+        return requeued
+
+    def drain(self):
+        """Run queued jobs in this process until none are left; returns how many were run"""
+        count = 0
+        while True:
+            job_id = db.session.execute(
+                db.select(ScrapeJob.id).where(ScrapeJob.status == "queued").order_by(ScrapeJob.created_at.asc())
+            ).scalars().first()
+            if job_id is None:
+                return count
+            self.run(job_id)
+            count += 1
+
+
+scrape_jobs = JobQueue()
@@ -0,0 +1,90 @@
+import datetime
+from functools import lru_cache
+
+import numpy as np
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.http import http_date
+
+try:
+    import orjson
+except ImportError:  # orjson opsional, jatuh ke json standar
+    orjson = None
+
+
+def _numpy_default(obj):
+    """Plain Python values for NumPy objects the stdlib encoder rejects"""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+# Respons besar mengulang datetime yang sama (mis. created_at kategori) di setiap baris
+_http_date = lru_cache(maxsize=4096)(http_date)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider that encodes responses with orjson when it is
+    installed, and with the stdlib ``json`` module otherwise.
+
+    Output matches the default provider: keys are sorted, dates use the
+    HTTP date format and Flask's extra types (UUID, dataclasses, Markup) are
+    supported. NumPy arrays and scalars are serialised by both backends.
+    Objects orjson cannot encode (e.g. integers over 64 bits) fall back to
+    the stdlib encoder.
+    """
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.use_orjson = orjson is not None and app.config.get("JSON_BACKEND", "orjson") == "orjson"
+
+    @staticmethod
+    def default(obj):
+        try:
+            return DefaultJSONProvider.default(obj)
+        except TypeError:
+            return _numpy_default(obj)
+
+    @staticmethod
+    def _orjson_default(obj):
+        # orjson menulis datetime sebagai RFC 3339; samakan dengan format Flask
+        if isinstance(obj, (datetime.date, datetime.datetime)):
+            return _http_date(obj)
+        return FastJSONProvider.default(obj)
+
+    def _orjson_options(self, pretty=False):
+        option = (
+            orjson.OPT_SORT_KEYS
+            | orjson.OPT_NON_STR_KEYS
+            | orjson.OPT_SERIALIZE_NUMPY
+            | orjson.OPT_PASSTHROUGH_DATETIME
+        )
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def _encode(self, obj, pretty=False):
+        """Return UTF-8 bytes, or None when orjson is unavailable or refuses obj"""
+        if not self.use_orjson:
+            return None
+        try:
+            return orjson.dumps(obj, default=self._orjson_default, option=self._orjson_options(pretty))
+        except TypeError:
+            return None
+
+    def dumps(self, obj, **kwargs):
+        if not kwargs:
+            encoded = self._encode(obj)
+            if encoded is not None:
+                return encoded.decode()
+        return super().dumps(obj, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = (self.compact is None and self._app.debug) or self.compact is False
+        encoded = self._encode(obj, pretty)
+        if encoded is None:
+            return super().response(obj)
+        return self._app.response_class(encoded + b"\n", mimetype=self.mimetype)
@@ -0,0 +1,37 @@
+"""add regression_models table
+
+Revision ID: 3f1c9a2b7d10
+Revises: 889147137137
+Create Date: 2026-10-17 09:12:44.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c9a2b7d10'
+down_revision = '889147137137'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('regression_models',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('regression_type', sa.String(length=20), nullable=False),
+    sa.Column('analysis_type', sa.String(length=20), nullable=False),
+    sa.Column('independent_variables', sa.JSON(), nullable=False),
+    sa.Column('dependent_variable', sa.String(length=255), nullable=False),
+    sa.Column('cities', sa.JSON(), nullable=False),
+    sa.Column('powers', sa.JSON(), nullable=False),
+    sa.Column('coefficients', sa.JSON(), nullable=False),
+    sa.Column('r_squared', sa.Float(), nullable=True),
+    sa.Column('n_observations', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('regression_models')
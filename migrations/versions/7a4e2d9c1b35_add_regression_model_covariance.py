@@ -0,0 +1,30 @@
+"""add covariance columns to regression_models
+
+Revision ID: 7a4e2d9c1b35
+Revises: 3f1c9a2b7d10
+Create Date: 2026-10-17 10:03:18.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a4e2d9c1b35'
+down_revision = '3f1c9a2b7d10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('regression_models', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('covariance', sa.JSON(), nullable=True))
+        batch_op.add_column(sa.Column('residual_variance', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('df_resid', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('regression_models', schema=None) as batch_op:
+        batch_op.drop_column('df_resid')
+        batch_op.drop_column('residual_variance')
+        batch_op.drop_column('covariance')
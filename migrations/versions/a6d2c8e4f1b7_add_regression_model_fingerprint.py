@@ -0,0 +1,29 @@
+"""add fingerprint to regression_models
+
+Revision ID: a6d2c8e4f1b7
+Revises: f3c9d1a7b5e4
+Create Date: 2026-10-17 21:12:40.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6d2c8e4f1b7'
+down_revision = 'f3c9d1a7b5e4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Model lama dibiarkan tanpa fingerprint (NULL tidak bentrok pada unique key)
+    with op.batch_alter_table('regression_models', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('fingerprint', sa.String(length=64), nullable=True))
+        batch_op.create_unique_constraint('uq_regression_models_fingerprint', ['fingerprint'])
+
+
+def downgrade():
+    with op.batch_alter_table('regression_models', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_regression_models_fingerprint', type_='unique')
+        batch_op.drop_column('fingerprint')
@@ -0,0 +1,51 @@
+"""add unique upsert key on data (category_id, regency_id, province_id, year)
+
+Revision ID: b2d8f4e6a913
+Revises: 7a4e2d9c1b35
+Create Date: 2026-10-17 11:20:05.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b2d8f4e6a913'
+down_revision = '7a4e2d9c1b35'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Hapus duplikat lama (simpan id terbesar) agar unique key bisa dibuat.
+    # Baris dengan kolom kunci NULL tidak pernah bentrok, jadi tidak disentuh.
+    op.execute(
+        """
+        DELETE FROM data
+        WHERE category_id IS NOT NULL
+          AND regency_id IS NOT NULL
+          AND province_id IS NOT NULL
+          AND year IS NOT NULL
+          AND id NOT IN (
+              SELECT keep_id FROM (
+                  SELECT MAX(id) AS keep_id
+                  FROM data
+                  WHERE category_id IS NOT NULL
+                    AND regency_id IS NOT NULL
+                    AND province_id IS NOT NULL
+                    AND year IS NOT NULL
+                  GROUP BY category_id, regency_id, province_id, year
+              ) AS latest
+          )
+        """
+    )
+    with op.batch_alter_table('data', schema=None) as batch_op:
+        batch_op.create_unique_constraint(
+            'uq_data_category_location_year',
+            ['category_id', 'regency_id', 'province_id', 'year']
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('data', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_data_category_location_year', type_='unique')
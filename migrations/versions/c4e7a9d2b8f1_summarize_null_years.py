@@ -0,0 +1,43 @@
+"""summarize data without a year in data_summary
+
+Revision ID: c4e7a9d2b8f1
+Revises: a6d2c8e4f1b7
+Create Date: 2026-10-17 23:40:05.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e7a9d2b8f1'
+down_revision = 'a6d2c8e4f1b7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('data_summary', schema=None) as batch_op:
+        batch_op.alter_column('year', existing_type=sa.Integer(), nullable=True)
+
+    # Baris data tanpa tahun sebelumnya tidak diringkas (sama dengan `flask rebuild-summary`)
+    op.execute("""
+        INSERT INTO data_summary (scope, category_id, province_id, year, total, average, minimum, maximum, row_count, updated_at)
+        SELECT 'province', category_id, province_id, NULL, SUM(amount), AVG(amount), MIN(amount), MAX(amount), COUNT(amount), CURRENT_TIMESTAMP
+        FROM data
+        WHERE amount IS NOT NULL AND category_id IS NOT NULL AND year IS NULL
+        GROUP BY category_id, province_id
+    """)
+    op.execute("""
+        INSERT INTO data_summary (scope, category_id, province_id, year, total, average, minimum, maximum, row_count, updated_at)
+        SELECT 'national', category_id, NULL, NULL, SUM(amount), AVG(amount), MIN(amount), MAX(amount), COUNT(amount), CURRENT_TIMESTAMP
+        FROM data
+        WHERE amount IS NOT NULL AND category_id IS NOT NULL AND year IS NULL
+        GROUP BY category_id
+    """)
+
+
+def downgrade():
+    op.execute("DELETE FROM data_summary WHERE year IS NULL")
+    with op.batch_alter_table('data_summary', schema=None) as batch_op:
+        batch_op.alter_column('year', existing_type=sa.Integer(), nullable=False)
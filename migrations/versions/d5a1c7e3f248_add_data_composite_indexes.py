@@ -0,0 +1,30 @@
+"""add composite indexes for data access patterns
+
+Revision ID: d5a1c7e3f248
+Revises: b2d8f4e6a913
+Create Date: 2026-10-17 12:41:37.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5a1c7e3f248'
+down_revision = 'b2d8f4e6a913'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('data', schema=None) as batch_op:
+        batch_op.create_index('ix_data_category_regency_year', ['category_id', 'regency_id', 'year'], unique=False)
+        batch_op.create_index('ix_data_category_province_year', ['category_id', 'province_id', 'year'], unique=False)
+        batch_op.create_index('ix_data_city_category_year', ['city', 'category_id', 'year', 'amount'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('data', schema=None) as batch_op:
+        batch_op.drop_index('ix_data_city_category_year')
+        batch_op.drop_index('ix_data_category_province_year')
+        batch_op.drop_index('ix_data_category_regency_year')
@@ -0,0 +1,59 @@
+"""add data_summary table
+
+Revision ID: e8b3f0a4c6d2
+Revises: d5a1c7e3f248
+Create Date: 2026-10-17 14:05:12.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8b3f0a4c6d2'
+down_revision = 'd5a1c7e3f248'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('data_summary',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('scope', sa.String(length=10), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.Column('province_id', sa.Integer(), nullable=True),
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Float(), nullable=True),
+    sa.Column('average', sa.Float(), nullable=True),
+    sa.Column('minimum', sa.Float(), nullable=True),
+    sa.Column('maximum', sa.Float(), nullable=True),
+    sa.Column('row_count', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('data_summary', schema=None) as batch_op:
+        batch_op.create_index('ix_data_summary_scope_category_year', ['scope', 'category_id', 'year', 'province_id'], unique=False)
+
+    # Isi awal dari data yang sudah ada (sama dengan `flask rebuild-summary`)
+    op.execute("""
+        INSERT INTO data_summary (scope, category_id, province_id, year, total, average, minimum, maximum, row_count, updated_at)
+        SELECT 'province', category_id, province_id, year, SUM(amount), AVG(amount), MIN(amount), MAX(amount), COUNT(amount), CURRENT_TIMESTAMP
+        FROM data
+        WHERE amount IS NOT NULL AND category_id IS NOT NULL AND year IS NOT NULL
+        GROUP BY category_id, year, province_id
+    """)
+    op.execute("""
+        INSERT INTO data_summary (scope, category_id, province_id, year, total, average, minimum, maximum, row_count, updated_at)
+        SELECT 'national', category_id, NULL, year, SUM(amount), AVG(amount), MIN(amount), MAX(amount), COUNT(amount), CURRENT_TIMESTAMP
+        FROM data
+        WHERE amount IS NOT NULL AND category_id IS NOT NULL AND year IS NOT NULL
+        GROUP BY category_id, year
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('data_summary', schema=None) as batch_op:
+        batch_op.drop_index('ix_data_summary_scope_category_year')
+
+    op.drop_table('data_summary')
@@ -0,0 +1,41 @@
+"""add scrape_jobs table
+
+Revision ID: f3c9d1a7b5e4
+Revises: e8b3f0a4c6d2
+Create Date: 2026-10-17 16:40:27.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3c9d1a7b5e4'
+down_revision = 'e8b3f0a4c6d2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('scrape_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=64), nullable=False),
+    sa.Column('status', sa.String(length=16), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('result', sa.JSON(), nullable=True),
+    sa.Column('response_status', sa.Integer(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('scrape_jobs', schema=None) as batch_op:
+        batch_op.create_index('ix_scrape_jobs_status_created', ['status', 'created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('scrape_jobs', schema=None) as batch_op:
+        batch_op.drop_index('ix_scrape_jobs_status_created')
+
+    op.drop_table('scrape_jobs')
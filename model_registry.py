@@ -0,0 +1,187 @@
+import hashlib
+import json
+import threading
+
+import numpy as np
+from scipy import stats
+from sqlalchemy.exc import IntegrityError
+
+from models import db, RegressionModel
+
+
+class FittedModel:
+    """
+    Regression model reduced to a polynomial in the independent variables:
+    prediction = prod(x ** powers, axis=1) @ coefficients. Linear models are
+    the degree-1 special case with an all-zero row for the intercept.
+    """
+
+    def __init__(self, record):
+        self.id = record.id
+        self.regression_type = record.regression_type
+        self.independent_variables = list(record.independent_variables)
+        self.dependent_variable = record.dependent_variable
+        self.powers = np.asarray(record.powers, dtype=np.float64)
+        self.coefficients = np.asarray(record.coefficients, dtype=np.float64)
+        self.r_squared = record.r_squared
+        self.covariance = None if record.covariance is None else np.asarray(record.covariance, dtype=np.float64)
+        self.residual_variance = record.residual_variance
+        self.df_resid = record.df_resid
+        # Salinan plain dict, aman dipakai setelah session ditutup
+        self.info = record.to_dict()
+
+    def design_matrix(self, X):
+        X = np.asarray(X, dtype=np.float64).reshape(-1, len(self.independent_variables))
+        return np.prod(X[:, None, :] ** self.powers[None, :, :], axis=2)
+
+    def predict(self, X):
+        return self.design_matrix(X) @ self.coefficients
+
+
+def _linear_terms(n_features):
+    return np.vstack([np.zeros(n_features), np.eye(n_features)])
+
+
+def _ols_covariance(design, y, coefficients):
+    """Classical OLS covariance s^2 (F'F)^-1 for a fit made outside statsmodels"""
+    resid = y - design @ coefficients
+    df_resid = int(design.shape[0] - np.linalg.matrix_rank(design))
+    if df_resid <= 0:
+        return None, None, df_resid
+    residual_variance = float(resid @ resid / df_resid)
+    return residual_variance * np.linalg.pinv(design.T @ design), residual_variance, df_resid
+
+
+def _fingerprint(fields):
+    payload = json.dumps(fields, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def register_model(model, variables, cities, regression_type, analysis_type, X, y, r_squared, poly=None):
+    """
+    Serialise a fitted OLS or polynomial pipeline into the registry, returns the record.
+
+    A fit identical to a registered one (same type, variables, cities and
+    coefficients, i.e. the same request on unchanged data) returns the
+    existing record instead of adding a row per cache miss.
+    """
+    independent_vars = list(variables[:-1])
+    X = np.asarray(X, dtype=np.float64).reshape(len(y), -1)
+    y = np.asarray(y, dtype=np.float64)
+
+    if regression_type == "linear":
+        powers = _linear_terms(len(independent_vars))
+        coefficients = np.asarray(model.params, dtype=np.float64)
+        covariance = np.asarray(model.cov_params(), dtype=np.float64)
+        residual_variance = float(model.scale)
+        df_resid = int(model.df_resid)
+    else:
+        powers = np.asarray(poly.powers_, dtype=np.float64)
+        coefficients = np.asarray(model.coef_, dtype=np.float64).copy()
+        # Intercept sklearn dilebur ke suku bias (baris pangkat nol)
+        bias_term = np.flatnonzero(~powers.any(axis=1))
+        if len(bias_term):
+            coefficients[bias_term[0]] += float(model.intercept_)
+        else:
+            powers = np.vstack([np.zeros(len(independent_vars)), powers])
+            coefficients = np.concatenate([[float(model.intercept_)], coefficients])
+        design = np.prod(X[:, None, :] ** powers[None, :, :], axis=2)
+        covariance, residual_variance, df_resid = _ols_covariance(design, y, coefficients)
+
+    if covariance is None or not np.all(np.isfinite(covariance)) or not np.isfinite(residual_variance):
+        covariance, residual_variance = None, None
+
+    fields = {
+        "regression_type": regression_type,
+        "analysis_type": analysis_type,
+        "independent_variables": independent_vars,
+        "dependent_variable": variables[-1],
+        "cities": list(cities),
+        "powers": powers.tolist(),
+        "coefficients": coefficients.tolist(),
+        "n_observations": int(len(y)),
+    }
+    fingerprint = _fingerprint(fields)
+    existing = RegressionModel.query.filter_by(fingerprint=fingerprint).first()
+    if existing is not None:
+        return existing
+
+    record = RegressionModel(
+        **fields,
+        r_squared=float(r_squared),
+        covariance=None if covariance is None else covariance.tolist(),
+        residual_variance=residual_variance,
+        df_resid=df_resid,
+        fingerprint=fingerprint,
+    )
+    db.session.add(record)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Worker lain baru saja menyimpan fit yang sama
+        db.session.rollback()
+        return RegressionModel.query.filter_by(fingerprint=fingerprint).one()
+    return record
+
+
+_loaded = {}
+_loaded_lock = threading.Lock()
+
+
+def get_model(model_id):
+    """Load a registered model by id; records are immutable so they are memoised"""
+    fitted = _loaded.get(model_id)
+    if fitted is not None:
+        return fitted
+
+    record = db.session.get(RegressionModel, model_id)
+    if record is None:
+        return None
+
+    fitted = FittedModel(record)
+    with _loaded_lock:
+        _loaded[model_id] = fitted
+    return fitted
+
+
+def score_batch(models, X, confidence_level=0.95):
+    """
+    Score every row of X against every model in one vectorised pass.
+
+    All models must share the same term structure (same independent
+    variables and regression type). Returns a dict of (n_rows, n_models)
+    arrays: predictions, mean confidence bounds and prediction-interval
+    bounds. Bounds are NaN for models registered without a covariance.
+    """
+    powers = models[0].powers
+    for fitted in models[1:]:
+        if fitted.powers.shape != powers.shape or not np.array_equal(fitted.powers, powers):
+            raise ValueError("All models in a batch must share the same variables and regression type")
+
+    design = models[0].design_matrix(X)
+    coefficients = np.stack([m.coefficients for m in models], axis=1)
+    predicted = design @ coefficients
+
+    n_terms = powers.shape[0]
+    covariances = np.stack([
+        m.covariance if m.covariance is not None else np.full((n_terms, n_terms), np.nan)
+        for m in models
+    ])
+    residual_variance = np.array([
+        np.nan if m.residual_variance is None else m.residual_variance for m in models
+    ])
+    df_resid = np.array([m.df_resid if m.df_resid and m.df_resid > 0 else np.nan for m in models])
+
+    # Var(x'b) = x' Cov x untuk setiap baris x dan setiap model
+    mean_variance = np.einsum("ip,jpq,iq->ij", design, covariances, design)
+    mean_se = np.sqrt(np.clip(mean_variance, 0, None))
+    obs_se = np.sqrt(np.clip(mean_variance + residual_variance[None, :], 0, None))
+    t_value = stats.t.ppf((1 + confidence_level) / 2, df_resid)[None, :]
+
+    return {
+        "predicted": predicted,
+        "ci_lower": predicted - t_value * mean_se,
+        "ci_upper": predicted + t_value * mean_se,
+        "pi_lower": predicted - t_value * obs_se,
+        "pi_upper": predicted + t_value * obs_se,
+    }
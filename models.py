@@ -19,6 +19,15 @@ class Category(db.Model):
         
 class Data(db.Model):
     __tablename__ = 'data'
+    __table_args__ = (
+        # Kunci upsert untuk semua jalur ingestion (lihat data_store.upsert_data)
+        db.UniqueConstraint('category_id', 'regency_id', 'province_id', 'year', name='uq_data_category_location_year'),
+        # GET /api/data per regency / per provinsi, urut tahun
+        db.Index('ix_data_category_regency_year', 'category_id', 'regency_id', 'year'),
+        db.Index('ix_data_category_province_year', 'category_id', 'province_id', 'year'),
+        # Analisis dan scraper berbasis nama kota; amount ikut agar index-only
+        db.Index('ix_data_city_category_year', 'city', 'category_id', 'year', 'amount'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     amount = db.Column(db.Float, nullable=True)
     year = db.Column(db.Integer, nullable=True)
@@ -30,12 +39,14 @@ class Data(db.Model):
     category = db.relationship("Category", back_populates="data")
     
     def json(self):
+        # Kategori dari cache bersama, bukan lazy load relationship per baris
+        from category_cache import category_cache
         return {
             'id': self.id,
             'amount': self.amount,
             'year': self.year,
             'city': self.city,
-            'category': self.category.to_dict() if self.category else None,
+            'category': category_cache.get(self.category_id),
             'category_id': self.category_id,
             'province_id': self.province_id,
             'regency_id': self.regency_id,
@@ -125,4 +136,118 @@ class Regency(db.Model):
             'province_kemenkeu_code': self.province_kemenkeu_code,
             'created_at': self.created_at.strftime("%Y-%m-%d %H:%M:%S"),
             'updated_at': self.updated_at.strftime("%Y-%m-%d %H:%M:%S")
-        }
\ No newline at end of file
+        }
+
+class RegressionModel(db.Model):
+    __tablename__ = 'regression_models'
+    __table_args__ = (
+        db.UniqueConstraint('fingerprint', name='uq_regression_models_fingerprint'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    regression_type = db.Column(db.String(20), nullable=False)
+    analysis_type = db.Column(db.String(20), nullable=False)
+    independent_variables = db.Column(db.JSON, nullable=False)
+    dependent_variable = db.Column(db.String(255), nullable=False)
+    cities = db.Column(db.JSON, nullable=False)
+    # Setiap baris powers adalah pangkat per variabel independen untuk satu suku model
+    powers = db.Column(db.JSON, nullable=False)
+    coefficients = db.Column(db.JSON, nullable=False)
+    r_squared = db.Column(db.Float, nullable=True)
+    n_observations = db.Column(db.Integer, nullable=True)
+    # Untuk interval kepercayaan: matriks kovarians koefisien, s^2 residual, dan df residual
+    covariance = db.Column(db.JSON, nullable=True)
+    residual_variance = db.Column(db.Float, nullable=True)
+    df_resid = db.Column(db.Integer, nullable=True)
+    # Hash isi model (tipe, variabel, kota, koefisien); fit yang identik tidak disimpan dua kali
+    fingerprint = db.Column(db.String(64), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.now, nullable=False)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'regression_type': self.regression_type,
+            'analysis_type': self.analysis_type,
+            'independent_variables': self.independent_variables,
+            'dependent_variable': self.dependent_variable,
+            'cities': self.cities,
+            'r_squared': self.r_squared,
+            'n_observations': self.n_observations,
+            'created_at': self.created_at.strftime("%Y-%m-%d %H:%M:%S")
+        }
+
+
+class DataSummary(db.Model):
+    __tablename__ = 'data_summary'
+    __table_args__ = (
+        db.Index('ix_data_summary_scope_category_year', 'scope', 'category_id', 'year', 'province_id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    # 'province': satu baris per kategori x provinsi x tahun (province_id boleh NULL)
+    # 'national': satu baris per kategori x tahun, province_id selalu NULL
+    scope = db.Column(db.String(10), nullable=False)
+    category_id = db.Column(db.Integer, db.ForeignKey("categories.id"), nullable=False)
+    province_id = db.Column(db.Integer, nullable=True)
+    # NULL: data tanpa tahun, diringkas juga agar total sama dengan jalur raw
+    year = db.Column(db.Integer, nullable=True)
+    total = db.Column(db.Float, nullable=True)
+    average = db.Column(db.Float, nullable=True)
+    minimum = db.Column(db.Float, nullable=True)
+    maximum = db.Column(db.Float, nullable=True)
+    row_count = db.Column(db.Integer, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.now, nullable=False)
+
+    def to_dict(self):
+        return {
+            'scope': self.scope,
+            'category_id': self.category_id,
+            'province_id': self.province_id,
+            'year': self.year,
+            'total': self.total,
+            'average': self.average,
+            'minimum': self.minimum,
+            'maximum': self.maximum,
+            'row_count': self.row_count,
+            'updated_at': self.updated_at.strftime("%Y-%m-%d %H:%M:%S")
+        }
+
+
+class ScrapeJob(db.Model):
+    __tablename__ = 'scrape_jobs'
+    __table_args__ = (
+        db.Index('ix_scrape_jobs_status_created', 'status', 'created_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    # Nama endpoint scraping yang dijalankan (lihat jobs.JobQueue.background)
+    kind = db.Column(db.String(64), nullable=False)
+    # queued -> running -> succeeded | failed
+    status = db.Column(db.String(16), nullable=False, default='queued')
+    # {"json": body request, "args": query string}
+    payload = db.Column(db.JSON, nullable=False)
+    result = db.Column(db.JSON, nullable=True)
+    response_status = db.Column(db.Integer, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.now, nullable=False)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self, include_result=True):
+        def fmt(value):
+            return value.strftime("%Y-%m-%d %H:%M:%S") if value else None
+
+        data = {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'payload': self.payload,
+            'response_status': self.response_status,
+            'error': self.error,
+            'created_at': fmt(self.created_at),
+            'started_at': fmt(self.started_at),
+            'finished_at': fmt(self.finished_at)
+        }
+        if include_result:
+            data['result'] = self.result
+        return data
@@ -0,0 +1,55 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+def make_key(params, version):
+    """Content hash of request parameters plus the data version they were computed on"""
+    payload = json.dumps({"params": params, "version": version}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """Thread-safe LRU cache whose entries also expire after ``ttl`` seconds"""
+
+    def __init__(self, maxsize=256, ttl=600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def init_app(self, app, prefix):
+        self.maxsize = app.config.get(f"{prefix}_SIZE", self.maxsize)
+        self.ttl = app.config.get(f"{prefix}_TTL", self.ttl)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+analysis_cache = ResultCache()
+# Respons referensi provinsi/kabupaten, di-key dengan versi tabel geography
+geography_cache = ResultCache(maxsize=16, ttl=300)
@@ -1,14 +1,30 @@
-import requests
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+
 import pandas as pd
 from rapidfuzz import fuzz
 
+from scraping.http_client import make_session, RateLimiter, DEFAULT_TIMEOUT
+
+APBD_URL = "https://djpk.kemenkeu.go.id/portal/data/apbd"
+# Batas kesopanan terhadap portal DJPK: jumlah request paralel dan request per detik (0 = tanpa batas)
+APBD_MAX_WORKERS = int(os.getenv("APBD_SCRAPE_WORKERS") or 4)
+APBD_RATE_LIMIT = float(os.getenv("APBD_RATE_LIMIT") or 2)
+
+# Dipakai bersama oleh semua scrape APBD di proses ini, termasuk job yang berjalan bersamaan
+_session = make_session(pool_size=APBD_MAX_WORKERS)
+_rate_limiter = RateLimiter(APBD_RATE_LIMIT)
+
+
 def scrape_apbd(periode, tahun, provinsi, pemda_code, pemda_name, keyword_row=None):
-    url = "https://djpk.kemenkeu.go.id/portal/data/apbd"
     params = {"periode": periode, "tahun": tahun, "provinsi": provinsi, "pemda": pemda_code}
-    resp = requests.get(url, params=params)
+    _rate_limiter.wait()
+    resp = _session.get(APBD_URL, params=params, timeout=DEFAULT_TIMEOUT)
     resp.raise_for_status()
 
-    tables = pd.read_html(resp.text)
+    # HTML literal harus dibungkus file-like (deprecated di pandas 2.1, ditolak di pandas 3)
+    tables = pd.read_html(StringIO(resp.text))
     all_cleaned = []
 
     for df in tables:
@@ -85,23 +101,50 @@ def scrape_apbd(periode, tahun, provinsi, pemda_code, pemda_name, keyword_row=No
     return all_cleaned
 
 
+def scrape_apbd_many(periode, years, provinsi, pemdas, keyword_row=None, max_workers=APBD_MAX_WORKERS):
+    """
+    Scrape every (tahun, pemda) page concurrently on a bounded thread pool.
+    Requests share one pooled session (retry/backoff on 429/5xx) and the
+    module-wide rate limit, so parallel pages stay within APBD_RATE_LIMIT.
+
+    Args:
+        pemdas: list of (pemda_code, pemda_name)
+
+    Returns (rows, failures); rows keep (tahun, pemda) order and failures
+    is a list of {"tahun", "pemda", "error"}.
+    """
+    tasks = [(tahun, pemda_code, pemda_name) for tahun in years for pemda_code, pemda_name in pemdas]
+    if not tasks:
+        return [], []
+
+    def fetch(task):
+        tahun, pemda_code, pemda_name = task
+        try:
+            data = scrape_apbd(periode, tahun, provinsi, pemda_code, pemda_name, keyword_row=keyword_row)
+            for row in data or []:
+                row.setdefault("tahun", tahun)
+                row.setdefault("pemda", pemda_code)
+            return data, None
+        except Exception as e:
+            print(f"❌ Gagal scrape {pemda_name or pemda_code} tahun {tahun}: {e}")
+            return None, {"tahun": tahun, "pemda": pemda_code, "error": str(e)}
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tasks)))) as executor:
+        results = list(executor.map(fetch, tasks))
+
+    rows = [row for data, _ in results if data for row in data]
+    failures = [failure for _, failure in results if failure]
+    return rows, failures
+
+
 def scrape_multiple_years_single_pemda(
     start_year: int, end_year: int, periode: int,
     provinsi: str, pemda_code: str, pemda_name: str,
     keyword_table: str = None, keyword_row: str = None
 ):
-    all_data = []
-
-    for tahun in range(start_year, end_year + 1):
-        try:
-            print(f"📊 Scraping {pemda_name} ({provinsi}) Tahun {tahun}...")
-            data = scrape_apbd(
-                periode, tahun, provinsi, pemda_code, pemda_name,
-                keyword_table=keyword_table, keyword_row=keyword_row
-            )
-            if data:
-                all_data.extend(data)
-        except Exception as e:
-            print(f"⚠️ Gagal {pemda_name} Tahun {tahun}: {e}")
-
+    # keyword_table tidak dipakai oleh scrape_apbd; dipertahankan demi kompatibilitas
+    all_data, _ = scrape_apbd_many(
+        periode, range(start_year, end_year + 1), provinsi,
+        [(pemda_code, pemda_name)], keyword_row=keyword_row
+    )
     return all_data  # ✅ list besar, bukan DataFrame
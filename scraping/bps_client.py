@@ -0,0 +1,194 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+
+import requests
+
+from scraping.http_client import make_session, DEFAULT_TIMEOUT
+from scraping.bps_decoder import decode_datacontent
+
+logger = logging.getLogger(__name__)
+
+# BPS WebAPI configuration
+# Nilai kosong di .env dianggap tidak diisi
+BPS_API_URL = os.getenv("BPS_API_URL") or "https://webapi.bps.go.id/v1/api"
+BPS_API_KEY = os.getenv("BPS_API_KEY") or "020c95b2c238d613941e86cc42d5e6dd"
+BPS_CACHE_DIR = os.getenv("BPS_CACHE_DIR") or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".bps_cache"
+)
+BPS_CACHE_TTL = int(os.getenv("BPS_CACHE_TTL") or 86400)  # detik, 0 mematikan cache
+
+
+class BPSResponse:
+    """
+    Parsed ``list/model/data`` envelope.
+
+    Each dimension (vervar, var, turvar, tahun, turtahun) is a list of
+    ``{"val", "label"}`` dicts; ``datacontent`` maps the concatenation of one
+    ``val`` per dimension, in that order, to the value.
+    """
+
+    def __init__(self, payload):
+        self.payload = payload or {}
+        self.status = self.payload.get("status")
+        self.message = self.payload.get("message")
+        self.vervar = self.payload.get("vervar") or []
+        self.var = self.payload.get("var") or []
+        self.turvar = self.payload.get("turvar") or []
+        self.tahun = self.payload.get("tahun") or []
+        self.turtahun = self.payload.get("turtahun") or []
+        self.datacontent = self.payload.get("datacontent") or {}
+        self._table = None
+
+    @property
+    def ok(self):
+        return self.status == "OK"
+
+    @property
+    def table(self):
+        """DecodedTable of datacontent, built on first use"""
+        if self._table is None:
+            self._table = decode_datacontent(self)
+        return self._table
+
+    @staticmethod
+    def label_map(items):
+        """{label: val} of one dimension"""
+        return {str(item["label"]): item["val"] for item in items}
+
+    @staticmethod
+    def val_map(items):
+        """{str(val): label} of one dimension"""
+        return {str(item["val"]): item["label"] for item in items}
+
+    def var_label(self, var, default=""):
+        return next((item["label"] for item in self.var if str(item["val"]) == str(var)), default)
+
+    @staticmethod
+    def key(vervar, var, turvar, tahun, turtahun):
+        return f"{vervar}{var}{turvar}{tahun}{turtahun}"
+
+    def value(self, vervar, var, turvar, tahun, turtahun=0):
+        return self.datacontent.get(self.key(vervar, var, turvar, tahun, turtahun))
+
+    @staticmethod
+    def select_years(tahun, available):
+        """
+        Resolve "2023" or a "2021:2023" range to the years present in
+        ``available`` (strings), keeping the requested order.
+        """
+        tahun = str(tahun)
+        if ":" in tahun:
+            start, end = tahun.split(":")
+            return [str(year) for year in range(int(start), int(end) + 1) if str(year) in available]
+        return [tahun] if tahun in available else []
+
+
+class BPSClient:
+    """
+    Client for the BPS WebAPI (webapi.bps.go.id).
+
+    Requests share one pooled session with a per-request timeout and retry
+    with exponential backoff on connection errors and 429/5xx responses.
+    Successful JSON responses are cached on disk, one file per URL, for
+    ``cache_ttl`` seconds; BPS tables change at most a few times a year, so
+    repeated fetches of the same table do not hit the API again.
+    """
+
+    def __init__(self, base_url=BPS_API_URL, key=BPS_API_KEY, cache_dir=BPS_CACHE_DIR,
+                 cache_ttl=BPS_CACHE_TTL, timeout=DEFAULT_TIMEOUT, pool_size=10, session=None):
+        self.base_url = base_url.rstrip("/")
+        self.key = key
+        self.cache_dir = cache_dir
+        self.cache_ttl = cache_ttl
+        self.timeout = timeout
+        self.session = session or make_session(pool_size=pool_size)
+
+    def data_url(self, domain, var, vervar=None, turvar=None, th=None, key=None, lang="ind"):
+        """URL of a ``list/model/data`` request; optional filters are left out of the path"""
+        url = f"{self.base_url}/list/model/data/lang/{lang}/domain/{domain}/var/{var}"
+        if vervar is not None:
+            url += f"/vervar/{vervar}"
+        if turvar is not None:
+            url += f"/turvar/{turvar}"
+        if th is not None:
+            url += f"/th/{th}"
+        return f"{url}/key/{key or self.key}/"
+
+    def fetch(self, domain, var, vervar=None, turvar=None, th=None, key=None, use_cache=True):
+        """
+        Fetch one data table. Returns a BPSResponse, or None when the request
+        fails or the response is not JSON.
+        """
+        payload = self.get_json(self.data_url(domain, var, vervar=vervar, turvar=turvar, th=th, key=key), use_cache)
+        return BPSResponse(payload) if payload is not None else None
+
+    # HTTP + cache
+
+    def get_json(self, url, use_cache=True):
+        use_cache = use_cache and self.cache_ttl > 0
+        if use_cache:
+            cached = self._read_cache(url)
+            if cached is not None:
+                return cached
+
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Gagal mengambil data dari API BPS: {e}")
+            return None
+        if response.status_code != 200:
+            logger.error(f"Gagal mengambil data dari API BPS (status {response.status_code})")
+            return None
+        try:
+            payload = response.json()
+        except ValueError:
+            logger.error("Respons API BPS bukan JSON")
+            return None
+
+        # Respons error (kunci salah, kuota habis) tidak disimpan
+        if use_cache and isinstance(payload, dict) and payload.get("status") == "OK":
+            self._write_cache(url, payload)
+        return payload
+
+    def _cache_path(self, url):
+        return os.path.join(self.cache_dir, hashlib.sha1(url.encode()).hexdigest() + ".json")
+
+    def _read_cache(self, url):
+        path = self._cache_path(url)
+        try:
+            if time.time() - os.path.getmtime(path) >= self.cache_ttl:
+                return None
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_cache(self, url, payload):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Tulis ke file sementara lalu rename agar pembaca lain tidak melihat file setengah jadi
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(payload, f)
+            os.replace(tmp_path, self._cache_path(url))
+        except OSError as e:
+            logger.warning(f"Gagal menyimpan cache respons BPS: {e}")
+
+    def clear_cache(self):
+        """Delete every cached response"""
+        if not os.path.isdir(self.cache_dir):
+            return
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".json"):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+
+
+# Dipakai bersama oleh semua modul scraping BPS
+bps_client = BPSClient()
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+
+# Urutan dimensi dalam kunci datacontent
+DIMENSIONS = ("vervar", "var", "turvar", "tahun", "turtahun")
+
+
+class DecodedTable:
+    """
+    Dense view of a BPS ``datacontent`` mapping.
+
+    ``values`` has shape (vervar, var, turvar, tahun, turtahun) with NaN for
+    cells missing from datacontent or not numeric. ``vals[dim]`` and
+    ``labels[dim]`` are string arrays aligned with each axis.
+    """
+
+    def __init__(self, values, vals, labels):
+        self.values = values
+        self.vals = vals
+        self.labels = labels
+
+    def positions(self, dim, selected=None):
+        """Axis positions of the given vals (any type; compared as strings); -1 when absent"""
+        if selected is None:
+            return np.arange(len(self.vals[dim]))
+        selected = np.asarray([str(v) for v in np.atleast_1d(selected)])
+        return pd.Index(self.vals[dim]).get_indexer(selected)
+
+    def select(self, vervar=None, var=None, turvar=None, tahun=None, turtahun=None):
+        """
+        Sub-array for the given vals per dimension (None keeps the whole
+        axis). Vals missing from the table are dropped from their axis.
+        Returns (values, {dim: selected vals}).
+        """
+        wanted = dict(zip(DIMENSIONS, (vervar, var, turvar, tahun, turtahun)))
+        index, vals = [], {}
+        for dim in DIMENSIONS:
+            positions = self.positions(dim, wanted[dim])
+            positions = positions[positions >= 0]
+            index.append(positions)
+            vals[dim] = self.vals[dim][positions]
+        return self.values[np.ix_(*index)], vals
+
+
+def _axis(items):
+    """(vals, labels) string arrays of one dimension; a missing dimension is the single val "0" """
+    if not items:
+        return np.array(["0"]), np.array([""])
+    return (
+        np.array([str(item["val"]) for item in items]),
+        np.array([str(item["label"]) for item in items]),
+    )
+
+
+def decode_datacontent(response):
+    """
+    Decode a BPSResponse into a DecodedTable.
+
+    All composite keys are built at once by broadcasting string
+    concatenation over the five axes and looked up in one pass. A key
+    shared by two cells (concatenation without separator can be ambiguous)
+    resolves to the same value for both, as a per-cell lookup would.
+    """
+    vals, labels = {}, {}
+    for dim in DIMENSIONS:
+        vals[dim], labels[dim] = _axis(getattr(response, dim))
+
+    shape = tuple(len(vals[dim]) for dim in DIMENSIONS)
+    keys = vals[DIMENSIONS[0]].reshape(-1, 1, 1, 1, 1)
+    for axis, dim in enumerate(DIMENSIONS[1:], start=1):
+        keys = np.char.add(keys, vals[dim].reshape([-1 if i == axis else 1 for i in range(5)]))
+
+    keys = keys.ravel().tolist()
+    found = np.fromiter(map(response.datacontent.get, keys), dtype=object, count=len(keys))
+    try:
+        values = found.astype(float)  # None -> NaN
+    except (TypeError, ValueError):
+        # Nilai non-numerik (mis. "-" atau "…") dijadikan NaN
+        values = pd.to_numeric(pd.Series(found), errors="coerce").to_numpy(dtype=float)
+    return DecodedTable(values.reshape(shape), vals, labels)
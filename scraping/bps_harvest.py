@@ -0,0 +1,131 @@
+import logging
+
+import numpy as np
+
+from geography import geography
+from scraping.bps_client import bps_client
+
+logger = logging.getLogger(__name__)
+
+
+class HarvestSpec:
+    """
+    One BPS table to harvest: ``var`` in ``domain`` (optionally one ``turvar``)
+    for the years in ``tahun`` ("2023", "2018:2023" or None for all),
+    stored under ``category_id``.
+    """
+
+    def __init__(self, domain, var, category_id, tahun=None, turvar=None):
+        self.domain = str(domain)
+        self.var = str(var)
+        self.category_id = int(category_id)
+        self.tahun = str(tahun) if tahun else None
+        self.turvar = str(turvar) if turvar not in (None, "") else None
+
+    @property
+    def table_key(self):
+        # Spesifikasi dengan tabel yang sama hanya diunduh sekali
+        return (self.domain, self.var, self.turvar)
+
+
+def _select_tahun(data, tahun):
+    """[(tahun_val, year)] for a year / "start:end" range; BPS tahun codes are also accepted"""
+    by_label = data.label_map(data.tahun)
+    if tahun is None:
+        labels = list(by_label)
+    else:
+        labels = data.select_years(tahun, by_label)
+        if not labels:
+            by_val = data.val_map(data.tahun)
+            labels = [str(by_val[tahun])] if tahun in by_val else []
+    return [(by_label[label], int(label)) for label in labels if label.isdigit()]
+
+
+def resolve_regency(vervar_val, vervar_label, province_id=None):
+    """
+    Regency dict for a BPS vervar region: by code first (regency ids are BPS
+    kabupaten/kota codes), then by normalised name. None when no single
+    regency matches.
+    """
+    try:
+        regency = geography.regency(int(vervar_val))
+    except (TypeError, ValueError):
+        regency = None
+    if regency is not None:
+        return regency
+
+    matches = geography.find_regencies(vervar_label, province_id)
+    return matches[0] if len(matches) == 1 else None
+
+
+def extract_rows(data, spec, regions=None, province_id=None):
+    """
+    Every region's values for ``spec`` from one BPS response.
+
+    ``regions`` optionally limits extraction to vervar codes or labels.
+    Returns (rows for data_store.upsert_data, labels of unresolved regions).
+    """
+    table = data.table
+    years = _select_tahun(data, spec.tahun)
+    # Irisan (vervar x tahun) dari tabel padat, bukan lookup kunci per sel
+    values, vals = table.select(
+        var=spec.var, turvar=spec.turvar or 0, tahun=[tahun_val for tahun_val, _ in years], turtahun=0
+    )
+    if not (len(vals["var"]) and len(vals["turvar"]) and len(vals["turtahun"])):
+        return [], []
+    values = values[:, 0, 0, :, 0]
+    year_by_val = {str(tahun_val): year for tahun_val, year in years}
+    row_years = [year_by_val[val] for val in vals["tahun"].tolist()]
+
+    labels = dict(zip(table.vals["vervar"].tolist(), table.labels["vervar"].tolist()))
+    wanted = {str(region) for region in regions} if regions else None
+
+    rows, unresolved = [], []
+    for i, val in enumerate(vals["vervar"].tolist()):
+        label = labels[val]
+        if wanted is not None and val not in wanted and label not in wanted:
+            continue
+
+        regency = resolve_regency(val, label, province_id)
+        if regency is None:
+            unresolved.append(label)
+            continue
+
+        for j in np.flatnonzero(~np.isnan(values[i])):
+            rows.append({
+                "amount": float(values[i, j]),
+                "year": row_years[j],
+                "city": label,
+                "category_id": spec.category_id,
+                "regency_id": regency["id"],
+                "province_id": regency["province_id"],
+            })
+    return rows, unresolved
+
+
+def harvest(specs, regions=None, province_id=None):
+    """
+    Fetch each distinct (domain, var, turvar) table once and extract all
+    regions for every spec that uses it. Nothing is written; the caller
+    upserts the rows (one transaction) and commits.
+
+    Returns {"rows", "unresolved", "failed", "requests"}.
+    """
+    responses = {}
+    for spec in specs:
+        if spec.table_key not in responses:
+            responses[spec.table_key] = bps_client.fetch(spec.domain, spec.var, turvar=spec.turvar)
+
+    rows, unresolved, failed = [], set(), []
+    for spec in specs:
+        data = responses[spec.table_key]
+        if data is None or not data.ok:
+            failed.append({"domain": spec.domain, "var": spec.var, "turvar": spec.turvar})
+            continue
+        spec_rows, spec_unresolved = extract_rows(data, spec, regions, province_id)
+        rows.extend(spec_rows)
+        unresolved.update(spec_unresolved)
+
+    if unresolved:
+        logger.warning(f"Wilayah BPS tanpa regency yang cocok: {sorted(unresolved)}")
+    return {"rows": rows, "unresolved": sorted(unresolved), "failed": failed, "requests": len(responses)}
@@ -1,4 +1,5 @@
-import requests
+import numpy as np
+from scraping.bps_client import bps_client
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -20,7 +21,7 @@ def get_bps_data(
     domain,
     var,
     tahun,
-    key="020c95b2c238d613941e86cc42d5e6dd",
+    key=None,
     vervar_label=None,
     turvar=None,
 ):
@@ -31,35 +32,27 @@ def get_bps_data(
         domain (str): Kode domain wilayah (misal: '3400' untuk DIY, '3471' untuk Kota Yogyakarta).
         var (str): Kode variabel data yang ingin diambil.
         tahun (str): Tahun data, bisa satu tahun ('2023') atau rentang ('2021:2023').
-        key (str): Kunci API untuk akses.
+        key (str, optional): Kunci API untuk akses. Default: BPS_API_KEY.
         vervar_label (str, optional): Label wilayah spesifik (misal: 'Sleman'). Jika None, akan mengambil semua wilayah.
         turvar (str, optional): Kode turunan variabel.
 
     Returns:
         list: Daftar (list) berisi kamus (dictionary) data yang berhasil diambil, atau list kosong jika gagal.
     """
-    # Membangun URL secara dinamis berdasarkan parameter
-    base_url = f"https://webapi.bps.go.id/v1/api/list/model/data/lang/ind/domain/{domain}/var/{var}/th/{tahun}/key/{key}/"
-    if turvar:
-        base_url += f"turvar/{turvar}/"
-
-    response = requests.get(base_url)
-    if response.status_code != 200:
-        print(f"Gagal mengambil data dari API. Status: {response.status_code}")
+    # Session, retry dan cache respons ditangani oleh BPSClient
+    data = bps_client.fetch(domain, var, turvar=turvar, th=tahun, key=key)
+    if data is None:
+        print("Gagal mengambil data dari API.")
         return []
 
-    data = response.json()
-    if data.get("status") != "OK" or "datacontent" not in data:
-        print(f"Error dari API: {data.get('message', 'Tidak ada data konten.')}")
+    if not data.ok or not data.datacontent:
+        print(f"Error dari API: {data.message or 'Tidak ada data konten.'}")
         return []
 
     # Mapping untuk mempermudah pencarian ID
-    vervar_map = {item["label"]: item["val"] for item in data.get("vervar", [])}
-    tahun_map = {item["label"]: item["val"] for item in data.get("tahun", [])}
-    var_label = next(
-        (item["label"] for item in data.get("var", []) if str(item["val"]) == str(var)),
-        "Label Tidak Ditemukan",
-    )
+    vervar_map = data.label_map(data.vervar)
+    tahun_map = data.label_map(data.tahun)
+    var_label = data.var_label(var, "Label Tidak Ditemukan")
 
     # Menentukan ID wilayah (vervar_id)
     vervar_ids = {}
@@ -73,40 +66,37 @@ def get_bps_data(
         vervar_ids = vervar_map
 
     # Menentukan rentang tahun
-    tahun_list = []
-    if ":" in tahun:
-        start, end = map(int, tahun.split(":"))
-        tahun_list = [str(y) for y in range(start, end + 1) if str(y) in tahun_map]
-    elif tahun in tahun_map:
-        tahun_list = [tahun]
+    tahun_list = data.select_years(tahun, tahun_map)
 
     if not tahun_list:
         print(f"Tahun '{tahun}' tidak ditemukan dalam data API.")
         return []
 
-    # Ekstraksi data
+    # Ekstraksi data: satu irisan (wilayah x tahun) dari tabel datacontent yang sudah didekode.
+    # Dengan turvar, kunci datacontent memakai kode turvar tersebut (tanpa turvar: 0)
+    values, vals = data.table.select(
+        vervar=list(vervar_ids.values()),
+        var=var,
+        turvar=turvar or 0,
+        tahun=[tahun_map[th] for th in tahun_list],
+        turtahun=0,
+    )
+    if 0 in values.shape:
+        return []
+    values = values[:, 0, 0, :, 0]
+    wilayah_labels = {str(wilayah_id): label for label, wilayah_id in vervar_ids.items()}
+    tahun_labels = {str(tahun_id): th for th, tahun_id in tahun_map.items()}
+
     result_data = []
-    datacontent = data.get("datacontent", {})
-
-    for wilayah_label, wilayah_id in vervar_ids.items():
-        for th in tahun_list:
-            tahun_id = tahun_map[th]
-            # Kunci data content bisa memiliki format berbeda, perlu penyesuaian jika ada turvar
-            data_key = f"{wilayah_id}{var}0{tahun_id}0"
-            if turvar:
-                # Format key bisa berbeda jika ada turvar, sesuaikan jika perlu
-                pass  # Contoh: data_key = f"{wilayah_id}{var}{turvar}{tahun_id}0"
-
-            value = datacontent.get(data_key)
-            if value is not None:
-                result_data.append(
-                    {
-                        "jenis_data": var_label,
-                        "wilayah": wilayah_label,
-                        "tahun": th,
-                        "data": float(value),
-                    }
-                )
+    for i, j in zip(*np.nonzero(~np.isnan(values))):
+        result_data.append(
+            {
+                "jenis_data": var_label,
+                "wilayah": wilayah_labels[vals["vervar"][i]],
+                "tahun": tahun_labels[vals["tahun"][j]],
+                "data": float(values[i, j]),
+            }
+        )
 
     return result_data
 
@@ -0,0 +1,52 @@
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_TIMEOUT = 30
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def make_session(pool_size=10, retries=3, backoff_factor=0.5):
+    """
+    requests.Session with a connection pool sized for ``pool_size`` concurrent
+    workers and automatic retry with exponential backoff on connection
+    errors and 429/5xx responses (Retry-After is honoured).
+    """
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class RateLimiter:
+    """Thread-safe limiter spacing calls at least 1/rate seconds apart (rate <= 0 disables)"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._next_at = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait_for = self._next_at - now
+            self._next_at = max(now, self._next_at) + self.interval
+        if wait_for > 0:
+            time.sleep(wait_for)
@@ -1,17 +1,37 @@
+import os
 import requests
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional, Tuple
+from sqlalchemy import select, bindparam
 from models import db, Province, Regency
+from table_versions import table_versions
+from geography import geography
 from datetime import datetime
+from scraping.http_client import make_session, RateLimiter, DEFAULT_TIMEOUT
 
 # BPS API configuration
-BPS_BASE_URL = "https://sig.bps.go.id/rest-bridging"
+BPS_BASE_URL = os.getenv("BPS_WILAYAH_URL", "https://sig.bps.go.id/rest-bridging")
 
 class ProvincesRegenciesScraper:
-    def __init__(self):
-        self.session = requests.Session()
-        # Set a timeout for requests
-        self.session.timeout = 30
+    def __init__(self, base_url: str = BPS_BASE_URL, max_workers: int = 8,
+                 rate_limit: float = 10.0, timeout: float = DEFAULT_TIMEOUT):
+        """
+        Args:
+            base_url: BPS rest-bridging root (override to test against a stub server)
+            max_workers: Maximum concurrent regency requests
+            rate_limit: Maximum requests per second to the BPS host (0 disables)
+            timeout: Per-request timeout in seconds
+        """
+        self.base_url = base_url.rstrip("/")
+        self.max_workers = max_workers
+        self.timeout = timeout
+        # Session dengan pool koneksi dan retry/backoff, dipakai bersama oleh semua worker
+        self.session = make_session(pool_size=max_workers)
+        self.rate_limiter = RateLimiter(rate_limit)
+        # Jumlah perubahan dari save_to_database terakhir
+        self.last_sync = None
 
     def get_provinces_data(self) -> List[Dict]:
         """
@@ -20,9 +40,10 @@ class ProvincesRegenciesScraper:
         """
         try:
             # Using correct BPS API endpoint for provinces
-            url = f"{BPS_BASE_URL}/getwilayah?level=provinsi&parent=0"
+            url = f"{self.base_url}/getwilayah?level=provinsi&parent=0"
 
-            response = self.session.get(url)
+            self.rate_limiter.wait()
+            response = self.session.get(url, timeout=self.timeout)
             response.raise_for_status()
 
             data = response.json()
@@ -52,9 +73,10 @@ class ProvincesRegenciesScraper:
         """
         try:
             # Using correct BPS API endpoint for regencies
-            url = f"{BPS_BASE_URL}/getwilayah?level=kabupaten&parent={province_id}"
+            url = f"{self.base_url}/getwilayah?level=kabupaten&parent={province_id}"
 
-            response = self.session.get(url)
+            self.rate_limiter.wait()
+            response = self.session.get(url, timeout=self.timeout)
             response.raise_for_status()
 
             data = response.json()
@@ -94,13 +116,12 @@ class ProvincesRegenciesScraper:
 
         all_regencies = []
 
-        # Get regencies for each province
-        for province in provinces:
-            province_id = province["id"]
-            logging.info(f"Fetching regencies for province: {province['name']} ({province_id})")
-
-            regencies = self.get_regencies_data(province_id)
+        # Ambil regencies semua provinsi secara paralel (dibatasi max_workers dan rate limiter);
+        # map() menjaga urutan hasil sesuai urutan provinsi
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = list(executor.map(lambda p: self.get_regencies_data(p["id"]), provinces))
 
+        for province, regencies in zip(provinces, results):
             if regencies:
                 all_regencies.extend(regencies)
                 logging.info(f"Found {len(regencies)} regencies for province {province['name']}")
@@ -145,38 +166,102 @@ class ProvincesRegenciesScraper:
         return True
 
     def save_to_database(self, provinces: List[Dict], regencies: List[Dict]) -> bool:
-        """Save provinces and regencies data to database"""
+        """
+        Sync provinces and regencies with the fetched data incrementally.
+
+        The fetched set is diffed against the tables and only inserts, renames
+        (and regency moves between provinces) and deletes are applied, each as
+        one bulk statement in a single transaction. Untouched rows keep their
+        ids, timestamps and bps/kemenkeu codes. Regencies of a province for
+        which nothing was fetched are kept, since an empty list usually means
+        that province's request failed.
+        """
         try:
-            logging.info("Starting to save provinces and regencies to database...")
-
-            # Clear existing data
-            db.session.query(Regency).delete()
-            db.session.query(Province).delete()
-            db.session.commit()
+            logging.info("Starting to sync provinces and regencies to database...")
+            province_table = Province.__table__
+            regency_table = Regency.__table__
+            now = datetime.now()
+
+            fetched_provinces = {int(p["id"]): p["name"] for p in provinces}
+            fetched_regencies = {
+                int(r["id"]): (r["name"], int(r["province_id"])) for r in regencies
+            }
+            existing_provinces = dict(db.session.execute(
+                select(province_table.c.id, province_table.c.name)
+            ).all())
+            existing_regencies = {
+                regency_id: (name, province_id)
+                for regency_id, name, province_id in db.session.execute(
+                    select(regency_table.c.id, regency_table.c.name, regency_table.c.province_id)
+                ).all()
+            }
 
-            # Save provinces
-            for province_data in provinces:
-                province = Province(
-                    id=province_data["id"],
-                    name=province_data["name"],
-                    created_at=datetime.now(),
-                    updated_at=datetime.now()
+            province_inserts = [
+                {"id": pid, "name": name, "created_at": now, "updated_at": now}
+                for pid, name in fetched_provinces.items() if pid not in existing_provinces
+            ]
+            province_updates = [
+                {"b_id": pid, "b_name": name}
+                for pid, name in fetched_provinces.items()
+                if pid in existing_provinces and existing_provinces[pid] != name
+            ]
+            province_deletes = {pid for pid in existing_provinces if pid not in fetched_provinces}
+
+            regency_inserts = [
+                {"id": rid, "name": name, "province_id": pid, "created_at": now, "updated_at": now}
+                for rid, (name, pid) in fetched_regencies.items() if rid not in existing_regencies
+            ]
+            regency_updates = [
+                {"b_id": rid, "b_name": name, "b_province_id": pid}
+                for rid, (name, pid) in fetched_regencies.items()
+                if rid in existing_regencies and existing_regencies[rid] != (name, pid)
+            ]
+            fetched_parents = {pid for _, pid in fetched_regencies.values()}
+            regency_deletes = [
+                rid for rid, (_, pid) in existing_regencies.items()
+                if rid not in fetched_regencies
+                and (pid in fetched_parents or pid in province_deletes)
+            ]
+
+            # Urutan menjaga foreign key: provinsi baru dulu, provinsi dihapus terakhir
+            if province_inserts:
+                db.session.execute(province_table.insert(), province_inserts)
+            if province_updates:
+                db.session.execute(
+                    province_table.update()
+                    .where(province_table.c.id == bindparam("b_id"))
+                    .values(name=bindparam("b_name"), updated_at=now),
+                    province_updates,
                 )
-                db.session.add(province)
-
-            # Save regencies
-            for regency_data in regencies:
-                regency = Regency(
-                    id=regency_data["id"],
-                    name=regency_data["name"],
-                    province_id=regency_data["province_id"],
-                    created_at=datetime.now(),
-                    updated_at=datetime.now()
+            if regency_inserts:
+                db.session.execute(regency_table.insert(), regency_inserts)
+            if regency_updates:
+                db.session.execute(
+                    regency_table.update()
+                    .where(regency_table.c.id == bindparam("b_id"))
+                    .values(name=bindparam("b_name"), province_id=bindparam("b_province_id"), updated_at=now),
+                    regency_updates,
                 )
-                db.session.add(regency)
+            if regency_deletes:
+                db.session.execute(regency_table.delete().where(regency_table.c.id.in_(regency_deletes)))
+            if province_deletes:
+                db.session.execute(province_table.delete().where(province_table.c.id.in_(list(province_deletes))))
 
             db.session.commit()
-            logging.info(f"Successfully saved {len(provinces)} provinces and {len(regencies)} regencies to database")
+
+            changes = {
+                "provinces_inserted": len(province_inserts),
+                "provinces_updated": len(province_updates),
+                "provinces_deleted": len(province_deletes),
+                "regencies_inserted": len(regency_inserts),
+                "regencies_updated": len(regency_updates),
+                "regencies_deleted": len(regency_deletes),
+            }
+            self.last_sync = changes
+            if any(changes.values()):
+                geography.refresh()
+                table_versions.bump("geography")
+            logging.info(f"Provinces and regencies synced: {changes}")
             return True
 
         except Exception as e:
@@ -241,6 +326,49 @@ def get_latest_provinces_regencies_data() -> Tuple[List[Dict], List[Dict]]:
     return provinces, regencies
 
 
+# Singleflight: paling banyak satu refresh berjalan per proses, pemanggil bersamaan berbagi hasilnya
+_refresh_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="geography-refresh")
+_refresh_lock = threading.Lock()
+_refresh_future = None
+_refresh_status = {"running": False, "started_at": None, "finished_at": None, "error": None,
+                   "provinces": None, "regencies": None}
+
+
+def _run_refresh(app):
+    with app.app_context():
+        try:
+            provinces, regencies = get_latest_provinces_regencies_data()
+            _refresh_status.update(error=None if provinces else "Failed to scrape provinces and regencies data",
+                                   provinces=len(provinces), regencies=len(regencies))
+            return provinces, regencies
+        except Exception as e:
+            logging.error(f"Provinces/regencies refresh failed: {str(e)}")
+            _refresh_status.update(error=str(e))
+            return [], []
+        finally:
+            _refresh_status.update(running=False, finished_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+
+
+def refresh_provinces_regencies(app, wait: bool = False):
+    """
+    Scrape and sync provinces/regencies in a background thread. A call made
+    while a refresh is already running joins it instead of starting another.
+    With wait=True blocks and returns (provinces, regencies); otherwise
+    returns the Future.
+    """
+    global _refresh_future
+    with _refresh_lock:
+        if _refresh_future is None or _refresh_future.done():
+            _refresh_status.update(running=True, started_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+            _refresh_future = _refresh_executor.submit(_run_refresh, app)
+        future = _refresh_future
+    return future.result() if wait else future
+
+
+def refresh_status() -> Dict:
+    return dict(_refresh_status)
+
+
 
 def get_provinces_from_db() -> List[Dict]:
     """Get provinces data from database"""
@@ -1,43 +1,33 @@
-import requests
+from scraping.bps_client import bps_client
 
 def fetch_data(vervar, var, th):
-    url = f"https://webapi.bps.go.id/v1/api/list/model/data/lang/ind/domain/0000/var/{var}/vervar/{vervar}/th/{th}/key/020c95b2c238d613941e86cc42d5e6dd"
     """Mengambil data dari API dan mengembalikan data yang sudah diolah."""
-    response = requests.get(url)
-    if response.status_code != 200:
-        print(f"Gagal mengambil data dari API pada URL {url}")
+    data = bps_client.fetch("0000", var, vervar=vervar, th=th)
+    if data is None:
+        print(f"Gagal mengambil data dari API untuk var={var}, vervar={vervar}, th={th}")
         return []
 
-    data = response.json()
-    if data.get("status") != "OK":
-        print(f"Data tidak tersedia atau status tidak OK pada URL {url}")
+    if not data.ok:
+        print(f"Data tidak tersedia atau status tidak OK untuk var={var}, vervar={vervar}, th={th}")
         return []
 
-    vervar_list = data.get("vervar", [])
-    var_list = data.get("var", [])
-    turvar_list = data.get("turvar", [])
-    turtahun_list = data.get("turtahun", [])
-    tahun_list = data.get("tahun", [])
-    datacontent = data.get("datacontent", {})
-
     # Mendapatkan nilai `var`, `turvar`, dan `turtahun` yang pertama sebagai asumsi
-    var = var_list[0]["val"] if var_list else ""
-    varlab = var_list[0]["label"] if var_list else ""
-    turvar = turvar_list[0]["val"] if turvar_list else ""
-    turtahun = turtahun_list[0]["val"] if turtahun_list else ""
+    var = data.var[0]["val"] if data.var else ""
+    varlab = data.var[0]["label"] if data.var else ""
+    turvar = data.turvar[0]["val"] if data.turvar else ""
+    turtahun = data.turtahun[0]["val"] if data.turtahun else ""
 
     # Membuat list untuk data akhir
     result_data = []
 
     # Iterasi data vervar dan tahun, serta datacontent
-    for vervar in vervar_list:
+    for vervar in data.vervar:
         wilayah = vervar["label"]  # Nama wilayah
         kab_kota = vervar["val"]
 
-        for tahun in tahun_list:
+        for tahun in data.tahun:
             tahun_val = tahun["label"]  # Tahun
-            data_key = f"{kab_kota}{var}{turvar}{tahun['val']}{turtahun}"
-            jumlah_penduduk = datacontent.get(data_key, None)
+            jumlah_penduduk = data.value(kab_kota, var, turvar, tahun["val"], turtahun)
 
             if jumlah_penduduk is not None:
                 result_data.append(
@@ -48,4 +38,4 @@ def fetch_data(vervar, var, th):
                         "data": jumlah_penduduk,
                     }
                 )
-    return result_data
\ No newline at end of file
+    return result_data
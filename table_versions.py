@@ -0,0 +1,91 @@
+import functools
+import hashlib
+import math
+import threading
+import time
+
+from flask import request, make_response
+
+
+class TableVersions:
+    """
+    In-process version counters for groups of tables ("data", "categories",
+    "geography"), bumped by writers after commit and used to build ETag and
+    Last-Modified validators without querying the database.
+
+    Counters live in this process only. Validators also roll over every
+    ``ttl`` seconds (aligned to wall-clock time so all workers roll over
+    together), which bounds how long another worker's write can go
+    unnoticed, the same bound the in-memory data caches use.
+    """
+
+    def __init__(self, tables, ttl=300):
+        self.ttl = ttl
+        started = math.ceil(time.time())
+        self._versions = {table: 0 for table in tables}
+        self._modified = {table: started for table in tables}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.ttl = app.config.get("DATA_CACHE_TTL", self.ttl)
+
+    def bump(self, *tables):
+        now = math.ceil(time.time())
+        with self._lock:
+            for table in tables:
+                self._versions[table] += 1
+                self._modified[table] = now
+
+    def version(self, table):
+        return self._versions[table]
+
+    def validators(self, tables, key):
+        """Return (etag, last_modified unix seconds) for a response over tables"""
+        epoch = int(time.time() // self.ttl)
+        versions = ",".join(f"{table}={self._versions[table]}" for table in tables)
+        etag = hashlib.sha1(f"{epoch}|{versions}|{key}".encode()).hexdigest()
+        last_modified = max([self._modified[table] for table in tables] + [epoch * self.ttl])
+        return etag, last_modified
+
+
+table_versions = TableVersions(("data", "categories", "geography"))
+
+
+def conditional(*tables):
+    """
+    Serve GET responses with ETag / Last-Modified derived from the version
+    of the given tables and answer 304 Not Modified before running the view
+    when the client's validators still match.
+
+    The ETag is weak (W/"..."): it is built from per-process counters, not
+    from the response bytes, so it only claims semantic equivalence. A write
+    made through another worker process is picked up by this process's
+    validators after at most ``ttl`` (DATA_CACHE_TTL) seconds; until then a
+    client revalidating against this process may get 304 for stale content.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            key = f"{request.path}?{sorted(request.args.items(multi=True))}"
+            etag, last_modified = table_versions.validators(tables, key)
+
+            # If-None-Match lebih diutamakan daripada If-Modified-Since (RFC 9110)
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains_weak(etag)
+            else:
+                since = request.if_modified_since
+                not_modified = since is not None and since.timestamp() >= last_modified
+
+            if not_modified:
+                response = make_response("", 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag, weak=True)
+            response.last_modified = last_modified
+            response.cache_control.no_cache = True
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,151 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# Database dan cache BPS sementara; harus di-set sebelum app diimpor
+_TMP_DIR = tempfile.mkdtemp(prefix="be-datapolicy-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TMP_DIR, 'test.db')}"
+os.environ["BPS_CACHE_DIR"] = os.path.join(_TMP_DIR, "bps_cache")
+os.environ["BPS_CACHE_TTL"] = "0"
+os.environ["SCRAPE_JOBS_ENABLED"] = "false"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event  # noqa: E402
+from sqlalchemy.engine import Engine  # noqa: E402
+
+from app import app as flask_app  # noqa: E402
+from models import db, Category, Data, Province, Regency  # noqa: E402
+from data_cache import data_cache  # noqa: E402
+from category_cache import category_cache  # noqa: E402
+from geography import geography  # noqa: E402
+from result_cache import analysis_cache, geography_cache  # noqa: E402
+import model_registry  # noqa: E402
+from scraping.bps_client import bps_client  # noqa: E402
+
+CITIES = {3471: "Kota Yogyakarta", 3404: "Sleman", 3578: "Kota Surabaya"}
+YEARS = range(2015, 2024)
+
+
+@event.listens_for(Engine, "connect")
+def _sqlite_foreign_keys(dbapi_connection, connection_record):
+    # SQLite tidak menegakkan foreign key tanpa PRAGMA ini (MySQL selalu menegakkan)
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+def _reset_caches():
+    data_cache.invalidate()
+    category_cache.invalidate()
+    geography.invalidate()
+    analysis_cache.clear()
+    geography_cache.clear()
+    model_registry._loaded.clear()
+
+
+def seed():
+    for category_id, name in [(1, "IPM"), (2, "MISKIN"), (3, "STUNTING")]:
+        db.session.add(Category(id=category_id, name=name))
+    db.session.add(Province(id=34, name="DI YOGYAKARTA", bps_code="34"))
+    db.session.add(Province(id=35, name="JAWA TIMUR", bps_code="35"))
+    for regency_id, city in CITIES.items():
+        db.session.add(Regency(id=regency_id, province_id=regency_id // 100, name=city.upper()))
+    db.session.flush()
+    for regency_id, city in CITIES.items():
+        for year in YEARS:
+            for category_id in (1, 2, 3):
+                db.session.add(Data(
+                    amount=float((year * 31 + regency_id * 17 + category_id * 13) % 97 + category_id * 10),
+                    year=year, city=city, category_id=category_id,
+                    regency_id=regency_id, province_id=regency_id // 100,
+                ))
+    db.session.commit()
+
+
+@pytest.fixture
+def app():
+    flask_app.config["TESTING"] = True
+    with flask_app.app_context():
+        db.drop_all()
+        db.create_all()
+        seed()
+        _reset_caches()
+        yield flask_app
+        db.session.remove()
+    _reset_caches()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+class BPSStub:
+    """
+    Local stand-in for the BPS WebAPI ``list/model/data`` endpoint. Regions
+    are BPS kabupaten/kota codes with labels, tahun vals 118..123 are
+    2018..2023 and each cell value is derived from its position.
+    """
+
+    REGIONS = [("3404", "Sleman"), ("3471", "KOTA YOGYAKARTA"), ("3402", "Bantul")]
+    YEARS = [(str(y - 1900), str(y)) for y in range(2018, 2024)]
+
+    def __init__(self):
+        self.hits = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.hits.append(self.path)
+                parts = [p for p in self.path.split("/") if p]
+                rest = parts[parts.index("data") + 1:]
+                body = json.dumps(stub.payload(dict(zip(rest[::2], rest[1::2])))).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def value(self, region_index, year_index):
+        return round(10 + region_index + year_index * 0.5, 2)
+
+    def payload(self, params):
+        var, turvar = params["var"], params.get("turvar", "0")
+        years = [y for y in self.YEARS if "th" not in params or params["th"] in y]
+        datacontent = {
+            f"{region}{var}{turvar}{val}0": self.value(i, self.YEARS.index((val, label)))
+            for i, (region, _) in enumerate(self.REGIONS)
+            for val, label in years
+        }
+        return {
+            "status": "OK",
+            "data-availability": "available",
+            "var": [{"val": int(var), "label": f"Var {var}"}],
+            "turvar": [{"val": int(turvar), "label": "T"}],
+            "vervar": [{"val": int(code), "label": label} for code, label in self.REGIONS],
+            "tahun": [{"val": int(val), "label": label} for val, label in years],
+            "turtahun": [{"val": 0, "label": "Tahun"}],
+            "datacontent": datacontent,
+        }
+
+
+@pytest.fixture
+def bps_stub(monkeypatch):
+    stub = BPSStub()
+    monkeypatch.setattr(bps_client, "base_url", stub.url)
+    monkeypatch.setattr(bps_client, "cache_ttl", 0)
+    yield stub
+    stub.server.shutdown()
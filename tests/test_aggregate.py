@@ -0,0 +1,65 @@
+import pytest
+
+import data_summary
+from data_cache import data_cache
+from models import db, Data
+
+
+@pytest.fixture
+def null_rows(app):
+    db.session.add(Data(amount=5.0, year=None, city="Sleman", category_id=1, regency_id=3404, province_id=34))
+    db.session.add(Data(amount=7.0, year=2020, city="Tanpa kode", category_id=1, regency_id=None, province_id=None))
+    db.session.commit()
+    data_cache.invalidate()
+
+
+@pytest.mark.parametrize("query", [
+    "category_id=1&group_by=regency_id,year&metrics=sum,count",
+    "category_id=1&group_by=year&metrics=sum,count&regency_id=3404",
+    "category_id=1&group_by=province_id,year&metrics=sum&end_year=2021",
+    "category_id=1&group_by=year&metrics=sum&regency_id=3404&start_year=2018",
+])
+def test_cache_path_matches_sql_path_for_null_ids(client, null_rows, monkeypatch, query):
+    monkeypatch.setitem(client.application.config, "AGGREGATE_USE_SUMMARY", False)
+    cached = client.get(f"/api/data/aggregate?{query}").json
+
+    monkeypatch.setattr(data_cache, "enabled", False)
+    from_sql = client.get(f"/api/data/aggregate?{query}").json
+
+    assert cached == from_sql
+
+
+def test_null_year_is_reported_as_none(client, null_rows):
+    result = client.get("/api/data/aggregate?category_id=1&group_by=year&metrics=sum&regency_id=3404").json
+
+    assert result["data"][0] == {"year": None, "sum": 5.0}
+
+
+@pytest.mark.parametrize("query", [
+    "category_id=1&group_by=province_id&metrics=sum,count,min,max",
+    "category_id=1,2&group_by=category_id&metrics=sum,count,mean",
+    "category_id=1&group_by=year&metrics=sum,count,growth",
+    "category_id=1&group_by=province_id,year&metrics=sum,count&province_id=34",
+    "category_id=1&group_by=year&metrics=sum&start_year=2018&end_year=2021",
+])
+def test_summary_path_matches_raw_path(client, null_rows, monkeypatch, query):
+    data_summary.rebuild_summary()
+    from_summary = client.get(f"/api/data/aggregate?{query}").json
+
+    monkeypatch.setitem(client.application.config, "AGGREGATE_USE_SUMMARY", False)
+    monkeypatch.setattr(data_cache, "enabled", False)
+    from_sql = client.get(f"/api/data/aggregate?{query}").json
+
+    assert from_summary == from_sql
+
+
+def test_null_year_write_refreshes_summary(client):
+    data_summary.rebuild_summary()
+    response = client.post("/api/data", json={
+        "amount": 5.0, "year": None, "city": "Sleman",
+        "category_id": 1, "regency_id": 3404, "province_id": 34,
+    })
+    assert response.status_code == 201
+
+    result = client.get("/api/data/aggregate?category_id=1&group_by=year&metrics=sum,count").json
+    assert result["data"][0] == {"year": None, "sum": 5.0, "count": 1}
@@ -0,0 +1,35 @@
+from result_cache import analysis_cache
+
+ANALYSIS = {
+    "cities": ["Kota Yogyakarta", "Sleman"],
+    "regression_type": "linear",
+    "analysis_type": "multi",
+    "variables": ["IPM", "MISKIN", "STUNTING"],
+}
+
+
+def test_city_order_shares_one_cache_entry(client):
+    first = client.post("/api/analysis", json=ANALYSIS)
+    reordered = client.post("/api/analysis", json={**ANALYSIS, "cities": ["Sleman", "Kota Yogyakarta"]})
+
+    assert first.status_code == 200
+    assert reordered.json == first.json
+    assert len(analysis_cache._entries) == 1
+
+
+def test_variable_order_is_part_of_the_key(client):
+    client.post("/api/analysis", json=ANALYSIS)
+    swapped = client.post("/api/analysis", json={**ANALYSIS, "variables": ["MISKIN", "IPM", "STUNTING"]})
+
+    assert swapped.json["variables_analyzed"]["independent"] == ["MISKIN", "IPM"]
+    assert len(analysis_cache._entries) == 2
+
+
+def test_write_invalidates_cached_analysis(client):
+    client.post("/api/analysis", json=ANALYSIS)
+    client.post("/api/data", json={
+        "amount": 1.0, "year": 2030, "city": "Sleman",
+        "category_id": 1, "regency_id": 3404, "province_id": 34,
+    })
+
+    assert len(analysis_cache._entries) == 0
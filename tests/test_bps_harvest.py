@@ -0,0 +1,69 @@
+import pytest
+
+from models import db, Category, Data
+
+
+@pytest.fixture
+def angkatan_kerja(app):
+    db.session.add(Category(id=8, name="JUMLAH ANGKATAN BEKERJA"))
+    db.session.commit()
+
+
+def test_harvest_fetches_each_table_once(client, bps_stub):
+    response = client.post("/api/bps/harvest", json={"items": [
+        {"domain": "0000", "jenis_data": "413", "kategori": 1, "tahun": "2020:2022"},
+        {"domain": "0000", "jenis_data": "413", "kategori": 2, "tahun": "2023"},
+    ]})
+
+    assert response.status_code == 200
+    assert response.json["request_count"] == 1
+    assert len(bps_stub.hits) == 1
+    assert response.json["unresolved"] == ["Bantul"]
+    sleman = Data.query.filter_by(category_id=1, regency_id=3404, year=2021).one()
+    assert sleman.amount == bps_stub.value(0, 3)
+
+
+@pytest.mark.parametrize("item, message", [
+    ({"domain": "0000", "jenis_data": "413", "kategori": "ipm"}, "Kategori"),
+    ({"domain": "0000", "jenis_data": "413", "kategori": 99}, "Kategori 99"),
+])
+def test_harvest_rejects_bad_kategori(client, item, message):
+    response = client.post("/api/bps/harvest", json={"items": [item]})
+
+    assert response.status_code == 400
+    assert message in response.json["error"]
+
+
+def test_harvest_rejects_non_numeric_provinsi(client, bps_stub):
+    response = client.post("/api/bps/harvest", json={
+        "items": [{"domain": "0000", "jenis_data": "413", "kategori": 1}], "provinsi": "DIY",
+    })
+
+    assert response.status_code == 400
+
+
+def test_jumlah_angkatan_bekerja_single_and_bulk_share_one_key(client, bps_stub, angkatan_kerja):
+    # Baris lama dari versi sebelumnya: hanya nama kota, tanpa regency
+    db.session.add(Data(amount=1.0, year=2021, city="Sleman", category_id=8))
+    db.session.commit()
+
+    single = client.post("/api/jumlah-angkatan-bekerja", json={"jenis_data": "368", "tahun": "121", "wilayah": "Sleman"})
+    assert single.status_code == 200
+    assert single.json["data"]["regency_id"] == 3404
+
+    bulk = client.post("/api/jumlah-angkatan-bekerja", json={"jenis_data": "368", "tahun": "121", "wilayah": "all"})
+    assert bulk.status_code == 200
+    assert (bulk.json["inserted_count"], bulk.json["updated_count"]) == (1, 0)
+
+    rows = Data.query.filter_by(category_id=8, year=2021).order_by(Data.regency_id).all()
+    assert [(r.regency_id, r.city, r.amount) for r in rows] == [
+        (3404, "Sleman", bps_stub.value(0, 3)),
+        (3471, "KOTA YOGYAKARTA", bps_stub.value(1, 3)),
+    ]
+
+
+def test_jumlah_angkatan_bekerja_unknown_region(client, bps_stub, angkatan_kerja):
+    response = client.post("/api/jumlah-angkatan-bekerja", json={"jenis_data": "368", "tahun": "121", "wilayah": "Bantul"})
+
+    assert response.status_code == 404
+    assert Data.query.filter_by(category_id=8).count() == 0
@@ -0,0 +1,6 @@
+def test_explain_queries_covers_the_adopt_city_rows_lookup(app):
+    result = app.test_cli_runner().invoke(args=["explain-queries"])
+
+    assert result.exit_code == 0, result.output
+    assert "[OK] scraper legacy city rows (data_store.adopt_city_rows)" in result.output
+    assert "city-keyed scraper upsert" not in result.output
@@ -0,0 +1,48 @@
+URL = "/api/data?category_id=1"
+
+
+def test_etag_is_weak_and_revalidates_with_304(client):
+    first = client.get(URL)
+    etag = first.headers["ETag"]
+
+    assert first.status_code == 200
+    assert etag.startswith('W/"')
+
+    again = client.get(URL, headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.data == b""
+    assert again.headers["ETag"] == etag
+
+
+def test_write_changes_the_etag(client):
+    etag = client.get(URL).headers["ETag"]
+
+    client.post("/api/data", json={
+        "amount": 1.0, "year": 2030, "city": "Sleman",
+        "category_id": 1, "regency_id": 3404, "province_id": 34,
+    })
+    after = client.get(URL, headers={"If-None-Match": etag})
+
+    assert after.status_code == 200
+    assert after.headers["ETag"] != etag
+
+
+def test_etag_depends_on_query_arguments(client):
+    assert client.get(URL).headers["ETag"] != client.get("/api/data?category_id=2").headers["ETag"]
+
+
+def test_if_modified_since(client):
+    first = client.get(URL)
+
+    again = client.get(URL, headers={"If-Modified-Since": first.headers["Last-Modified"]})
+    assert again.status_code == 304
+
+
+def test_category_update_invalidates_category_reads(client):
+    etag = client.get("/api/categories").headers["ETag"]
+
+    client.put("/api/categories/1", json={"name": "IPM BARU"})
+    after = client.get("/api/categories", headers={"If-None-Match": etag})
+
+    assert after.status_code == 200
+    assert "IPM BARU" in after.get_data(as_text=True)
@@ -0,0 +1,41 @@
+import pytest
+
+from data_cache import data_cache
+from models import db, Data
+
+
+@pytest.fixture
+def undated(app):
+    for amount in (1.0, 2.0, 3.0):
+        db.session.add(Data(amount=amount, year=None, city="Sleman", category_id=1, regency_id=None, province_id=34))
+    db.session.commit()
+    data_cache.invalidate()
+
+
+def _pages(client, query, limit):
+    ids, cursors, cursor = [], [], None
+    while True:
+        url = f"/api/data?{query}&limit={limit}&fields=id" + (f"&cursor={cursor}" if cursor else "")
+        response = client.get(url)
+        assert response.status_code == 200, response.json
+        ids += [row["id"] for row in response.json["data"]]
+        cursor = response.json["next_cursor"]
+        if cursor is None:
+            return ids, cursors
+        cursors.append(cursor)
+
+
+@pytest.mark.parametrize("cached", [True, False])
+def test_pages_continue_past_rows_without_year(client, undated, monkeypatch, cached):
+    monkeypatch.setattr(data_cache, "enabled", cached)
+    expected = [row["id"] for row in client.get("/api/data?category_id=1&province_id=34").json]
+
+    ids, cursors = _pages(client, "category_id=1&province_id=34", limit=2)
+
+    assert ids == expected
+    assert cursors[0].startswith("null:")
+    assert not cursors[1].startswith("null:")
+
+
+def test_invalid_cursor_is_rejected(client):
+    assert client.get("/api/data?category_id=1&limit=2&cursor=abc:1").status_code == 400
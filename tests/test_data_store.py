@@ -0,0 +1,90 @@
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+import data_store
+from models import db, Data
+
+
+@pytest.fixture(params=["native", "fallback"])
+def upsert_path(request, monkeypatch):
+    if request.param == "fallback":
+        # Dialek tanpa upsert native
+        monkeypatch.setattr(data_store, "_upsert_statement", lambda dialect_name: None)
+    return request.param
+
+
+def _row(year, amount, regency_id=3404, category_id=1, city=None):
+    return {
+        "amount": amount, "year": year, "city": city, "category_id": category_id,
+        "regency_id": regency_id, "province_id": regency_id // 100,
+    }
+
+
+def _amount(year, regency_id=3404, category_id=1):
+    return db.session.execute(
+        db.select(Data.amount).filter_by(year=year, regency_id=regency_id, category_id=category_id)
+    ).scalars().all()
+
+
+def test_upsert_inserts_new_keys_and_updates_existing(app, upsert_path):
+    stored = _amount(2020)[0]
+    inserted, updated = data_store.upsert_data([
+        _row(2020, stored),        # tidak berubah
+        _row(2021, 123.0),         # berubah
+        _row(2030, 1.0),           # baru
+    ], count=True)
+    db.session.commit()
+
+    assert (inserted, updated) == (1, 1)
+    assert _amount(2020) == [stored]
+    assert _amount(2021) == [123.0]
+    assert _amount(2030) == [1.0]
+
+
+def test_duplicate_keys_in_one_call_keep_the_last_row(app, upsert_path):
+    inserted, updated = data_store.upsert_data([_row(2031, 1.0), _row(2031, 2.0)], count=True)
+    db.session.commit()
+
+    assert (inserted, updated) == (1, 0)
+    assert _amount(2031) == [2.0]
+
+
+def test_city_is_kept_when_the_new_row_has_none(app, upsert_path):
+    data_store.upsert_data([_row(2020, 5.0, city=None)])
+    db.session.commit()
+
+    assert Data.query.filter_by(year=2020, regency_id=3404, category_id=1).one().city == "Sleman"
+
+
+def test_rows_with_null_key_columns_are_always_inserted(app, upsert_path):
+    row = {"amount": 1.0, "year": 2020, "city": "X", "category_id": 1, "regency_id": None, "province_id": None}
+    inserted, updated = data_store.upsert_data([row, dict(row)], count=True)
+    db.session.commit()
+
+    assert (inserted, updated) == (2, 0)
+    assert Data.query.filter_by(city="X").count() == 2
+
+
+def test_unique_key_rejects_a_second_row_for_the_same_key(app):
+    db.session.add(Data(amount=1.0, year=2020, city="Sleman", category_id=1, regency_id=3404, province_id=34))
+    with pytest.raises(IntegrityError):
+        db.session.commit()
+    db.session.rollback()
+
+
+def test_adopt_city_rows_attaches_legacy_rows_to_the_upsert_key(app):
+    db.session.add(Data(amount=1.0, year=2020, city="Sleman", category_id=2, regency_id=None, province_id=None))
+    db.session.add(Data(amount=2.0, year=2021, city="Sleman", category_id=2, regency_id=None, province_id=None))
+    db.session.commit()
+    Data.query.filter_by(category_id=2, regency_id=3404, year=2021).delete()
+    db.session.commit()
+
+    rows = [_row(2020, 10.0, category_id=2, city="Sleman"), _row(2021, 11.0, category_id=2, city="Sleman")]
+    # 2020 sudah tersimpan dengan kunci regency: baris lama dibiarkan
+    assert data_store.adopt_city_rows(rows) == 1
+    inserted, updated = data_store.upsert_data(rows, count=True)
+    db.session.commit()
+
+    assert (inserted, updated) == (0, 2)
+    assert Data.query.filter_by(category_id=2, city="Sleman", year=2021).count() == 1
+    assert Data.query.filter_by(category_id=2, city="Sleman", year=2020, regency_id=None).count() == 1
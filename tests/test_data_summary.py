@@ -0,0 +1,95 @@
+from io import BytesIO
+
+import openpyxl
+import pytest
+
+import data_summary
+from models import db, Category, Data, DataSummary
+
+
+def _summary_rows():
+    return sorted(
+        (row.scope, row.category_id, row.province_id or 0, row.year, round(row.total, 6), row.row_count)
+        for row in DataSummary.query.all()
+    )
+
+
+def _assert_matches_rebuild():
+    incremental = _summary_rows()
+    data_summary.rebuild_summary()
+    assert incremental == _summary_rows()
+
+
+@pytest.fixture
+def summarized(app):
+    data_summary.rebuild_summary()
+
+
+def _national(category_id, year):
+    return DataSummary.query.filter_by(scope="national", category_id=category_id, year=year).first()
+
+
+def test_create_refreshes_summary(client, summarized):
+    response = client.post("/api/data", json={
+        "amount": 40.0, "year": 2030, "city": "Sleman",
+        "category_id": 1, "regency_id": 3404, "province_id": 34,
+    })
+
+    assert response.status_code == 201
+    assert (_national(1, 2030).total, _national(1, 2030).row_count) == (40.0, 1)
+    _assert_matches_rebuild()
+
+
+def test_update_refreshes_old_and_new_keys(client, summarized):
+    row = Data.query.filter_by(category_id=1, year=2020, regency_id=3404).one()
+    count_2020 = _national(1, 2020).row_count
+
+    client.put(f"/api/data/{row.id}", json={"year": 2031, "amount": 9.0})
+
+    assert _national(1, 2020).row_count == count_2020 - 1
+    assert _national(1, 2031).total == 9.0
+    _assert_matches_rebuild()
+
+
+def test_delete_refreshes_summary(client, summarized):
+    client.post("/api/data", json={
+        "amount": 40.0, "year": 2030, "city": "Sleman",
+        "category_id": 1, "regency_id": 3404, "province_id": 34,
+    })
+    row = Data.query.filter_by(category_id=1, year=2030).one()
+
+    client.delete(f"/api/data/{row.id}")
+
+    assert _national(1, 2030) is None
+    _assert_matches_rebuild()
+
+
+def test_upload_refreshes_summary(client, summarized):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(["regency_id", "province_id", "year", "amount", "category"])
+    sheet.append([3404, 34, 2032, 11.0, "IPM"])
+    sheet.append([3471, 34, 2032, 13.0, "IPM"])
+    sheet.append([3404, 34, 2020, 99.0, "MISKIN"])
+    buffer = BytesIO()
+    workbook.save(buffer)
+    buffer.seek(0)
+
+    response = client.post("/api/upload", data={"file": (buffer, "data.xlsx")}, content_type="multipart/form-data")
+
+    assert response.status_code == 200
+    assert response.json["inserted"] == 2
+    assert _national(1, 2032).total == 24.0
+    _assert_matches_rebuild()
+
+
+def test_delete_category_removes_its_summary_rows(client, summarized):
+    assert DataSummary.query.filter_by(category_id=1).count() > 0
+
+    response = client.delete("/api/categories/1")
+
+    assert response.status_code == 200
+    assert db.session.get(Category, 1) is None
+    assert DataSummary.query.filter_by(category_id=1).count() == 0
+    assert Data.query.filter_by(category_id=1).count() == 0
+    _assert_matches_rebuild()
@@ -0,0 +1,128 @@
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from scraping.http_client import make_session, RateLimiter
+from scraping.provinces_regencies_fixed import ProvincesRegenciesScraper
+
+PROVINCES = [("11", "ACEH"), ("34", "DI YOGYAKARTA"), ("35", "JAWA TIMUR")]
+
+
+class StubWilayah:
+    """Local stand-in for the BPS getwilayah API; the first ``failures[path]`` calls to a path answer 503"""
+
+    def __init__(self):
+        self.hits = Counter()
+        self.failures = Counter()
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with stub._lock:
+                    stub.hits[self.path] += 1
+                    failing = stub.hits[self.path] <= stub.failures[self.path]
+                if failing:
+                    self.send_response(503)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                body = json.dumps(stub.payload(self.path)).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def payload(self, path):
+        query = parse_qs(urlparse(path).query)
+        if query.get("level") == ["provinsi"]:
+            return [{"kode_bps": code, "nama_bps": name} for code, name in PROVINCES]
+        parent = query["parent"][0]
+        return [{"kode_bps": f"{parent}{i:02d}", "nama_bps": f"KAB {parent}{i:02d}"} for i in (1, 2)]
+
+    def path(self, level, parent):
+        return f"/getwilayah?level={level}&parent={parent}"
+
+
+@pytest.fixture
+def stub():
+    server = StubWilayah()
+    yield server
+    server.server.shutdown()
+
+
+def test_session_retries_transient_errors(stub):
+    path = stub.path("provinsi", 0)
+    stub.failures[path] = 2
+
+    response = make_session(retries=3, backoff_factor=0).get(stub.url + path, timeout=5)
+
+    assert response.status_code == 200
+    assert stub.hits[path] == 3
+
+
+def test_session_gives_up_after_the_retry_budget(stub):
+    path = stub.path("provinsi", 0)
+    stub.failures[path] = 10
+
+    response = make_session(retries=2, backoff_factor=0).get(stub.url + path, timeout=5)
+
+    assert response.status_code == 503
+    assert stub.hits[path] == 3
+
+
+def test_rate_limiter_spaces_calls():
+    limiter = RateLimiter(20)
+    start = time.monotonic()
+    for _ in range(5):
+        limiter.wait()
+
+    assert time.monotonic() - start >= 4 / 20 - 0.01
+
+
+def test_rate_limiter_is_shared_across_threads():
+    limiter = RateLimiter(50)
+    calls = []
+
+    def worker():
+        for _ in range(5):
+            limiter.wait()
+            calls.append(time.monotonic())
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    calls.sort()
+    assert calls[-1] - calls[0] >= 19 / 50 - 0.02
+
+
+def test_scraper_fetches_all_regencies_with_retry_and_rate_limit(stub):
+    stub.failures[stub.path("kabupaten", "34")] = 1
+    scraper = ProvincesRegenciesScraper(base_url=stub.url, max_workers=4, rate_limit=40, timeout=5)
+
+    start = time.monotonic()
+    provinces, regencies = scraper.get_all_provinces_with_regencies()
+    elapsed = time.monotonic() - start
+
+    assert [p["id"] for p in provinces] == ["11", "34", "35"]
+    # Urutan mengikuti provinsi meski diambil paralel
+    assert [r["id"] for r in regencies] == ["1101", "1102", "3401", "3402", "3501", "3502"]
+    assert stub.hits[stub.path("kabupaten", "34")] == 2
+    # 4 panggilan terbatas rate limiter (provinsi + 3 kabupaten); retry ditangani urllib3
+    assert elapsed >= 3 / 40 - 0.01
@@ -0,0 +1,115 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from jobs import scrape_jobs
+from models import db, Data, ScrapeJob
+
+HARVEST = {"items": [{"domain": "0000", "jenis_data": "413", "kategori": 1, "tahun": "2021"}]}
+
+
+class HeldExecutor:
+    """Keeps submitted jobs in the queue so the test decides when they run"""
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, fn, *args):
+        self.submitted.append(args)
+
+
+@pytest.fixture
+def held(monkeypatch):
+    executor = HeldExecutor()
+    monkeypatch.setattr(scrape_jobs, "_get_executor", lambda: executor)
+    return executor
+
+
+def _job(status, started_at=None):
+    job = ScrapeJob(kind="bps_harvest", status=status, payload={"json": HARVEST}, started_at=started_at)
+    db.session.add(job)
+    db.session.commit()
+    return job.id
+
+
+def test_async_request_is_queued_and_replayed_by_drain(client, bps_stub, held):
+    response = client.post("/api/bps/harvest?async=true", json=HARVEST)
+
+    assert response.status_code == 202
+    job_id = response.json["job"]["id"]
+    assert held.submitted == [(job_id,)]
+    assert Data.query.filter_by(category_id=1, regency_id=3404, year=2021).one().amount != bps_stub.value(0, 3)
+
+    assert scrape_jobs.drain() == 1
+
+    job = client.get(response.headers["Location"]).json
+    assert (job["status"], job["response_status"]) == ("succeeded", 200)
+    assert job["result"]["request_count"] == 1
+    assert Data.query.filter_by(category_id=1, regency_id=3404, year=2021).one().amount == bps_stub.value(0, 3)
+
+
+def test_a_job_is_claimed_once(app):
+    job_id = _job("queued")
+
+    assert scrape_jobs._claim(job_id) is True
+    assert scrape_jobs._claim(job_id) is False
+    assert db.session.get(ScrapeJob, job_id).status == "running"
+
+
+def test_run_skips_a_job_claimed_elsewhere(app):
+    job_id = _job("running", started_at=datetime.now())
+
+    scrape_jobs.run(job_id)
+
+    job = db.session.get(ScrapeJob, job_id)
+    db.session.refresh(job)
+    assert (job.status, job.finished_at) == ("running", None)
+
+
+def test_failed_view_marks_the_job_failed(app):
+    job_id = _job("queued")
+    db.session.get(ScrapeJob, job_id).payload = {"json": {"items": [{"kategori": "x"}]}}
+    db.session.commit()
+
+    scrape_jobs.run(job_id)
+
+    job = db.session.get(ScrapeJob, job_id)
+    db.session.refresh(job)
+    assert (job.status, job.response_status) == ("failed", 400)
+
+
+def test_stale_running_jobs_are_requeued(app, monkeypatch):
+    monkeypatch.setattr(scrape_jobs, "timeout", 600)
+    stale = _job("running", started_at=datetime.now() - timedelta(seconds=601))
+    fresh = _job("running", started_at=datetime.now() - timedelta(seconds=10))
+
+    assert scrape_jobs.requeue_stale() == 1
+
+    assert db.session.get(ScrapeJob, stale).status == "queued"
+    assert db.session.get(ScrapeJob, stale).started_at is None
+    assert db.session.get(ScrapeJob, fresh).status == "running"
+
+
+def test_run_scrape_jobs_command_recovers_stale_jobs(app, bps_stub, monkeypatch):
+    monkeypatch.setattr(scrape_jobs, "timeout", 600)
+    job_id = _job("running", started_at=datetime.now() - timedelta(hours=2))
+
+    result = app.test_cli_runner().invoke(args=["run-scrape-jobs"])
+
+    assert "1 stale running job(s) requeued" in result.output
+    assert "1 job(s) run" in result.output
+    job = db.session.get(ScrapeJob, job_id)
+    db.session.refresh(job)
+    assert job.status == "succeeded"
+
+
+def test_enabled_queue_enqueues_by_default_and_async_false_runs_inline(client, bps_stub, held, monkeypatch):
+    monkeypatch.setattr(scrape_jobs, "enabled", True)
+
+    queued = client.post("/api/bps/harvest", json=HARVEST)
+    inline = client.post("/api/bps/harvest?async=false", json=HARVEST)
+
+    assert queued.status_code == 202
+    assert len(held.submitted) == 1
+    assert inline.status_code == 200
+    assert inline.json["request_count"] == 1
@@ -0,0 +1,53 @@
+from models import RegressionModel
+from result_cache import analysis_cache
+
+ANALYSIS = {
+    "cities": ["Kota Yogyakarta", "Sleman"],
+    "regression_type": "linear",
+    "analysis_type": "multi",
+    "variables": ["IPM", "MISKIN", "STUNTING"],
+}
+
+
+def test_identical_fit_is_registered_once(client):
+    first = client.post("/api/analysis", json=ANALYSIS)
+    assert first.status_code == 200
+
+    # Cache hasil kosong (mis. worker lain): fit ulang tidak menambah baris registry
+    analysis_cache.clear()
+    second = client.post("/api/analysis", json=ANALYSIS)
+    assert second.status_code == 200
+
+    assert first.json["model_id"] == second.json["model_id"]
+    assert RegressionModel.query.count() == 1
+
+
+def test_changed_data_registers_a_new_model(client):
+    first = client.post("/api/analysis", json=ANALYSIS)
+    for category_id, amount in [(1, 500.0), (2, 3.0), (3, 7.0)]:
+        client.post("/api/data", json={
+            "amount": amount, "year": 2030, "city": "Sleman",
+            "category_id": category_id, "regency_id": 3404, "province_id": 34,
+        })
+    second = client.post("/api/analysis", json=ANALYSIS)
+
+    assert first.json["model_id"] != second.json["model_id"]
+    assert RegressionModel.query.count() == 2
+
+
+def test_predict_rejects_missing_or_invalid_model_id(client):
+    assert client.post("/predict", json={"model_id": "abc", "values": {"IPM": 1}}).status_code == 400
+    assert client.post("/predict/batch", json={"model_ids": ["x"], "values": {"IPM": [1]}}).status_code == 400
+    assert client.post("/predict/batch", json={"model_ids": "12", "values": {"IPM": [1]}}).status_code == 400
+    assert client.post("/predict", json={"model_id": 999, "values": {"IPM": 1}}).status_code == 404
+
+
+def test_predict_rejects_non_numeric_values(client):
+    model_id = client.post("/api/analysis", json=ANALYSIS).json["model_id"]
+
+    response = client.post("/predict", json={"model_id": model_id, "values": {"IPM": "tinggi", "MISKIN": 10}})
+    assert response.status_code == 400
+    assert response.json["error"] == "Values must be numbers for: IPM"
+
+    ok = client.post("/predict", json={"model_id": model_id, "values": {"IPM": "70.5", "MISKIN": 10}})
+    assert ok.status_code == 200